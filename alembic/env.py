@@ -14,9 +14,9 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 # Carregar variáveis de ambiente
 load_dotenv()
 
-# Importar os modelos
-from src.models import Base
-from src.connection import Base as ConnectionBase
+# Importar os modelos (registra as tabelas em Base.metadata)
+import src.models  # noqa: F401
+from src.connection import Base, DATABASE_URL
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -31,11 +31,16 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 target_metadata = Base.metadata
 
-# Configurar URL do banco de dados a partir das variáveis de ambiente
+# Configurar URL do banco de dados: a mesma da aplicação (DB_TYPE, SQLITE_PATH, DB_*),
+# a menos que quem chamou (ex.: manage.py migrate --url) já tenha definido uma
 def get_url():
-    return f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
+    return config.attributes.get("url") or DATABASE_URL
 
-config.set_main_option("sqlalchemy.url", get_url())
+config.set_main_option("sqlalchemy.url", get_url().replace("%", "%%"))
+
+# SQLite não altera colunas/constraints com ALTER TABLE; o modo batch recria a tabela
+def usar_batch(url: str) -> bool:
+    return url.startswith("sqlite")
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -61,6 +66,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        render_as_batch=usar_batch(url),
     )
 
     with context.begin_transaction():
@@ -82,7 +88,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite",
         )
 
         with context.begin_transaction():
@@ -0,0 +1,55 @@
+"""esquema inicial e índices de registros
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Bancos existentes foram criados por Base.metadata.create_all, então as
+    # tabelas só são criadas quando ainda não existem.
+    tabelas = sa.inspect(op.get_bind()).get_table_names()
+
+    if 'tipos_de_gasto' not in tabelas:
+        op.create_table(
+            'tipos_de_gasto',
+            sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('descricao', sa.String(length=50), nullable=False, unique=True),
+        )
+
+    if 'registros' not in tabelas:
+        op.create_table(
+            'registros',
+            sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('dt_hr_gasto', sa.DateTime(), nullable=True),
+            sa.Column('vlr_gasto', sa.Float(), nullable=False),
+            sa.Column('observacao', sa.Text(), nullable=True),
+            sa.Column('fk_tipo_gasto', sa.Integer(), sa.ForeignKey('tipos_de_gasto.id'), nullable=True),
+        )
+
+    indices = {indice['name'] for indice in sa.inspect(op.get_bind()).get_indexes('registros')}
+    if 'ix_registros_fk_tipo_gasto_dt_hr_gasto' not in indices:
+        op.create_index('ix_registros_fk_tipo_gasto_dt_hr_gasto', 'registros', ['fk_tipo_gasto', 'dt_hr_gasto'])
+    if 'ix_registros_dt_hr_gasto_id' not in indices:
+        op.create_index('ix_registros_dt_hr_gasto_id', 'registros', ['dt_hr_gasto', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # As tabelas podem ser anteriores ao Alembic; apenas os índices são removidos.
+    op.drop_index('ix_registros_dt_hr_gasto_id', table_name='registros')
+    op.drop_index('ix_registros_fk_tipo_gasto_dt_hr_gasto', table_name='registros')
@@ -0,0 +1,51 @@
+"""rollup mensal de gastos (gastos_mensais)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if 'gastos_mensais' not in sa.inspect(bind).get_table_names():
+        op.create_table(
+            'gastos_mensais',
+            sa.Column('ano_mes', sa.String(length=7), primary_key=True),
+            sa.Column('fk_tipo_gasto', sa.Integer(), sa.ForeignKey('tipos_de_gasto.id'), primary_key=True),
+            sa.Column('total_gasto', sa.Float(), nullable=False),
+            sa.Column('total_registros', sa.Integer(), nullable=False),
+        )
+    elif bind.execute(sa.text('SELECT 1 FROM gastos_mensais LIMIT 1')).first() is not None:
+        return
+
+    # Backfill a partir dos registros existentes (o mesmo que `python manage.py rebuild-mensal`),
+    # também quando a tabela já existe vazia (criada pelo create_all da inicialização completa)
+    if bind.dialect.name == 'postgresql':
+        ano_mes = "to_char(dt_hr_gasto, 'YYYY-MM')"
+    else:
+        ano_mes = "strftime('%Y-%m', dt_hr_gasto)"
+    op.execute(
+        f"INSERT INTO gastos_mensais (ano_mes, fk_tipo_gasto, total_gasto, total_registros) "
+        f"SELECT {ano_mes}, fk_tipo_gasto, SUM(vlr_gasto), COUNT(id) FROM registros "
+        f"WHERE dt_hr_gasto IS NOT NULL AND fk_tipo_gasto IS NOT NULL "
+        f"GROUP BY {ano_mes}, fk_tipo_gasto"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('gastos_mensais')
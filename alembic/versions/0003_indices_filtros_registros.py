@@ -0,0 +1,33 @@
+"""índices para filtros por valor em registros
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    indices = {indice['name'] for indice in sa.inspect(op.get_bind()).get_indexes('registros')}
+    if 'ix_registros_vlr_gasto_id' not in indices:
+        op.create_index('ix_registros_vlr_gasto_id', 'registros', ['vlr_gasto', 'id'])
+    if 'ix_registros_fk_tipo_gasto_vlr_gasto' not in indices:
+        op.create_index('ix_registros_fk_tipo_gasto_vlr_gasto', 'registros', ['fk_tipo_gasto', 'vlr_gasto'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_registros_fk_tipo_gasto_vlr_gasto', table_name='registros')
+    op.drop_index('ix_registros_vlr_gasto_id', table_name='registros')
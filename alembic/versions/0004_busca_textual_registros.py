@@ -0,0 +1,44 @@
+"""busca textual em registros.observacao (FTS5 no SQLite, GIN no PostgreSQL)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from src.models.registro_busca import DDL_BUSCA_POSTGRESQL, DDL_BUSCA_SQLITE
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Os comandos usam IF NOT EXISTS: bancos criados por create_all já os têm
+    if op.get_bind().dialect.name == 'postgresql':
+        for comando in DDL_BUSCA_POSTGRESQL:
+            op.execute(comando)
+        return
+
+    for comando in DDL_BUSCA_SQLITE:
+        op.execute(comando)
+    # Indexa as observações dos registros existentes
+    op.execute("INSERT INTO registros_busca(registros_busca) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_registros_observacao_busca")
+        return
+
+    for trigger in ('registros_busca_ai', 'registros_busca_ad', 'registros_busca_au'):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS registros_busca")
@@ -0,0 +1,69 @@
+"""exclusão em cascata dos registros e do rollup de um tipo de gasto
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.models.registro_busca import DDL_BUSCA_SQLITE
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABELAS = ('registros', 'gastos_mensais')
+# As chaves criadas pelo create_all e pela 0001 não têm nome; no modo batch do SQLite elas
+# recebem este nome na reflexão para poderem ser removidas
+CONVENCAO_NOMES = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+
+def _recriar_chaves(ondelete: Union[str, None]) -> None:
+    """Recria as chaves estrangeiras para tipos_de_gasto com a ação de exclusão indicada"""
+    inspetor = sa.inspect(op.get_bind())
+    for tabela in TABELAS:
+        for chave in inspetor.get_foreign_keys(tabela):
+            if chave['referred_table'] != 'tipos_de_gasto':
+                continue
+            nome = chave['name'] or f'{tabela}_fk_tipo_gasto_fkey'
+            op.drop_constraint(nome, tabela, type_='foreignkey')
+            op.create_foreign_key(
+                nome, tabela, 'tipos_de_gasto', ['fk_tipo_gasto'], ['id'], ondelete=ondelete
+            )
+
+
+def _recriar_chaves_sqlite(ondelete: Union[str, None]) -> None:
+    """No SQLite, recria as tabelas (modo batch) com a nova ação de exclusão das chaves"""
+    for tabela in TABELAS:
+        nome = f'fk_{tabela}_fk_tipo_gasto_tipos_de_gasto'
+        with op.batch_alter_table(tabela, recreate='always', naming_convention=CONVENCAO_NOMES) as batch_op:
+            batch_op.drop_constraint(nome, type_='foreignkey')
+            batch_op.create_foreign_key(nome, 'tipos_de_gasto', ['fk_tipo_gasto'], ['id'], ondelete=ondelete)
+    # Os triggers da busca textual caem junto com a tabela registros recriada
+    for comando in DDL_BUSCA_SQLITE:
+        op.execute(comando)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # O SQLite verifica as chaves com PRAGMA foreign_keys=ON (SQLITE_MODO=producao), então o
+    # esquema migrado precisa do mesmo ON DELETE CASCADE que o create_all gera a partir dos models
+    if op.get_bind().dialect.name == 'sqlite':
+        _recriar_chaves_sqlite('CASCADE')
+        return
+    _recriar_chaves('CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        _recriar_chaves_sqlite(None)
+        return
+    _recriar_chaves(None)
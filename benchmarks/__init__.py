@@ -0,0 +1,6 @@
+"""
+Benchmarks da API KAIROS
+
+`python -m benchmarks` executa o benchmark das rotas da API (benchmarks/api.py).
+Os demais módulos podem ser executados com `python -m benchmarks.<modulo>`.
+"""
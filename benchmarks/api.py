@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark das rotas da API com bancos semeados (10k/100k/1M registros)
+
+Para cada tamanho, semeia (ou reaproveita do cache) um banco SQLite determinístico e
+executa os cenários de benchmarks/cenarios.py em processo (httpx + ASGI) e/ou por HTTP
+real (run.py em um subprocesso, com `--workers` processos), com requisições concorrentes. Gera um JSON com
+p50/p95/p99, média e requisições por segundo de cada cenário, para comparar commits.
+
+Uso:
+    python -m benchmarks [--tamanhos 10000,100000,1000000] [--modos processo,http]
+                         [--requisicoes 200] [--concorrencia 8] [--saida resultado.json]
+                         [--workers 4] [--inicializacao completa|rapida]
+                         [--comparar base.json --tolerancia 0.25]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from typing import List, Optional
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from .cenarios import CENARIOS, Cenario, Contexto, rotas_sem_cenario
+from .dados import DIRETORIO_CACHE, copia_de_trabalho
+
+DIRETORIO_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REQUISICOES_AQUECIMENTO = 3
+
+
+def _percentil(ordenadas: List[float], percentual: float) -> float:
+    """Percentil pelo método nearest-rank"""
+    return ordenadas[max(math.ceil(percentual / 100 * len(ordenadas)) - 1, 0)]
+
+
+async def medir_cenario(
+    cliente: httpx.AsyncClient,
+    cenario: Cenario,
+    contexto: Contexto,
+    requisicoes: int,
+    concorrencia: int,
+    duracao_maxima: float
+) -> dict:
+    """Executa o cenário com `concorrencia` requisições simultâneas e resume as latências"""
+    if cenario.preparar:
+        cenario.preparar(contexto, requisicoes + REQUISICOES_AQUECIMENTO)
+
+    indices = itertools.count()
+    for _ in range(REQUISICOES_AQUECIMENTO):
+        await cliente.request(cenario.metodo, **{"url": cenario.rota, **cenario.requisicao(contexto, next(indices))})
+
+    latencias = []
+    status = Counter()
+    limite = time.perf_counter() + duracao_maxima
+
+    async def trabalhador():
+        while time.perf_counter() < limite:
+            indice = next(indices)
+            if indice >= requisicoes + REQUISICOES_AQUECIMENTO:
+                return
+            parametros = {"url": cenario.rota, **cenario.requisicao(contexto, indice)}
+            inicio = time.perf_counter()
+            try:
+                resposta = await cliente.request(cenario.metodo, **parametros)
+                status[resposta.status_code] += 1
+            except httpx.HTTPError:
+                status["erro_de_conexao"] += 1
+            latencias.append((time.perf_counter() - inicio) * 1000)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    decorrido = time.perf_counter() - inicio
+
+    ordenadas = sorted(latencias)
+    return {
+        "requisicoes": len(ordenadas),
+        "erros": sum(total for codigo, total in status.items() if not isinstance(codigo, int) or codigo >= 400),
+        "status": {str(codigo): total for codigo, total in sorted(status.items(), key=str)},
+        "p50_ms": round(_percentil(ordenadas, 50), 2),
+        "p95_ms": round(_percentil(ordenadas, 95), 2),
+        "p99_ms": round(_percentil(ordenadas, 99), 2),
+        "media_ms": round(sum(ordenadas) / len(ordenadas), 2),
+        "rps": round(len(ordenadas) / decorrido, 1),
+    }
+
+
+async def _executar_cenarios(cliente, contexto, args) -> dict:
+    resultados = {}
+    for cenario in CENARIOS:
+        resultados[cenario.nome] = await medir_cenario(
+            cliente, cenario, contexto, args.requisicoes, args.concorrencia, args.duracao_maxima
+        )
+        resumo = resultados[cenario.nome]
+        print(f"   {cenario.nome:45s} p50 {resumo['p50_ms']:8.2f} ms  p99 {resumo['p99_ms']:8.2f} ms  "
+              f"{resumo['rps']:8.1f} req/s  erros {resumo['erros']}", file=sys.stderr)
+    return resultados
+
+
+def executar_em_processo(caminho_banco: str, contexto: Contexto, args) -> dict:
+    """Executa os cenários chamando o app ASGI diretamente, sem rede"""
+    from main import app
+    from src.connection import get_db
+    from src.services.cache import cache_tipos_gasto
+
+    engine = create_engine(
+        f"sqlite:///{caminho_banco}",
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        pool_size=args.concorrencia,
+        max_overflow=args.concorrencia
+    )
+    SessionBenchmark = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_db_benchmark():
+        db = SessionBenchmark()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def executar():
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://benchmark", timeout=None) as cliente:
+            return await _executar_cenarios(cliente, contexto, args)
+
+    cache_tipos_gasto.limpar()
+    app.dependency_overrides[get_db] = get_db_benchmark
+    try:
+        return asyncio.run(executar())
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        engine.dispose()
+
+
+def _porta_livre() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def executar_por_http(caminho_banco: str, contexto: Contexto, args) -> dict:
+    """Executa os cenários contra o run.py (modo produção, `--workers` processos) apontado para o banco semeado"""
+    porta = _porta_livre()
+    ambiente = {
+        **os.environ, "DB_TYPE": "sqlite", "SQLITE_PATH": caminho_banco,
+        "DB_POOL_SIZE": str(args.concorrencia), "INICIALIZACAO": args.inicializacao,
+        "API_HOST": "127.0.0.1", "API_PORT": str(porta), "API_DEBUG": "false", "API_WORKERS": str(args.workers)
+    }
+    inicio = time.perf_counter()
+    servidor = subprocess.Popen(
+        [sys.executable, "run.py"], cwd=DIRETORIO_PROJETO, env=ambiente, stdout=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{porta}"
+    try:
+        prazo = time.monotonic() + 30
+        while True:
+            try:
+                if httpx.get(f"{url}/health/live", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if servidor.poll() is not None or time.monotonic() > prazo:
+                raise RuntimeError("O servidor não iniciou")
+            time.sleep(0.05)
+        contexto.partida_a_frio = {
+            "modo": args.inicializacao,
+            "ate_responder_ms": round((time.perf_counter() - inicio) * 1000, 1),
+            "servidor": httpx.get(f"{url}/internal/inicializacao", timeout=5).json(),
+        }
+        print(f"   partida a frio ({args.inicializacao}): {contexto.partida_a_frio['ate_responder_ms']} ms", file=sys.stderr)
+
+        async def executar():
+            limites = httpx.Limits(max_connections=args.concorrencia)
+            async with httpx.AsyncClient(base_url=url, timeout=None, limits=limites) as cliente:
+                return await _executar_cenarios(cliente, contexto, args)
+
+        return asyncio.run(executar())
+    finally:
+        servidor.terminate()
+        servidor.wait(timeout=10)
+
+
+def comparar(atual: dict, base: dict, tolerancia: float) -> List[str]:
+    """Lista os cenários cujo p95 piorou mais que `tolerancia` em relação à base"""
+    indice_base = {(r["registros"], r["modo"]): r["cenarios"] for r in base["resultados"]}
+    regressoes = []
+    for resultado in atual["resultados"]:
+        cenarios_base = indice_base.get((resultado["registros"], resultado["modo"]), {})
+        for nome, resumo in resultado["cenarios"].items():
+            anterior = cenarios_base.get(nome)
+            if anterior and resumo["p95_ms"] > anterior["p95_ms"] * (1 + tolerancia):
+                regressoes.append(
+                    f"{resultado['modo']} {resultado['registros']} {nome}: "
+                    f"p95 {anterior['p95_ms']} -> {resumo['p95_ms']} ms"
+                )
+    return regressoes
+
+
+def _commit_atual() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=DIRETORIO_PROJETO, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", default="10000,100000,1000000", help="quantidades de registros, separadas por vírgula")
+    parser.add_argument("--modos", default="processo,http", help="processo e/ou http")
+    parser.add_argument("--requisicoes", type=int, default=200, help="requisições medidas por cenário")
+    parser.add_argument("--concorrencia", type=int, default=8)
+    parser.add_argument("--duracao-maxima", type=float, default=30.0, help="segundos por cenário")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=1, help="processos do servidor no modo http (API_WORKERS)")
+    parser.add_argument("--inicializacao", default="completa", help="INICIALIZACAO do servidor no modo http (completa ou rapida)")
+    parser.add_argument("--cache-dados", default=DIRETORIO_CACHE, help="diretório dos bancos semeados")
+    parser.add_argument("--saida", help="arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="piora de p95 aceita na comparação")
+    args = parser.parse_args()
+
+    executores = {"processo": executar_em_processo, "http": executar_por_http}
+    relatorio = {
+        "commit": _commit_atual(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "configuracao": {
+            "requisicoes": args.requisicoes, "concorrencia": args.concorrencia, "semente": args.semente,
+            "workers": args.workers,
+            "python": sys.version.split()[0],
+        },
+        "rotas_sem_cenario": rotas_sem_cenario(),
+        "resultados": [],
+    }
+    if relatorio["rotas_sem_cenario"]:
+        print(f"⚠️  Rotas sem cenário: {', '.join(relatorio['rotas_sem_cenario'])}", file=sys.stderr)
+
+    for registros in (int(tamanho) for tamanho in args.tamanhos.split(",")):
+        for modo in args.modos.split(","):
+            with tempfile.TemporaryDirectory() as diretorio:
+                print(f"📦 {registros} registros, {modo}", file=sys.stderr)
+                caminho = copia_de_trabalho(registros, args.semente, diretorio, args.cache_dados)
+                contexto = Contexto(registros=registros, caminho_banco=caminho, semente=args.semente)
+                resultado = {
+                    "registros": registros,
+                    "modo": modo,
+                    "cenarios": executores[modo](caminho, contexto, args),
+                }
+                if contexto.partida_a_frio:
+                    resultado["partida_a_frio"] = contexto.partida_a_frio
+                relatorio["resultados"].append(resultado)
+
+    conteudo = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(conteudo)
+    else:
+        print(conteudo)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            regressoes = comparar(relatorio, json.load(arquivo), args.tolerancia)
+        for regressao in regressoes:
+            print(f"🔺 {regressao}", file=sys.stderr)
+        if regressoes:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
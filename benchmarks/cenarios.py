@@ -0,0 +1,161 @@
+"""
+Cenários de requisição por rota para o benchmark da API
+
+Cada cenário monta a i-ésima requisição de uma rota dos controllers. Os cenários de
+leitura vêm primeiro e os de exclusão por último, para não afetar os demais.
+"""
+
+import itertools
+import random
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from fastapi import APIRouter
+from sqlalchemy import create_engine, insert, select
+
+from src.models import TipoDeGasto
+from .dados import DIAS_PERIODO, INICIO_PERIODO, PALAVRAS, TIPOS_GASTO
+
+
+@dataclass
+class Contexto:
+    """Estado compartilhado pelos cenários durante uma execução"""
+    registros: int
+    caminho_banco: str
+    semente: int = 42
+    gerador: random.Random = None
+    contador: itertools.count = field(default_factory=itertools.count)
+    ids_para_excluir: Optional[itertools.count] = None
+    tipos_para_excluir: List[int] = field(default_factory=list)
+    # Modo http: tempo até o servidor responder e os tempos reportados por /internal/inicializacao
+    partida_a_frio: Optional[dict] = None
+
+    def __post_init__(self):
+        self.gerador = random.Random(self.semente)
+        # Exclusões consomem os ids mais altos, do fim para o começo
+        self.ids_para_excluir = itertools.count(self.registros, -1)
+
+    def registro_aleatorio(self) -> int:
+        return self.gerador.randint(1, max(self.registros // 2, 1))
+
+    def tipo_aleatorio(self) -> int:
+        return self.gerador.randint(1, TIPOS_GASTO)
+
+    def registros_aleatorios(self, quantidade: int) -> List[int]:
+        return [self.registro_aleatorio() for _ in range(quantidade)]
+
+    def janela(self, dias: int) -> Dict[str, str]:
+        inicio = INICIO_PERIODO + timedelta(days=self.gerador.randrange(DIAS_PERIODO - dias))
+        return {"inicio": inicio.isoformat(), "fim": (inicio + timedelta(days=dias)).isoformat()}
+
+
+@dataclass
+class Cenario:
+    nome: str
+    metodo: str
+    rota: str
+    requisicao: Callable[[Contexto, int], dict]
+    preparar: Optional[Callable[[Contexto, int], None]] = None
+
+
+def _novo_registro(contexto: Contexto) -> dict:
+    return {
+        "vlr_gasto": round(contexto.gerador.uniform(1, 2000), 2),
+        "observacao": " ".join(contexto.gerador.choices(PALAVRAS, k=2)),
+        "fk_tipo_gasto": contexto.tipo_aleatorio(),
+    }
+
+
+def _csv_importacao(contexto: Contexto, linhas: int = 100) -> bytes:
+    corpo = ["vlr_gasto,observacao,fk_tipo_gasto,dt_hr_gasto"]
+    for _ in range(linhas):
+        registro = _novo_registro(contexto)
+        corpo.append(f"{registro['vlr_gasto']},{registro['observacao']},{registro['fk_tipo_gasto']},2024-06-01T12:00:00")
+    return "\n".join(corpo).encode("utf-8")
+
+
+def _preparar_tipos_para_excluir(contexto: Contexto, quantidade: int):
+    """Cria tipos de gasto vazios para o cenário de exclusão de tipos"""
+    engine = create_engine(f"sqlite:///{contexto.caminho_banco}")
+    try:
+        with engine.begin() as connection:
+            prefixo = f"Excluir {contexto.semente}-"
+            connection.execute(insert(TipoDeGasto), [{"descricao": f"{prefixo}{i}"} for i in range(quantidade)])
+            contexto.tipos_para_excluir = list(connection.execute(
+                select(TipoDeGasto.id).where(TipoDeGasto.descricao.like(f"{prefixo}%")).order_by(TipoDeGasto.id)
+            ).scalars())
+    finally:
+        engine.dispose()
+
+
+CENARIOS: List[Cenario] = [
+    # Leituras
+    Cenario("GET /registros/ (skip/limit)", "GET", "/registros/",
+            lambda c, i: {"params": {"skip": c.gerador.randrange(max(c.registros - 100, 1)), "limit": 100}}),
+    Cenario("GET /registros/ (cursor, filtros)", "GET", "/registros/",
+            lambda c, i: {"params": {"cursor": "", "limit": 100, "ordem": "valor_desc", **c.janela(30)}}),
+    Cenario("GET /registros/ (ids, 50)", "GET", "/registros/",
+            lambda c, i: {"params": {"ids": ",".join(map(str, c.registros_aleatorios(50)))}}),
+    Cenario("POST /registros/batch-get (500)", "POST", "/registros/batch-get",
+            lambda c, i: {"json": {"ids": c.registros_aleatorios(500)}}),
+    Cenario("GET /registros/resumo", "GET", "/registros/resumo", lambda c, i: {}),
+    Cenario("GET /registros/busca", "GET", "/registros/busca",
+            lambda c, i: {"params": {"q": c.gerador.choice(PALAVRAS), "limit": 20}}),
+    Cenario("GET /registros/export", "GET", "/registros/export",
+            lambda c, i: {"params": {"format": "ndjson", "fk_tipo_gasto": c.tipo_aleatorio(), **c.janela(7)}}),
+    Cenario("GET /registros/{registro_id}", "GET", "/registros/{registro_id}",
+            lambda c, i: {"url": f"/registros/{c.registro_aleatorio()}"}),
+    Cenario("GET /registros/tipo-gasto/{tipo_gasto_id}", "GET", "/registros/tipo-gasto/{tipo_gasto_id}",
+            lambda c, i: {"url": f"/registros/tipo-gasto/{c.tipo_aleatorio()}"}),
+    Cenario("GET /tipos-gasto/ (include=none)", "GET", "/tipos-gasto/",
+            lambda c, i: {"params": {"include": "none"}}),
+    Cenario("GET /tipos-gasto/ (ids, include=none)", "GET", "/tipos-gasto/",
+            lambda c, i: {"params": {"ids": f"{c.tipo_aleatorio()},{c.tipo_aleatorio()}", "include": "none"}}),
+    Cenario("POST /tipos-gasto/batch-get", "POST", "/tipos-gasto/batch-get",
+            lambda c, i: {"params": {"include": "none"}, "json": {"ids": list(range(1, TIPOS_GASTO + 1))}}),
+    Cenario("GET /tipos-gasto/{tipo_gasto_id}", "GET", "/tipos-gasto/{tipo_gasto_id}",
+            lambda c, i: {"url": f"/tipos-gasto/{c.tipo_aleatorio()}"}),
+    Cenario("GET /relatorios/mensal", "GET", "/relatorios/mensal",
+            lambda c, i: {"params": {"inicio": "2023-01", "fim": "2023-12"}}),
+    Cenario("GET /internal/pool", "GET", "/internal/pool", lambda c, i: {}),
+    Cenario("GET /internal/cache", "GET", "/internal/cache", lambda c, i: {}),
+    Cenario("GET /metrics", "GET", "/metrics", lambda c, i: {}),
+    Cenario("GET /internal/inicializacao", "GET", "/internal/inicializacao", lambda c, i: {}),
+    # Escritas
+    Cenario("POST /registros/", "POST", "/registros/", lambda c, i: {"json": _novo_registro(c)}),
+    Cenario("POST /registros/bulk (100)", "POST", "/registros/bulk",
+            lambda c, i: {"json": {"registros": [_novo_registro(c) for _ in range(100)]}}),
+    Cenario("POST /registros/import (100)", "POST", "/registros/import",
+            lambda c, i: {"files": {"arquivo": ("registros.csv", _csv_importacao(c), "text/csv")}}),
+    Cenario("PUT /registros/{registro_id}", "PUT", "/registros/{registro_id}",
+            lambda c, i: {"url": f"/registros/{c.registro_aleatorio()}", "json": {"vlr_gasto": 42.0}}),
+    Cenario("POST /tipos-gasto/", "POST", "/tipos-gasto/",
+            lambda c, i: {"json": {"descricao": f"Novo {c.semente}-{next(c.contador)}"}}),
+    Cenario("PUT /tipos-gasto/{tipo_gasto_id}", "PUT", "/tipos-gasto/{tipo_gasto_id}",
+            lambda c, i: {"url": f"/tipos-gasto/{c.tipo_aleatorio()}", "json": {"descricao": f"Renomeado {next(c.contador)}"}}),
+    # Exclusões
+    Cenario("DELETE /registros/{registro_id}", "DELETE", "/registros/{registro_id}",
+            lambda c, i: {"url": f"/registros/{next(c.ids_para_excluir)}"}),
+    Cenario("DELETE /tipos-gasto/{tipo_gasto_id}", "DELETE", "/tipos-gasto/{tipo_gasto_id}",
+            lambda c, i: {"url": f"/tipos-gasto/{c.tipos_para_excluir[i]}"},
+            preparar=_preparar_tipos_para_excluir),
+]
+
+
+def rotas_dos_controllers() -> Set[Tuple[str, str]]:
+    """(método, caminho) de todas as rotas dos routers exportados por src.controllers"""
+    import src.controllers as controllers
+
+    rotas = set()
+    for nome in controllers.__all__:
+        router = getattr(controllers, nome)
+        if isinstance(router, APIRouter):
+            for rota in router.routes:
+                rotas.update((metodo, rota.path) for metodo in getattr(rota, "methods", None) or ())
+    return rotas
+
+
+def rotas_sem_cenario() -> List[str]:
+    """Rotas dos controllers que nenhum cenário exercita"""
+    cobertas = {(cenario.metodo, cenario.rota) for cenario in CENARIOS}
+    return sorted(f"{metodo} {caminho}" for metodo, caminho in rotas_dos_controllers() - cobertas)
@@ -0,0 +1,100 @@
+"""
+Bancos SQLite semeados para os benchmarks da API
+
+Os dados são gerados de forma determinística a partir de uma semente, então o mesmo
+tamanho e semente produzem o mesmo banco em qualquer commit. O banco semeado fica em
+cache, identificado também pela impressão do esquema (um commit que altera tabelas ou
+índices semeia outro banco), e cada execução trabalha sobre uma cópia, já que os cenários
+de escrita o alteram.
+"""
+
+import hashlib
+import os
+import random
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, insert
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from manage import configuracao_alembic
+from src.connection import Base
+from src.models import Registro, TipoDeGasto
+from src.models.registro_busca import DDL_BUSCA_SQLITE
+from src.services import RelatorioService
+
+PALAVRAS = [
+    "uber", "99", "farmácia", "mercado", "padaria", "cinema", "posto", "gasolina", "aluguel",
+    "luz", "água", "internet", "restaurante", "jantar", "almoço", "café", "academia", "livraria",
+    "presente", "viagem", "hotel", "passagem", "ônibus", "metrô", "estacionamento", "médico",
+]
+TIPOS_GASTO = 20
+INICIO_PERIODO = datetime(2023, 1, 1)
+DIAS_PERIODO = 730
+LINHAS_POR_LOTE = 50000
+DIRETORIO_CACHE = os.path.join(tempfile.gettempdir(), "kairos_benchmarks")
+
+
+def impressao_esquema() -> str:
+    """Hash curto do DDL SQLite do esquema (tabelas, índices e busca textual) e da revisão head"""
+    from alembic.script import ScriptDirectory
+
+    dialeto = sqlite.dialect()
+    partes = [ScriptDirectory.from_config(configuracao_alembic()).get_current_head()]
+    for tabela in Base.metadata.sorted_tables:
+        partes.append(str(CreateTable(tabela).compile(dialect=dialeto)))
+        for indice in sorted(tabela.indexes, key=lambda indice: indice.name):
+            partes.append(str(CreateIndex(indice).compile(dialect=dialeto)))
+    partes.extend(DDL_BUSCA_SQLITE)
+    return hashlib.sha256("\n".join(partes).encode()).hexdigest()[:12]
+
+
+def semear(caminho: str, registros: int, semente: int = 42):
+    """Cria o banco em `caminho` com TIPOS_GASTO tipos e `registros` registros"""
+    gerador = random.Random(semente)
+    from alembic import command
+
+    engine = create_engine(f"sqlite:///{caminho}")
+    Base.metadata.create_all(bind=engine)
+    # Marca a revisão head, exigida pelos workers com INICIALIZACAO=rapida
+    command.stamp(configuracao_alembic(f"sqlite:///{caminho}"), "head")
+
+    with engine.begin() as connection:
+        connection.exec_driver_sql("PRAGMA synchronous=OFF")
+        connection.execute(insert(TipoDeGasto), [{"descricao": f"Tipo {i}"} for i in range(1, TIPOS_GASTO + 1)])
+        segundos = DIAS_PERIODO * 24 * 3600
+        for inicio in range(0, registros, LINHAS_POR_LOTE):
+            connection.execute(insert(Registro), [
+                {
+                    "dt_hr_gasto": INICIO_PERIODO + timedelta(seconds=gerador.randrange(segundos)),
+                    "vlr_gasto": round(gerador.uniform(1, 2000), 2),
+                    "observacao": " ".join(gerador.choices(PALAVRAS, k=gerador.randint(1, 4))),
+                    "fk_tipo_gasto": gerador.randint(1, TIPOS_GASTO),
+                }
+                for _ in range(min(LINHAS_POR_LOTE, registros - inicio))
+            ])
+
+    db = Session(bind=engine)
+    try:
+        RelatorioService(db).reconstruir_gastos_mensais()
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def copia_de_trabalho(registros: int, semente: int, destino: str, diretorio_cache: str = DIRETORIO_CACHE) -> str:
+    """Retorna uma cópia do banco semeado em `destino`, semeando o cache se necessário"""
+    os.makedirs(diretorio_cache, exist_ok=True)
+    semeado = os.path.join(diretorio_cache, f"kairos_{registros}_{semente}_{impressao_esquema()}.db")
+    if not os.path.exists(semeado):
+        temporario = f"{semeado}.tmp"
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        semear(temporario, registros, semente)
+        os.replace(temporario, semeado)
+
+    copia = os.path.join(destino, os.path.basename(semeado))
+    shutil.copyfile(semeado, copia)
+    return copia
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark das escritas por id: UPDATE/DELETE ... RETURNING x leitura separada da linha
+
+- returning: o UPDATE/DELETE já devolve a linha (PostgreSQL e SQLite 3.35+)
+- sem_returning: caminho dos bancos sem RETURNING, com SELECT antes e/ou depois do comando,
+  o mesmo número de idas ao banco da implementação anterior (SELECT, comando e refresh)
+
+Mede, para cada operação dos services, o tempo médio e as consultas por chamada.
+
+Uso: python -m benchmarks.escrita_returning [--registros 10000] [--repeticoes 500]
+"""
+
+import argparse
+import itertools
+import os
+import tempfile
+import time
+from unittest import mock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.connection import Base
+from src.models import TipoDeGasto
+from src.perfil_sql import capturar_consultas
+from src.schemas import RegistroUpdate, TipoDeGastoUpdate
+from src.services import RegistroService, TipoDeGastoService
+from src.services import retorno
+from src.services.cache import cache_tipos_gasto
+
+
+def _medir(engine, funcao, repeticoes: int, primeiro: int) -> dict:
+    """Tempo médio (ms) e consultas por chamada de `funcao(i)`, com i a partir de `primeiro`"""
+    funcao(primeiro)
+    with capturar_consultas(engine) as coleta:
+        inicio = time.perf_counter()
+        for i in range(primeiro + 1, primeiro + repeticoes + 1):
+            funcao(i)
+        segundos = time.perf_counter() - inicio
+    return {"ms": segundos / repeticoes * 1000, "consultas": coleta.total / repeticoes}
+
+
+def executar(registros: int, repeticoes: int) -> dict:
+    """Cria um banco temporário com `registros` registros e mede os dois caminhos"""
+    resultado = {}
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine = create_engine(f"sqlite:///{os.path.join(diretorio, 'benchmark.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(autocommit=False, bind=engine)()
+
+        tipos = [TipoDeGasto(descricao=f"Benchmark {i}") for i in range(2)]
+        db.add_all(tipos)
+        db.commit()
+        tipo_ids = [tipo.id for tipo in tipos]
+        RegistroService(db).criar_registros_em_lote([
+            {"vlr_gasto": i + 0.99, "observacao": f"Registro {i}", "fk_tipo_gasto": tipo_ids[i % 2]}
+            for i in range(registros)
+        ])
+
+        service = RegistroService(db)
+        tipo_service = TipoDeGastoService(db)
+        # Cada caminho altera e exclui as suas próprias faixas de ids (as exclusões do fim para o
+        # começo), e cada alteração de valor e tipo move o registro no rollup
+        proximo_excluido = iter(range(registros, 0, -1))
+        novo_valor = itertools.count(1.5)
+        operacoes = {
+            "PUT registro (observação)": lambda i: service.atualizar_registro(
+                i % registros + 1, RegistroUpdate(observacao=f"Alterado {i}")
+            ),
+            "PUT registro (valor e tipo)": lambda i: service.atualizar_registro(
+                i % registros + 1, RegistroUpdate(vlr_gasto=next(novo_valor), fk_tipo_gasto=tipo_ids[(i + 1) % 2])
+            ),
+            "PUT tipo de gasto": lambda i: tipo_service.atualizar_tipo_gasto(
+                tipo_ids[0], TipoDeGastoUpdate(descricao=f"Renomeado {i}")
+            ),
+            "DELETE registro": lambda i: service.deletar_registro(next(proximo_excluido)),
+        }
+
+        caminhos = (("returning", retorno.suporta_returning), ("sem_returning", lambda dialeto: False))
+        for n, (caminho, suporta) in enumerate(caminhos):
+            with mock.patch.object(retorno, "suporta_returning", suporta):
+                for nome, operacao in operacoes.items():
+                    cache_tipos_gasto.limpar()
+                    resultado.setdefault(nome, {})[caminho] = _medir(engine, operacao, repeticoes, n * (repeticoes + 1))
+
+        db.close()
+        engine.dispose()
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registros", type=int, default=10000)
+    parser.add_argument("--repeticoes", type=int, default=500)
+    args = parser.parse_args()
+    if args.registros < 4 * (args.repeticoes + 1):
+        parser.error("--registros deve ser pelo menos 4 x (--repeticoes + 1)")
+
+    resultado = executar(args.registros, args.repeticoes)
+    print(f"{'operação':30} {'returning':>22} {'sem returning':>22}")
+    for nome, caminhos in resultado.items():
+        colunas = [
+            f"{caminhos[c]['ms']:7.3f} ms {caminhos[c]['consultas']:4.1f} cons."
+            for c in ("returning", "sem_returning")
+        ]
+        print(f"{nome:30} {colunas[0]:>22} {colunas[1]:>22}")
+
+
+if __name__ == "__main__":
+    main()
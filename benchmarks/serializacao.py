@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da serialização de uma página de registros: caminho Pydantic x caminho rápido
+
+- pydantic: entidades ORM validadas com o response_model (orm_mode) pelo FastAPI e
+  serializadas com o json da biblioteca padrão (JSONResponse)
+- rapido: tuplas do banco convertidas em dicts e serializadas com orjson (ORJSONResponse)
+
+Também mede o tamanho e o custo da compressão gzip (e brotli, se instalado) da página.
+
+Uso: python -m benchmarks.serializacao [--linhas 1000] [--repeticoes 50]
+"""
+
+import argparse
+import asyncio
+import gzip
+import os
+import tempfile
+import time
+from typing import List
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.connection import Base
+from src.models import TipoDeGasto
+from src.schemas import RegistroResponse
+from src.services import RegistroService
+
+
+def _medir(funcao, repeticoes: int) -> float:
+    """Retorna o tempo médio de uma chamada, em milissegundos"""
+    funcao()
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def executar(linhas: int, repeticoes: int) -> dict:
+    """Cria um banco temporário com `linhas` registros e mede os dois caminhos"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine = create_engine(f"sqlite:///{os.path.join(diretorio, 'benchmark.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(autocommit=False, bind=engine)()
+
+        tipo_gasto = TipoDeGasto(descricao="Benchmark")
+        db.add(tipo_gasto)
+        db.commit()
+        RegistroService(db).criar_registros_em_lote([
+            {"vlr_gasto": i + 0.99, "observacao": f"Registro {i}", "fk_tipo_gasto": tipo_gasto.id}
+            for i in range(linhas)
+        ])
+
+        service = RegistroService(db)
+        campo = create_response_field(name="resposta", type_=List[RegistroResponse])
+
+        def caminho_pydantic() -> bytes:
+            db.expunge_all()
+            registros = service.obter_todos_registros(limit=linhas)
+            conteudo = asyncio.run(serialize_response(field=campo, response_content=registros))
+            return JSONResponse(conteudo).body
+
+        def caminho_rapido() -> bytes:
+            registros = service.obter_todos_registros(limit=linhas, como_dicionarios=True)
+            return ORJSONResponse(registros).body
+
+        corpo = caminho_rapido()
+        resultado = {
+            "pydantic_ms": _medir(caminho_pydantic, repeticoes),
+            "rapido_ms": _medir(caminho_rapido, repeticoes),
+            "bytes": len(corpo),
+            "gzip_bytes": len(gzip.compress(corpo, compresslevel=9)),
+            "gzip_ms": _medir(lambda: gzip.compress(corpo, compresslevel=9), repeticoes),
+        }
+        try:
+            import brotli
+        except ImportError:
+            pass
+        else:
+            resultado["brotli_bytes"] = len(brotli.compress(corpo, quality=4))
+            resultado["brotli_ms"] = _medir(lambda: brotli.compress(corpo, quality=4), repeticoes)
+
+        db.close()
+        engine.dispose()
+        return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=1000, help="registros por página")
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    resultado = executar(args.linhas, args.repeticoes)
+    print(f"Página com {args.linhas} registros ({resultado['bytes']} bytes de JSON)")
+    print(f"  pydantic + json:   {resultado['pydantic_ms']:8.2f} ms")
+    print(f"  tuplas + orjson:   {resultado['rapido_ms']:8.2f} ms "
+          f"({resultado['pydantic_ms'] / resultado['rapido_ms']:.1f}x)")
+    print(f"  gzip:              {resultado['gzip_ms']:8.2f} ms -> {resultado['gzip_bytes']} bytes")
+    if "brotli_ms" in resultado:
+        print(f"  brotli:            {resultado['brotli_ms']:8.2f} ms -> {resultado['brotli_bytes']} bytes")
+
+
+if __name__ == "__main__":
+    main()
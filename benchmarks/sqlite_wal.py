@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de vazão do SQLite: modo padrão x modo de produção (WAL + PRAGMAs + fila de escrita)
+
+Várias threads executam uma mistura de escritas (criar_registro) e leituras
+(obter_todos_registros) por alguns segundos em um banco temporário, como as threads
+de requisição do uvicorn fariam.
+
+Uso: python -m benchmarks.sqlite_wal [--threads 16] [--duracao 5] [--escritas 0.2]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from src.connection import Base
+from src.fila_escrita import fila_escrita
+from src.models import TipoDeGasto
+from src.schemas import RegistroCreate
+from src.services import RegistroService
+from src.sqlite_producao import configurar_sqlite_producao
+
+
+def executar_cenario(modo: str, threads: int, duracao: float, proporcao_escritas: float) -> dict:
+    """Executa a carga mista em um banco novo e retorna as vazões medidas"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine = create_engine(
+            f"sqlite:///{os.path.join(diretorio, 'benchmark.db')}",
+            connect_args={"check_same_thread": False},
+            poolclass=QueuePool,
+            pool_size=threads,
+            max_overflow=0
+        )
+        if modo == "producao":
+            configurar_sqlite_producao(engine)
+            fila_escrita.ativar()
+
+        try:
+            Base.metadata.create_all(bind=engine)
+            SessionBenchmark = sessionmaker(autocommit=False, bind=engine)
+
+            db = SessionBenchmark()
+            tipo_gasto = TipoDeGasto(descricao="Benchmark")
+            db.add(tipo_gasto)
+            db.commit()
+            tipo_gasto_id = tipo_gasto.id
+            RegistroService(db).criar_registros_em_lote(
+                [{"vlr_gasto": i + 1, "fk_tipo_gasto": tipo_gasto_id} for i in range(1000)]
+            )
+            db.close()
+
+            contadores = {"escritas": 0, "leituras": 0, "erros": 0}
+            lock = threading.Lock()
+            fim = time.perf_counter() + duracao
+
+            def trabalhador():
+                gerador = random.Random()
+                while time.perf_counter() < fim:
+                    sessao = SessionBenchmark()
+                    escrever = gerador.random() < proporcao_escritas
+                    try:
+                        service = RegistroService(sessao)
+                        if escrever:
+                            service.criar_registro(RegistroCreate(vlr_gasto=10.0, fk_tipo_gasto=tipo_gasto_id))
+                        else:
+                            service.obter_todos_registros(skip=gerador.randint(0, 900), limit=50)
+                        chave = "escritas" if escrever else "leituras"
+                    except OperationalError:
+                        sessao.rollback()
+                        chave = "erros"
+                    finally:
+                        sessao.close()
+                    with lock:
+                        contadores[chave] += 1
+
+            inicio = time.perf_counter()
+            trabalhadores = [threading.Thread(target=trabalhador) for _ in range(threads)]
+            for thread in trabalhadores:
+                thread.start()
+            for thread in trabalhadores:
+                thread.join()
+            decorrido = time.perf_counter() - inicio
+        finally:
+            fila_escrita.desativar()
+            engine.dispose()
+
+    return {
+        "modo": modo,
+        "escritas_por_s": round(contadores["escritas"] / decorrido, 1),
+        "leituras_por_s": round(contadores["leituras"] / decorrido, 1),
+        "erros_database_locked": contadores["erros"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--duracao", type=float, default=5.0, help="segundos por cenário")
+    parser.add_argument("--escritas", type=float, default=0.2, help="proporção de escritas (0 a 1)")
+    args = parser.parse_args()
+
+    print(f"🧪 {args.threads} threads, {args.duracao:.0f}s por cenário, {args.escritas:.0%} de escritas")
+    print(f"{'modo':<10} {'escritas/s':>12} {'leituras/s':>12} {'erros':>8}")
+    for modo in ("padrao", "producao"):
+        resultado = executar_cenario(modo, args.threads, args.duracao, args.escritas)
+        print(
+            f"{resultado['modo']:<10} {resultado['escritas_por_s']:>12} "
+            f"{resultado['leituras_por_s']:>12} {resultado['erros_database_locked']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
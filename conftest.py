@@ -2,6 +2,8 @@
 Configuração para testes da API KAIROS
 """
 
+from contextlib import contextmanager
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -9,8 +11,16 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from main import app
-from src.connection import Base, get_db
+from src.connection import Base, get_db, get_async_db
+from src.controllers import (
+    registro_router, tipo_de_gasto_router,
+    registro_router_async, tipo_de_gasto_router_async,
+    combinar_routers
+)
 from src.models import Registro, TipoDeGasto
+from src.metricas import metricas
+from src.perfil_sql import capturar_consultas
+from src.services.cache import cache_tipos_gasto
 
 # Configurar banco de dados em memória para testes
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -20,6 +30,8 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
+# Mesmo instrumento do engine da aplicação, para o /metrics contar as consultas dos testes
+metricas.instrumentar(engine)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def override_get_db():
@@ -34,6 +46,8 @@ def override_get_db():
 def db_session():
     """Fixture para sessão de banco de dados de teste"""
     Base.metadata.create_all(bind=engine)
+    # Os ids são reaproveitados a cada teste; o cache não pode carregar tipos de outro teste
+    cache_tipos_gasto.limpar()
     db = TestingSessionLocal()
     try:
         yield db
@@ -49,6 +63,50 @@ def client(db_session):
         yield test_client
     app.dependency_overrides.clear()
 
+@pytest.fixture(scope="function")
+def async_client(db_session):
+    """Fixture para cliente de teste das rotas assíncronas (DB_ASYNC=true)"""
+    pytest.importorskip("aiosqlite")
+    from fastapi import FastAPI
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+    AsyncTestingSessionLocal = sessionmaker(async_engine, class_=AsyncSession, autocommit=False, autoflush=False)
+
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+
+    async_app = FastAPI()
+    async_app.include_router(combinar_routers(registro_router, registro_router_async))
+    async_app.include_router(combinar_routers(tipo_de_gasto_router, tipo_de_gasto_router_async))
+    async_app.dependency_overrides[get_db] = override_get_db
+    async_app.dependency_overrides[get_async_db] = override_get_async_db
+    with TestClient(async_app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def orcamento_consultas():
+    """Fixture que falha o teste quando um bloco executa mais consultas que o orçamento
+
+    Uso: `with orcamento_consultas(3): client.get(...)`. Com `max_repeticoes`, também falha
+    quando uma mesma forma de consulta se repete mais vezes que isso (padrão N+1).
+    """
+    @contextmanager
+    def verificar(maximo: int, max_repeticoes: int = None):
+        with capturar_consultas(engine) as coleta:
+            yield coleta
+        assert coleta.total <= maximo, (
+            f"Orçamento de {maximo} consulta(s) excedido\n{coleta.resumo()}"
+        )
+        if max_repeticoes is not None:
+            repetidas = coleta.repetidas(max_repeticoes + 1)
+            assert not repetidas, (
+                f"Consultas repetidas mais de {max_repeticoes} vez(es): {repetidas}\n{coleta.resumo()}"
+            )
+    return verificar
+
 @pytest.fixture
 def sample_tipo_gasto(db_session):
     """Fixture para criar um tipo de gasto de exemplo"""
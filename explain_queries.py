@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Imprime o plano de execução (EXPLAIN / EXPLAIN QUERY PLAN) de cada consulta dos services
+
+Usa o banco configurado em DB_TYPE (SQLite ou PostgreSQL). Execute após cada
+mudança em consultas ou índices para detectar regressões (ex.: "SCAN registros").
+"""
+
+from datetime import datetime
+from src.connection import Base, SessionLocal, engine
+from src.explain import capturar_sql, plano_de_execucao
+from src.services import RegistroService, TipoDeGastoService, RelatorioService
+from src.services.paginacao import codificar_cursor
+
+
+def consultas_dos_services(db):
+    """Retorna (descrição, função) para cada consulta de leitura dos services"""
+    registros = RegistroService(db)
+    tipos_gasto = TipoDeGastoService(db)
+    relatorios = RelatorioService(db)
+    cursor_registro = codificar_cursor("data_desc", datetime.utcnow().isoformat(), 1)
+    cursor_tipo = codificar_cursor(1)
+
+    return [
+        ("RegistroService.obter_registro_por_id", lambda: registros.obter_registro_por_id(1)),
+        ("RegistroService.obter_todos_registros", lambda: registros.obter_todos_registros(skip=1000, limit=100)),
+        ("RegistroService.obter_registros_por_cursor (primeira página)", lambda: registros.obter_registros_por_cursor("", 100)),
+        ("RegistroService.obter_registros_por_cursor (com cursor)", lambda: registros.obter_registros_por_cursor(cursor_registro, 100)),
+        ("RegistroService.obter_todos_registros (período, ordem por valor)", lambda: registros.obter_todos_registros(
+            inicio=datetime(2024, 1, 1), fim=datetime(2024, 1, 31), ordem="valor_desc")),
+        ("RegistroService.obter_todos_registros (faixa de valor)", lambda: registros.obter_todos_registros(
+            valor_min=500, ordem="valor_desc")),
+        ("RegistroService.obter_registros_por_cursor (tipo e faixa de valor)", lambda: registros.obter_registros_por_cursor(
+            "", 100, fk_tipo_gasto=1, valor_min=100, valor_max=500, ordem="valor_asc")),
+        ("RegistroService.buscar_registros", lambda: registros.buscar_registros("uber farmácia", limit=20)),
+        ("RegistroService.obter_registros_por_tipo_gasto", lambda: registros.obter_registros_por_tipo_gasto(1)),
+        ("RegistroService.obter_resumo", registros.obter_resumo),
+        ("TipoDeGastoService.obter_tipo_gasto_por_id", lambda: tipos_gasto.obter_tipo_gasto_por_id(1)),
+        ("TipoDeGastoService.obter_tipo_gasto_por_descricao", lambda: tipos_gasto.obter_tipo_gasto_por_descricao("Alimentação")),
+        ("TipoDeGastoService.obter_todos_tipos_gasto", lambda: tipos_gasto.obter_todos_tipos_gasto(skip=0, limit=100)),
+        ("TipoDeGastoService.obter_tipos_gasto_por_cursor", lambda: tipos_gasto.obter_tipos_gasto_por_cursor(cursor_tipo, 100)),
+        ("RelatorioService.obter_gastos_mensais", lambda: relatorios.obter_gastos_mensais(inicio="2024-01", fim="2024-12")),
+    ]
+
+
+def main():
+    """Executa cada consulta capturando o SQL e imprime o plano correspondente"""
+    Base.metadata.create_all(bind=engine)
+    print(f"🗄️  Banco: {engine.dialect.name}")
+
+    db = SessionLocal()
+    try:
+        for descricao, consulta in consultas_dos_services(db):
+            with capturar_sql(engine) as capturados:
+                consulta()
+
+            print("\n" + "=" * 60)
+            print(f"🔎 {descricao}")
+            print("=" * 60)
+            with engine.connect() as connection:
+                for statement, parameters in capturados:
+                    print(statement.strip())
+                    print("-" * 60)
+                    for linha in plano_de_execucao(connection, statement, parameters):
+                        print(f"   {linha}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
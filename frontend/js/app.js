@@ -71,7 +71,7 @@ function setupForms() {
 // Carregar tipos de gasto
 async function loadTiposGasto() {
     try {
-        const response = await fetch(`${API_BASE_URL}/tipos-gasto/`);
+        const response = await fetch(`${API_BASE_URL}/tipos-gasto/?include=none`);
         if (!response.ok) throw new Error('Erro ao carregar tipos de gasto');
         
         tiposGasto = await response.json();
@@ -122,7 +122,7 @@ function renderTiposGasto() {
             <div class="list-item-info">
                 <div class="list-item-title">${tipo.descricao}</div>
                 <div class="list-item-subtitle">
-                    ${tipo.registros.length} registro(s) associado(s)
+                    ${tipo.total_registros} registro(s) associado(s)
                 </div>
             </div>
             <div class="list-item-actions">
@@ -182,16 +182,26 @@ function renderRegistros() {
 }
 
 // Atualizar dashboard
-function updateDashboard() {
-    // Total de gastos
-    const totalGastos = registros.reduce((sum, registro) => sum + registro.vlr_gasto, 0);
-    document.getElementById('total-gastos').textContent = `R$ ${totalGastos.toFixed(2)}`;
-    
-    // Total de tipos
-    document.getElementById('total-tipos').textContent = tiposGasto.length;
-    
-    // Total de registros
-    document.getElementById('total-registros').textContent = registros.length;
+async function updateDashboard() {
+    try {
+        // Totais calculados no servidor (payload de tamanho constante)
+        const response = await fetch(`${API_BASE_URL}/registros/resumo`);
+        if (!response.ok) throw new Error('Erro ao carregar resumo');
+        
+        const resumo = await response.json();
+        
+        // Total de gastos
+        document.getElementById('total-gastos').textContent = `R$ ${resumo.total_gasto.toFixed(2)}`;
+        
+        // Total de tipos
+        document.getElementById('total-tipos').textContent = resumo.por_tipo.length;
+        
+        // Total de registros
+        document.getElementById('total-registros').textContent = resumo.total_registros;
+        
+    } catch (error) {
+        console.error('Erro ao atualizar dashboard:', error);
+    }
     
     // Últimos gastos
     updateUltimosGastos();
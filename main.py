@@ -1,43 +1,118 @@
-from fastapi import FastAPI, HTTPException
+# Primeiro import: marca o início da partida a frio medida em /internal/inicializacao
+from src.inicializacao import (
+    relatorio_inicializacao, aquecer_pool, aquecer_pool_async,
+    precompilar_consultas, precompilar_consultas_async, verificar_revisao
+)
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from contextlib import asynccontextmanager
-from src.connection import teste_conexao, Base, engine
-from src.controllers import registro_router, tipo_de_gasto_router
+from src.connection import (
+    teste_conexao, Base, engine, async_engine, SessionLocal, AsyncSessionLocal, DB_ASYNC,
+    PERFIL_SQL, perfil_sql, INICIALIZACAO, DB_POOL_AQUECER
+)
+from src.controllers import (
+    registro_router, tipo_de_gasto_router,
+    registro_router_async, tipo_de_gasto_router_async,
+    monitoramento_router, metricas_router, relatorio_router, combinar_routers
+)
+from src.middleware import MiddlewareETag, MiddlewareMetricas, MiddlewarePerfilSQL, MiddlewarePrimeiraRequisicao
+from src.respostas import RespostaJSON, configurar_compressao
+from src.models import garantir_busca_textual
+from src.services import RelatorioService
+from src.saude import monitor_saude
 import os
 
+
+def preencher_rollup() -> int:
+    """Backfill de gastos_mensais quando a tabela está vazia e já existem registros"""
+    db = SessionLocal()
+    try:
+        return RelatorioService(db).preencher_gastos_mensais()
+    finally:
+        db.close()
+
+
 # Criar tabelas no banco de dados
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     print("Iniciando API KAIROS...")
+    relatorio_inicializacao.modo = INICIALIZACAO
     try:
-        # Testar conexão com o banco
-        teste_conexao()
+        if INICIALIZACAO == "rapida":
+            # Esquema aplicado antes do deploy (python manage.py migrate): sem reflexão por worker
+            relatorio_inicializacao.medir("revisao", verificar_revisao, engine)
+            # Aquece o engine que atende as rotas (o AsyncEngine com DB_ASYNC=true)
+            if async_engine is not None:
+                await relatorio_inicializacao.medir_async("pool", aquecer_pool_async, async_engine, DB_POOL_AQUECER)
+                await relatorio_inicializacao.medir_async("consultas", precompilar_consultas_async, AsyncSessionLocal)
+            else:
+                relatorio_inicializacao.medir("pool", aquecer_pool, engine, DB_POOL_AQUECER)
+                relatorio_inicializacao.medir("consultas", precompilar_consultas, SessionLocal)
+        else:
+            # Testar conexão com o banco
+            relatorio_inicializacao.medir("conexao", teste_conexao)
+            
+            # Criar tabelas se não existirem
+            relatorio_inicializacao.medir("esquema", Base.metadata.create_all, engine)
+            print("Tabelas criadas/verificadas com sucesso!")
+
+            # Banco anterior à busca textual: a tabela FTS5 e os triggers só nascem com registros
+            relatorio_inicializacao.medir("busca", garantir_busca_textual, engine)
+
+            # Banco anterior ao rollup: gastos_mensais acabou de ser criada vazia
+            relatorio_inicializacao.medir("rollup", preencher_rollup)
         
-        # Criar tabelas se não existirem
-        Base.metadata.create_all(bind=engine)
-        print("Tabelas criadas/verificadas com sucesso!")
+        # Verificação do banco em segundo plano usada por /health/ready
+        await monitor_saude.iniciar()
         
     except Exception as e:
         print(f"Erro ao inicializar: {e}")
         raise
     
+    relatorio_inicializacao.marcar_pronto()
+    print(relatorio_inicializacao.resumo())
     yield
     
     # Shutdown
     print("Finalizando API KAIROS...")
+    await monitor_saude.parar()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 # Criar aplicação FastAPI
 app = FastAPI(
     title="API KAIROS",
     description="API para controle de gastos pessoais",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=RespostaJSON
 )
 
-# Configurar CORS
+# GET condicional (ETag/If-None-Match) nas rotas de registros, tipos de gasto e relatórios;
+# o run.py o desativa com vários workers e versão dos dados em memória
+if os.getenv("ETAG_ATIVO", "true").lower() == "true":
+    app.add_middleware(MiddlewareETag, prefixos=("/registros", "/tipos-gasto", "/relatorios"))
+
+# Compressão das respostas acima de COMPRESSAO_MIN_BYTES (gzip, ou brotli se instalado)
+configurar_compressao(app)
+
+# Perfil das consultas de cada requisição (PERFIL_SQL=true, apenas desenvolvimento)
+if PERFIL_SQL:
+    app.add_middleware(MiddlewarePerfilSQL, perfil=perfil_sql)
+
+# Métricas por rota em /metrics; adicionado depois dos demais para medir a requisição inteira
+METRICAS_ATIVAS = os.getenv("METRICAS_ATIVAS", "true").lower() == "true"
+if METRICAS_ATIVAS:
+    app.add_middleware(MiddlewareMetricas)
+
+# Registra o fim da partida a frio (primeira requisição atendida)
+app.add_middleware(MiddlewarePrimeiraRequisicao)
+
+# Configurar CORS; adicionado por último (mais externo) para que as respostas dos próprios
+# middlewares, como o 304 do ETag, também recebam os cabeçalhos CORS
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Em produção, especificar domínios permitidos
@@ -46,9 +121,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Incluir rotas
-app.include_router(registro_router)
-app.include_router(tipo_de_gasto_router)
+# Incluir rotas (DB_ASYNC=true usa as rotas async def com AsyncSession onde disponíveis)
+if DB_ASYNC:
+    app.include_router(combinar_routers(registro_router, registro_router_async))
+    app.include_router(combinar_routers(tipo_de_gasto_router, tipo_de_gasto_router_async))
+else:
+    app.include_router(registro_router)
+    app.include_router(tipo_de_gasto_router)
+app.include_router(relatorio_router)
+app.include_router(monitoramento_router)
+if METRICAS_ATIVAS:
+    app.include_router(metricas_router)
 
 # Servir arquivos estáticos do frontend
 frontend_path = os.path.join(os.path.dirname(__file__), "frontend")
@@ -70,23 +153,39 @@ async def root():
             "endpoints": {
                 "docs": "/docs",
                 "health": "/health",
+                "live": "/health/live",
+                "ready": "/health/ready",
                 "tipos_gasto": "/tipos-gasto/",
                 "registros": "/registros/"
             }
         }
 
 
+@app.get("/health/live")
+async def liveness():
+    """Sonda de vida: responde sem E/S enquanto o processo atende requisições"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """Sonda de prontidão: último resultado da verificação do banco e saturação do pool (503 se não pronto)"""
+    estado = monitor_saude.estado()
+    return RespostaJSON(estado, status_code=200 if estado["pronto"] else 503)
+
+
 @app.get("/health")
 async def health_check():
-    """Endpoint para verificar saúde da API"""
-    try:
-        teste_conexao()
-        return {
-            "status": "healthy",
-            "database": "connected"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=503, detail=f"Database connection failed: {str(e)}")
+    """Endpoint para verificar saúde da API (usa a verificação em segundo plano, sem abrir conexão)"""
+    estado = monitor_saude.estado()
+    if not estado["banco"]["ok"]:
+        return RespostaJSON(
+            {"detail": f"Database connection failed: {estado['banco']['erro']}"}, status_code=503
+        )
+    return {
+        "status": "healthy",
+        "database": "connected"
+    }
 
 
 if __name__ == "__main__":
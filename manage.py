@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comandos de manutenção da API KAIROS
+
+Uso:
+    python manage.py migrate           Aplica as migrações do Alembic (antes de subir os workers)
+    python manage.py rebuild-mensal    Recalcula a tabela gastos_mensais a partir de registros
+"""
+
+import argparse
+import os
+import time
+from src.connection import Base, SessionLocal, engine, DATABASE_URL
+from src.services import RelatorioService
+
+DIRETORIO_PROJETO = os.path.dirname(os.path.abspath(__file__))
+
+
+def configuracao_alembic(url: str = None):
+    """Config do Alembic do projeto, independente do diretório atual"""
+    from alembic.config import Config
+
+    config = Config(os.path.join(DIRETORIO_PROJETO, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(DIRETORIO_PROJETO, "alembic"))
+    config.attributes["url"] = url or DATABASE_URL
+    return config
+
+
+def migrar(args):
+    """Aplica as migrações até `revisao` uma única vez por deploy (workers com INICIALIZACAO=rapida)"""
+    from alembic import command
+
+    config = configuracao_alembic(args.url)
+    inicio = time.perf_counter()
+    if args.marcar:
+        # Banco criado por create_all: registra a revisão sem executar as migrações
+        command.stamp(config, args.revisao)
+        print(f"🏷️  Banco marcado na revisão {args.revisao}")
+        return
+    command.upgrade(config, args.revisao, sql=args.sql)
+    if not args.sql:
+        print(f"🗄️  Migrações aplicadas até {args.revisao} em {time.perf_counter() - inicio:.2f}s")
+
+
+def reconstruir_mensal(args):
+    """Recalcula o rollup mensal (backfill ou correção após alterações fora da API)"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        inicio = time.perf_counter()
+        linhas = RelatorioService(db).reconstruir_gastos_mensais()
+        print(f"📊 gastos_mensais reconstruída: {linhas} linhas em {time.perf_counter() - inicio:.2f}s")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    migrate = comandos.add_parser("migrate", help="aplica as migrações do Alembic")
+    migrate.add_argument("--revisao", default="head", help="revisão de destino (padrão: head)")
+    migrate.add_argument("--url", help="URL do banco (padrão: a mesma da aplicação)")
+    migrate.add_argument("--sql", action="store_true", help="apenas imprime o SQL (modo offline)")
+    migrate.add_argument("--marcar", action="store_true", help="marca a revisão sem executar (bancos criados por create_all)")
+    migrate.set_defaults(executar=migrar)
+    comandos.add_parser("rebuild-mensal", help="recalcula gastos_mensais").set_defaults(executar=reconstruir_mensal)
+
+    args = parser.parse_args()
+    args.executar(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,169 @@
 #!/usr/bin/env python3
 """
 Script para executar a API KAIROS
+
+Desenvolvimento (API_DEBUG=true): um processo uvicorn com reload.
+Produção (padrão): API_WORKERS processos (padrão: número de CPUs) sob o gunicorn com
+workers uvicorn, ou sob o supervisor de processos do próprio uvicorn se o gunicorn não
+estiver instalado (ou no Windows).
 """
 
-import uvicorn
+import importlib.util
 import os
+import sys
+import uvicorn
 from dotenv import load_dotenv
 
+
+def _instalado(modulo: str) -> bool:
+    return importlib.util.find_spec(modulo) is not None
+
+
+def escolher_loop(preferido: str) -> str:
+    """uvloop quando disponível (não existe no Windows), senão asyncio"""
+    if preferido != "auto":
+        return preferido
+    return "uvloop" if _instalado("uvloop") and sys.platform != "win32" else "asyncio"
+
+
+def escolher_http(preferido: str) -> str:
+    """httptools quando disponível, senão h11"""
+    if preferido != "auto":
+        return preferido
+    return "httptools" if _instalado("httptools") else "h11"
+
+
+def dividir_conexoes(total: int, workers: int) -> int:
+    """Conexões do pool de cada worker para que todos juntos não passem de `total`"""
+    if workers > total:
+        raise ValueError(f"DB_CONEXOES_TOTAIS={total} não comporta {workers} workers (mínimo de 1 conexão por worker)")
+    return total // workers
+
+
+def limitar_workers(workers: int) -> int:
+    """Reduz os workers ao orçamento DB_CONEXOES_TOTAIS, que precisa de ao menos uma conexão por worker"""
+    total = int(os.getenv("DB_CONEXOES_TOTAIS") or 0)
+    if 0 < total < workers:
+        print(f"⚠️  DB_CONEXOES_TOTAIS={total}: workers reduzidos de {workers} para {total}")
+        return total
+    return workers
+
+
+def configurar_caches(workers: int) -> bool:
+    """Desativa o ETag e o cache de tipos de gasto com vários workers sem CACHE_BACKEND=redis
+
+    Com CACHE_BACKEND=memoria cada worker tem o seu contador de versão e o seu cache: uma
+    escrita em um worker não invalida os ETags dos outros, que responderiam 304 com dados
+    antigos, nem os tipos que eles guardaram, que seguiriam aceitos por até
+    TIPO_GASTO_CACHE_TTL segundos depois de excluídos ou renomeados. Retorna se ficam ativos.
+    """
+    if workers > 1 and os.getenv("CACHE_BACKEND", "memoria") != "redis":
+        os.environ["ETAG_ATIVO"] = "false"
+        os.environ["TIPO_GASTO_CACHE_MAX"] = "0"
+        print("⚠️  ETag e cache de tipos de gasto desativados: com vários workers, use CACHE_BACKEND=redis")
+        return False
+    return os.getenv("ETAG_ATIVO", "true").lower() == "true"
+
+
+def configurar_pool_por_worker(workers: int):
+    """Deriva DB_POOL_SIZE/DB_MAX_OVERFLOW de DB_CONEXOES_TOTAIS antes de importar a aplicação
+
+    O pool é por processo: com N workers, o banco recebe até N x (pool_size + max_overflow)
+    conexões. Com um orçamento total, cada worker fica com a sua parte e sem overflow.
+    """
+    total = int(os.getenv("DB_CONEXOES_TOTAIS") or 0)
+    if total <= 0:
+        return None
+    por_worker = dividir_conexoes(total, workers)
+    os.environ["DB_POOL_SIZE"] = str(por_worker)
+    os.environ["DB_MAX_OVERFLOW"] = "0"
+    os.environ.setdefault("DB_POOL_AQUECER", str(por_worker))
+    return por_worker
+
+
+def executar_gunicorn(opcoes: dict, loop: str, http: str):
+    """Gunicorn com workers uvicorn, app pré-carregada no processo mestre e reinício gracioso"""
+    from gunicorn.app.base import BaseApplication
+    from uvicorn.workers import UvicornWorker
+
+    class WorkerKairos(UvicornWorker):
+        CONFIG_KWARGS = {"loop": loop, "http": http}
+
+    def apos_fork(server, worker):
+        # Com a app pré-carregada, o engine foi criado no mestre; conexões não podem ser herdadas
+        from src.connection import engine
+        from src.services.cache import versao_dados
+        engine.dispose()
+        # Nem a época da versão dos dados em memória: cada worker precisa da sua
+        versao_dados.reiniciar()
+
+    class AplicacaoGunicorn(BaseApplication):
+        def load_config(self):
+            for chave, valor in {**opcoes, "worker_class": WorkerKairos, "post_fork": apos_fork}.items():
+                self.cfg.set(chave, valor)
+
+        def load(self):
+            from main import app
+            return app
+
+    AplicacaoGunicorn().run()
+
+
 def main():
     """Executa a API com configurações do ambiente"""
     # Carregar variáveis de ambiente
     load_dotenv()
-    
+
     # Configurações padrão
     host = os.getenv("API_HOST", "0.0.0.0")
     port = int(os.getenv("API_PORT", 8000))
-    debug = os.getenv("API_DEBUG", "True").lower() == "true"
-    
+    debug = os.getenv("API_DEBUG", "False").lower() == "true"
+    workers = 1 if debug else int(os.getenv("API_WORKERS") or 0) or os.cpu_count() or 1
+    loop = escolher_loop(os.getenv("API_LOOP", "auto"))
+    http = escolher_http(os.getenv("API_HTTP", "auto"))
+    gerenciador = "uvicorn"
+    if not debug and workers > 1 and _instalado("gunicorn") and sys.platform != "win32":
+        gerenciador = "gunicorn"
+    workers = limitar_workers(workers)
+    pool_por_worker = configurar_pool_por_worker(workers)
+    configurar_caches(workers)
+
     print("🚀 Iniciando API KAIROS...")
     print(f"📍 Host: {host}")
     print(f"🔌 Porta: {port}")
     print(f"🐛 Debug: {debug}")
+    print(f"⚙️  Workers: {workers} ({gerenciador}, loop {loop}, http {http})")
+    if pool_por_worker:
+        print(f"🗄️  Pool por worker: {pool_por_worker} conexões (DB_CONEXOES_TOTAIS={os.environ['DB_CONEXOES_TOTAIS']})")
     print(f"📚 Documentação: http://{host}:{port}/docs")
     print("=" * 50)
-    
+
     # Executar a API
-    uvicorn.run(
-        "main:app",
-        host=host,
-        port=port,
-        reload=debug,
-        log_level="info" if debug else "warning"
-    )
+    if debug:
+        uvicorn.run("main:app", host=host, port=port, reload=True, loop=loop, http=http, log_level="info")
+    elif gerenciador == "gunicorn":
+        executar_gunicorn({
+            "bind": f"{host}:{port}",
+            "workers": workers,
+            "preload_app": os.getenv("API_PRELOAD", "true").lower() == "true",
+            "graceful_timeout": int(os.getenv("API_GRACEFUL_TIMEOUT", 30)),
+            "timeout": int(os.getenv("API_TIMEOUT", 60)),
+            "keepalive": int(os.getenv("API_KEEPALIVE", 5)),
+            # Recicla cada worker após N requisições (com variação) para conter vazamentos; 0 desativa
+            "max_requests": int(os.getenv("API_MAX_REQUESTS", 0)),
+            "max_requests_jitter": int(os.getenv("API_MAX_REQUESTS_JITTER", 0)),
+            "loglevel": "warning",
+        }, loop, http)
+    else:
+        uvicorn.run(
+            "main:app",
+            host=host,
+            port=port,
+            workers=workers,
+            loop=loop,
+            http=http,
+            log_level="warning"
+        )
 
 if __name__ == "__main__":
     main()
@@ -55,10 +55,6 @@ def install_dependencies():
     """Instala as dependências do projeto"""
     return run_command("pip install -r requirements.txt", "Instalando dependências")
 
-def create_migration():
-    """Cria a migração inicial"""
-    return run_command("alembic revision --autogenerate -m 'Initial migration'", "Criando migração inicial")
-
 def apply_migrations():
     """Aplica as migrações"""
     return run_command("alembic upgrade head", "Aplicando migrações")
@@ -78,7 +74,6 @@ def main():
     # Instalação e configuração
     steps = [
         (install_dependencies, "Instalação de dependências"),
-        (create_migration, "Criação de migração"),
         (apply_migrations, "Aplicação de migrações")
     ]
     
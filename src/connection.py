@@ -1,6 +1,11 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
+from src.pool_stats import EstatisticasPool, criar_pool_monitorado
+from src.metricas import metricas
+from src.perfil_sql import PerfilSQL
+from src.sqlite_producao import configurar_sqlite_producao
+from src.fila_escrita import fila_escrita
 import os
 
 load_dotenv()
@@ -15,16 +20,111 @@ if DB_TYPE == "postgresql":
     db = os.getenv("DB_NAME")
     port = os.getenv('DB_PORT')
     DATABASE_URL = f'postgresql://{user}:{password}@{host}:{port}/{db}'
+    ASYNC_DATABASE_URL = f'postgresql+asyncpg://{user}:{password}@{host}:{port}/{db}'
 else:
     # SQLite para desenvolvimento
-    DATABASE_URL = "sqlite:///./kairos.db"
+    SQLITE_PATH = os.getenv("SQLITE_PATH", "./kairos.db")
+    DATABASE_URL = f"sqlite:///{SQLITE_PATH}"
+    ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{SQLITE_PATH}"
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if DB_TYPE == "sqlite" else {})
+# SQLite: "padrao" (journal de rollback) ou "producao" (WAL, PRAGMAs e fila de escrita)
+SQLITE_MODO = os.getenv("SQLITE_MODO", "padrao")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", 65536))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 268435456))
+SQLITE_PRODUCAO = DB_TYPE != "postgresql" and SQLITE_MODO == "producao"
+
+# Caminho assíncrono (AsyncEngine + AsyncSession); requer asyncpg ou aiosqlite
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() == "true"
+
+# Configuração do pool de conexões (por processo/worker)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # segundos; -1 desativa
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))  # 0 desativa (apenas PostgreSQL)
+
+# Inicialização do worker: "completa" (testa a conexão e executa create_all) ou "rapida"
+# (esquema aplicado por `python manage.py migrate`; aquece DB_POOL_AQUECER conexões e as consultas)
+INICIALIZACAO = os.getenv("INICIALIZACAO", "completa")
+DB_POOL_AQUECER = int(os.getenv("DB_POOL_AQUECER", DB_POOL_SIZE))
+
+# Perfil de consultas (desenvolvimento) e log de consultas lentas
+PERFIL_SQL = os.getenv("PERFIL_SQL", "false").lower() == "true"
+SQL_LENTO_MS = float(os.getenv("SQL_LENTO_MS", 500))  # 0 desativa
+SQL_LIMITE_REPETICOES = int(os.getenv("SQL_LIMITE_REPETICOES", 3))
+
+connect_args = {}
+if DB_TYPE == "sqlite":
+    connect_args["check_same_thread"] = False
+elif DB_STATEMENT_TIMEOUT_MS > 0:
+    connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+
+pool_args = {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_recycle": DB_POOL_RECYCLE,
+    "pool_pre_ping": DB_POOL_PRE_PING,
+}
+
+estatisticas_pool = EstatisticasPool()
+perfil_sql = PerfilSQL(PERFIL_SQL, SQL_LENTO_MS, SQL_LIMITE_REPETICOES)
+engine = create_engine(
+    DATABASE_URL,
+    connect_args=connect_args,
+    poolclass=criar_pool_monitorado(estatisticas_pool),
+    **pool_args
+)
+estatisticas_pool.instrumentar(engine)
+metricas.instrumentar(engine)
+perfil_sql.instrumentar(engine)
+
+sqlite_pragmas = {
+    "busy_timeout_ms": SQLITE_BUSY_TIMEOUT_MS,
+    "cache_size_kb": SQLITE_CACHE_SIZE_KB,
+    "mmap_size": SQLITE_MMAP_SIZE,
+}
+if SQLITE_PRODUCAO:
+    configurar_sqlite_producao(engine, **sqlite_pragmas)
+    fila_escrita.ativar()
 
 SessionLocal = sessionmaker(autocommit=False, bind=engine)
 
 Base = declarative_base()
 
+async_engine = None
+AsyncSessionLocal = None
+estatisticas_pool_async = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    async_connect_args = {}
+    if DB_TYPE == "postgresql" and DB_STATEMENT_TIMEOUT_MS > 0:
+        async_connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+    # Contadores próprios: o pool do AsyncEngine é outro, com as suas conexões e esperas
+    estatisticas_pool_async = EstatisticasPool()
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        connect_args=async_connect_args,
+        poolclass=criar_pool_monitorado(estatisticas_pool_async, AsyncAdaptedQueuePool),
+        **pool_args
+    )
+    estatisticas_pool_async.instrumentar(async_engine.sync_engine)
+    if SQLITE_PRODUCAO:
+        configurar_sqlite_producao(async_engine.sync_engine, **sqlite_pragmas)
+    metricas.instrumentar(async_engine.sync_engine)
+    perfil_sql.instrumentar(async_engine.sync_engine)
+    AsyncSessionLocal = sessionmaker(async_engine, class_=AsyncSession, autocommit=False)
+
+# Pool que atende as rotas de CRUD (o do AsyncEngine com DB_ASYNC=true) e as suas estatísticas
+if async_engine is not None:
+    engine_rotas, estatisticas_pool_rotas = async_engine.sync_engine, estatisticas_pool_async
+else:
+    engine_rotas, estatisticas_pool_rotas = engine, estatisticas_pool
+
 
 def get_db():
     """Dependency para obter sessão do banco de dados"""
@@ -35,6 +135,12 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency para obter sessão assíncrona do banco de dados (DB_ASYNC=true)"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def teste_conexao():
     """Testa a conexão com o banco de dados"""
     try:
@@ -1,4 +1,35 @@
+from fastapi import APIRouter
 from .registro_controller import router as registro_router
 from .tipo_de_gasto_controller import router as tipo_de_gasto_router
+from .registro_controller_async import router as registro_router_async
+from .tipo_de_gasto_controller_async import router as tipo_de_gasto_router_async
+from .monitoramento_controller import router as monitoramento_router, metricas_router
+from .relatorio_controller import router as relatorio_router
 
-__all__ = ["registro_router", "tipo_de_gasto_router"]
+
+def combinar_routers(base: APIRouter, substitutos: APIRouter) -> APIRouter:
+    """Retorna um router com as rotas de `base`, trocando pelas de `substitutos` as de mesmo caminho e método
+
+    A ordem de `base` é preservada, então rotas fixas (ex.: /registros/export) continuam
+    antes das rotas com parâmetros (ex.: /registros/{registro_id}).
+    """
+    rotas_substitutas = {
+        (rota.path, metodo): rota
+        for rota in substitutos.routes
+        for metodo in getattr(rota, "methods", None) or ()
+    }
+
+    combinado = APIRouter()
+    for rota in base.routes:
+        metodos = getattr(rota, "methods", None) or ()
+        substituta = next((rotas_substitutas[(rota.path, m)] for m in metodos if (rota.path, m) in rotas_substitutas), None)
+        combinado.routes.append(substituta or rota)
+    return combinado
+
+
+__all__ = [
+    "registro_router", "tipo_de_gasto_router",
+    "registro_router_async", "tipo_de_gasto_router_async",
+    "monitoramento_router", "metricas_router", "relatorio_router",
+    "combinar_routers"
+]
@@ -0,0 +1,36 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from src.connection import engine_rotas, estatisticas_pool_rotas
+from src.inicializacao import relatorio_inicializacao
+from src.metricas import metricas
+from src.services.cache import cache_tipos_gasto
+
+# Endpoints internos de observabilidade; não exponha publicamente
+router = APIRouter(prefix="/internal", tags=["monitoramento"])
+# /metrics fica na raiz, onde o Prometheus procura por padrão
+metricas_router = APIRouter(tags=["monitoramento"])
+
+
+@router.get("/pool")
+def obter_estatisticas_pool():
+    """Obtém o estado do pool de conexões que atende as rotas neste worker (em uso, ociosas, overflow e tempos de espera)"""
+    return estatisticas_pool_rotas.snapshot(engine_rotas)
+
+
+@router.get("/cache")
+def obter_estatisticas_cache():
+    """Obtém acertos, falhas e ocupação do cache de tipos de gasto deste worker"""
+    return cache_tipos_gasto.estatisticas()
+
+
+
+@router.get("/inicializacao")
+def obter_tempos_inicializacao():
+    """Obtém o modo de inicialização deste worker, a duração de cada etapa e o tempo até a primeira requisição"""
+    return relatorio_inicializacao.como_dicionario()
+
+
+@metricas_router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def exportar_metricas():
+    """Exporta contagens, status, latências e tempo de banco por rota no formato texto do Prometheus"""
+    return PlainTextResponse(metricas.exportar(), media_type="text/plain; version=0.0.4")
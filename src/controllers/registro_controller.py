@@ -1,12 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from typing import List, Literal, Optional, Union
 from src.connection import get_db
+from src.respostas import JSON_RAPIDO, RespostaJSON
 from src.services import RegistroService
-from src.schemas import RegistroCreate, RegistroResponse, RegistroUpdate
+from src.services.formatos import gerar_csv, gerar_ndjson, ler_csv, ler_ndjson
+from src.schemas import (
+    RegistroCreate, RegistroResponse, RegistroUpdate, RegistroPagina, ResumoResponse,
+    IdsRequest, RegistroPorIdsResponse, RegistroLoteCreate, RegistroLoteResponse, ImportacaoResponse
+)
 
 router = APIRouter(prefix="/registros", tags=["registros"])
 
+# Limite de ids na query string (?ids=1,2,3); conjuntos maiores vão no corpo de POST /batch-get
+MAX_IDS_CONSULTA = 1000
+
 
 @router.post("/", response_model=RegistroResponse, status_code=status.HTTP_201_CREATED)
 def criar_registro(registro_data: RegistroCreate, db: Session = Depends(get_db)):
@@ -18,11 +28,188 @@ def criar_registro(registro_data: RegistroCreate, db: Session = Depends(get_db))
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
-@router.get("/", response_model=List[RegistroResponse])
-def obter_registros(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Obtém todos os registros com paginação"""
+@router.post("/bulk", response_model=RegistroLoteResponse, status_code=status.HTTP_201_CREATED)
+def criar_registros_em_lote(lote: RegistroLoteCreate, db: Session = Depends(get_db)):
+    """Cria vários registros em uma única transação
+
+    Retorna os ids criados e os erros por item. Com `tudo_ou_nada` (padrão), qualquer
+    item inválido faz a requisição falhar com 400 sem criar nenhum registro.
+    """
+    try:
+        service = RegistroService(db)
+        resultado = service.criar_registros_em_lote(lote.registros, tudo_ou_nada=lote.tudo_ou_nada)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if resultado["erros"] and (lote.tudo_ou_nada or not resultado["ids"]):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"mensagem": "Nenhum registro criado: o lote contém itens inválidos", "erros": resultado["erros"]}
+        )
+    return resultado
+
+
+@router.post("/import", response_model=ImportacaoResponse)
+def importar_registros(
+    arquivo: UploadFile = File(..., description="Arquivo CSV (com cabeçalho) ou NDJSON"),
+    formato: Optional[Literal["csv", "ndjson"]] = Query(
+        None, alias="format", description="Padrão: deduzido da extensão do arquivo"
+    ),
+    tamanho_lote: int = Query(5000, ge=1, le=100000, description="Linhas confirmadas por transação"),
+    criar_tipos: bool = Query(False, description="Cria tipos de gasto informados por descrição que não existirem"),
+    db: Session = Depends(get_db)
+):
+    """Importa registros de um arquivo CSV ou NDJSON lido linha a linha
+
+    Colunas aceitas: vlr_gasto, observacao, dt_hr_gasto e fk_tipo_gasto ou tipo_gasto
+    (descrição). Retorna as contagens e as linhas rejeitadas com seus erros.
+    """
+    if formato is None:
+        nome = (arquivo.filename or "").lower()
+        formato = "ndjson" if nome.endswith((".ndjson", ".jsonl")) else "csv"
+    linhas = ler_ndjson(arquivo.file) if formato == "ndjson" else ler_csv(arquivo.file)
+
+    try:
+        service = RegistroService(db)
+        return service.importar_registros(linhas, tamanho_lote=tamanho_lote, criar_tipos=criar_tipos)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def filtros_registros(
+    inicio: Optional[datetime] = Query(None, description="Data/hora inicial (inclusiva)"),
+    fim: Optional[datetime] = Query(None, description="Data/hora final (inclusiva)"),
+    valor_min: Optional[float] = Query(None, description="Valor mínimo (inclusivo)"),
+    valor_max: Optional[float] = Query(None, description="Valor máximo (inclusivo)"),
+    fk_tipo_gasto: Optional[int] = None
+) -> dict:
+    """Filtros opcionais das listagens de registros"""
+    return {"inicio": inicio, "fim": fim, "valor_min": valor_min, "valor_max": valor_max, "fk_tipo_gasto": fk_tipo_gasto}
+
+
+def ids_consulta(
+    ids: Optional[str] = Query(
+        None, description=f"IDs separados por vírgula (até {MAX_IDS_CONSULTA}); ignora paginação e filtros"
+    )
+) -> Optional[List[int]]:
+    """Lê ?ids=1,2,3 como lista de inteiros"""
+    if ids is None:
+        return None
+    try:
+        valores = [int(valor) for valor in ids.split(",") if valor.strip()]
+    except ValueError:
+        valores = []
+    if not valores:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids deve ser uma lista de inteiros separados por vírgula"
+        )
+    if len(valores) > MAX_IDS_CONSULTA:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Envie no máximo {MAX_IDS_CONSULTA} ids na URL; para mais, use POST batch-get"
+        )
+    return valores
+
+
+@router.get("/", response_model=Union[List[RegistroResponse], RegistroPorIdsResponse, RegistroPagina])
+def obter_registros(
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor opaco; envie vazio para a primeira página"),
+    ordem: Optional[Literal["data_desc", "data_asc", "valor_desc", "valor_asc"]] = Query(
+        None, description="Ordenação; padrão: ordem natural com skip/limit, data_desc com cursor"
+    ),
+    filtros: dict = Depends(filtros_registros),
+    ids: Optional[List[int]] = Depends(ids_consulta),
+    db: Session = Depends(get_db)
+):
+    """Obtém os registros com paginação, filtros por período, valor e tipo e ordenação
+
+    Sem `cursor`, mantém a paginação por skip/limit e retorna uma lista.
+    Com `cursor`, pagina por chave (coluna de `ordem`, id) e retorna os itens e o `next_cursor`.
+    Com `ids`, retorna esses registros na ordem pedida e os `ausentes`.
+    Com JSON_RAPIDO, a resposta é montada das tuplas e serializada com orjson, sem
+    passar pela validação do response_model.
+    """
+    service = RegistroService(db)
+    if ids is not None:
+        return _registros_por_ids(service, ids)
+    if cursor is None:
+        registros = service.obter_todos_registros(
+            skip=skip, limit=limit, como_dicionarios=JSON_RAPIDO, ordem=ordem, **filtros
+        )
+        return RespostaJSON(registros) if JSON_RAPIDO else registros
+
+    try:
+        registros, proximo_cursor = service.obter_registros_por_cursor(
+            cursor=cursor, limit=limit, como_dicionarios=JSON_RAPIDO, ordem=ordem or "data_desc", **filtros
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    pagina = {"itens": registros, "next_cursor": proximo_cursor}
+    return RespostaJSON(pagina) if JSON_RAPIDO else pagina
+
+
+def _registros_por_ids(service: RegistroService, ids: List[int]):
+    registros, ausentes = service.obter_registros_por_ids(ids, como_dicionarios=JSON_RAPIDO)
+    resultado = {"itens": registros, "ausentes": ausentes}
+    return RespostaJSON(resultado) if JSON_RAPIDO else resultado
+
+
+@router.post("/batch-get", response_model=RegistroPorIdsResponse)
+def obter_registros_por_ids(pedido: IdsRequest, db: Session = Depends(get_db)):
+    """Obtém até 10000 registros por id com uma única consulta, na ordem pedida, e os ids ausentes"""
+    return _registros_por_ids(RegistroService(db), pedido.ids)
+
+
+@router.get("/resumo", response_model=ResumoResponse)
+def obter_resumo(db: Session = Depends(get_db)):
+    """Obtém o resumo agregado dos gastos (totais gerais, por tipo e do mês atual)"""
+    service = RegistroService(db)
+    return service.obter_resumo()
+
+
+@router.get("/export")
+def exportar_registros(
+    formato: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    filtros: dict = Depends(filtros_registros),
+    db: Session = Depends(get_db)
+):
+    """Exporta os registros em CSV ou NDJSON como stream
+
+    As linhas são lidas do banco em lotes e enviadas à medida que são lidas, sem
+    montar a lista completa em memória.
+    """
+    service = RegistroService(db)
+    linhas = service.iterar_registros(**filtros)
+
+    if formato == "ndjson":
+        conteudo, media_type = gerar_ndjson(linhas), "application/x-ndjson"
+    else:
+        conteudo, media_type = gerar_csv(linhas), "text/csv; charset=utf-8"
+
+    return StreamingResponse(
+        conteudo,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="registros.{formato}"'}
+    )
+
+
+@router.get("/busca", response_model=List[RegistroResponse])
+def buscar_registros(
+    q: str = Query(..., min_length=1, max_length=200, description="Palavras buscadas na observação (prefixos)"),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Busca textual na observação dos registros, ordenada por relevância
+
+    Usa FTS5 no SQLite e um índice GIN de tsvector no PostgreSQL, sem varrer a tabela.
+    """
     service = RegistroService(db)
-    return service.obter_todos_registros(skip=skip, limit=limit)
+    registros = service.buscar_registros(q, skip=skip, limit=limit, como_dicionarios=JSON_RAPIDO)
+    return RespostaJSON(registros) if JSON_RAPIDO else registros
 
 
 @router.get("/{registro_id}", response_model=RegistroResponse)
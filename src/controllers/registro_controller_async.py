@@ -0,0 +1,140 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional, Union
+from src.connection import get_async_db
+from src.respostas import JSON_RAPIDO, RespostaJSON
+from src.services import RegistroServiceAsync
+from .registro_controller import filtros_registros, ids_consulta
+from src.schemas import (
+    RegistroCreate, RegistroResponse, RegistroUpdate, RegistroPagina, ResumoResponse,
+    IdsRequest, RegistroPorIdsResponse
+)
+
+# Versões async def das rotas de registro_controller; as rotas não redefinidas aqui
+# (bulk, import, export) continuam síncronas (veja combinar_routers)
+router = APIRouter(prefix="/registros", tags=["registros"])
+
+
+@router.post("/", response_model=RegistroResponse, status_code=status.HTTP_201_CREATED)
+async def criar_registro(registro_data: RegistroCreate, db: AsyncSession = Depends(get_async_db)):
+    """Cria um novo registro de gasto"""
+    try:
+        service = RegistroServiceAsync(db)
+        return await service.criar_registro(registro_data)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/", response_model=Union[List[RegistroResponse], RegistroPorIdsResponse, RegistroPagina])
+async def obter_registros(
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor opaco; envie vazio para a primeira página"),
+    ordem: Optional[Literal["data_desc", "data_asc", "valor_desc", "valor_asc"]] = Query(
+        None, description="Ordenação; padrão: ordem natural com skip/limit, data_desc com cursor"
+    ),
+    filtros: dict = Depends(filtros_registros),
+    ids: Optional[List[int]] = Depends(ids_consulta),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Obtém os registros com paginação, filtros por período, valor e tipo e ordenação"""
+    service = RegistroServiceAsync(db)
+    if ids is not None:
+        return await _registros_por_ids(service, ids)
+    if cursor is None:
+        registros = await service.obter_todos_registros(
+            skip=skip, limit=limit, como_dicionarios=JSON_RAPIDO, ordem=ordem, **filtros
+        )
+        return RespostaJSON(registros) if JSON_RAPIDO else registros
+
+    try:
+        registros, proximo_cursor = await service.obter_registros_por_cursor(
+            cursor=cursor, limit=limit, como_dicionarios=JSON_RAPIDO, ordem=ordem or "data_desc", **filtros
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    pagina = {"itens": registros, "next_cursor": proximo_cursor}
+    return RespostaJSON(pagina) if JSON_RAPIDO else pagina
+
+
+async def _registros_por_ids(service: RegistroServiceAsync, ids: List[int]):
+    registros, ausentes = await service.obter_registros_por_ids(ids, como_dicionarios=JSON_RAPIDO)
+    resultado = {"itens": registros, "ausentes": ausentes}
+    return RespostaJSON(resultado) if JSON_RAPIDO else resultado
+
+
+@router.post("/batch-get", response_model=RegistroPorIdsResponse)
+async def obter_registros_por_ids(pedido: IdsRequest, db: AsyncSession = Depends(get_async_db)):
+    """Obtém até 10000 registros por id com uma única consulta, na ordem pedida, e os ids ausentes"""
+    return await _registros_por_ids(RegistroServiceAsync(db), pedido.ids)
+
+
+@router.get("/resumo", response_model=ResumoResponse)
+async def obter_resumo(db: AsyncSession = Depends(get_async_db)):
+    """Obtém o resumo agregado dos gastos (totais gerais, por tipo e do mês atual)"""
+    service = RegistroServiceAsync(db)
+    return await service.obter_resumo()
+
+
+@router.get("/busca", response_model=List[RegistroResponse])
+async def buscar_registros(
+    q: str = Query(..., min_length=1, max_length=200, description="Palavras buscadas na observação (prefixos)"),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Busca textual na observação dos registros, ordenada por relevância"""
+    service = RegistroServiceAsync(db)
+    registros = await service.buscar_registros(q, skip=skip, limit=limit, como_dicionarios=JSON_RAPIDO)
+    return RespostaJSON(registros) if JSON_RAPIDO else registros
+
+
+@router.get("/{registro_id}", response_model=RegistroResponse)
+async def obter_registro(registro_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Obtém um registro específico por ID"""
+    service = RegistroServiceAsync(db)
+    registro = await service.obter_registro_por_id(registro_id)
+    if not registro:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Registro não encontrado"
+        )
+    return registro
+
+
+@router.put("/{registro_id}", response_model=RegistroResponse)
+async def atualizar_registro(
+    registro_id: int,
+    registro_data: RegistroUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Atualiza um registro existente"""
+    try:
+        service = RegistroServiceAsync(db)
+        registro = await service.atualizar_registro(registro_id, registro_data)
+        if not registro:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Registro não encontrado"
+            )
+        return registro
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.delete("/{registro_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def deletar_registro(registro_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Deleta um registro"""
+    service = RegistroServiceAsync(db)
+    if not await service.deletar_registro(registro_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Registro não encontrado"
+        )
+
+
+@router.get("/tipo-gasto/{tipo_gasto_id}", response_model=List[RegistroResponse])
+async def obter_registros_por_tipo_gasto(tipo_gasto_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Obtém todos os registros de um tipo de gasto específico"""
+    service = RegistroServiceAsync(db)
+    return await service.obter_registros_por_tipo_gasto(tipo_gasto_id)
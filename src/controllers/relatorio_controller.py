@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from src.connection import get_db
+from src.services import RelatorioService
+from src.schemas import GastoMensalResponse
+
+router = APIRouter(prefix="/relatorios", tags=["relatorios"])
+
+PADRAO_ANO_MES = r"^\d{4}-(0[1-9]|1[0-2])$"
+
+
+@router.get("/mensal", response_model=List[GastoMensalResponse])
+def obter_gastos_mensais(
+    inicio: Optional[str] = Query(None, regex=PADRAO_ANO_MES, description="Mês inicial AAAA-MM (inclusivo)"),
+    fim: Optional[str] = Query(None, regex=PADRAO_ANO_MES, description="Mês final AAAA-MM (inclusivo)"),
+    fk_tipo_gasto: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Obtém o total gasto e a quantidade de registros por mês e tipo de gasto
+
+    Lê apenas a tabela gastos_mensais, mantida a cada escrita em registros, então o custo
+    não cresce com a quantidade de registros.
+    """
+    service = RelatorioService(db)
+    return service.obter_gastos_mensais(inicio=inicio, fim=fim, fk_tipo_gasto=fk_tipo_gasto)
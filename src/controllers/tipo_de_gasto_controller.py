@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional, Union
 from src.connection import get_db
 from src.services import TipoDeGastoService
-from src.schemas import TipoDeGastoCreate, TipoDeGastoResponse, TipoDeGastoUpdate
+from .registro_controller import ids_consulta
+from src.schemas import (
+    TipoDeGastoCreate, TipoDeGastoResponse, TipoDeGastoUpdate, TipoDeGastoPagina, TipoDeGastoComTotaisResponse,
+    IdsRequest, TipoDeGastoPorIdsResponse
+)
 
 router = APIRouter(prefix="/tipos-gasto", tags=["tipos-gasto"])
 
@@ -18,11 +22,59 @@ def criar_tipo_gasto(tipo_gasto_data: TipoDeGastoCreate, db: Session = Depends(g
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
-@router.get("/", response_model=List[TipoDeGastoResponse])
-def obter_tipos_gasto(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Obtém todos os tipos de gasto com paginação"""
+@router.get(
+    "/",
+    response_model=Union[
+        List[TipoDeGastoComTotaisResponse], List[TipoDeGastoResponse], TipoDeGastoPorIdsResponse, TipoDeGastoPagina
+    ]
+)
+def obter_tipos_gasto(
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor opaco; envie vazio para a primeira página"),
+    include: Literal["none", "registros"] = Query(
+        "registros",
+        description="`registros` embute a lista de registros; `none` retorna apenas os totais por tipo"
+    ),
+    ids: Optional[List[int]] = Depends(ids_consulta),
+    db: Session = Depends(get_db)
+):
+    """Obtém todos os tipos de gasto com paginação
+
+    Sem `cursor`, mantém a paginação por skip/limit e retorna uma lista.
+    Com `cursor`, pagina por id e retorna os itens e o `next_cursor`.
+    Com `ids`, retorna esses tipos na ordem pedida e os `ausentes`.
+    """
     service = TipoDeGastoService(db)
-    return service.obter_todos_tipos_gasto(skip=skip, limit=limit)
+    incluir_registros = include == "registros"
+    if ids is not None:
+        tipos_gasto, ausentes = service.obter_tipos_gasto_por_ids(ids, incluir_registros=incluir_registros)
+        return {"itens": tipos_gasto, "ausentes": ausentes}
+    if cursor is None:
+        return service.obter_todos_tipos_gasto(skip=skip, limit=limit, incluir_registros=incluir_registros)
+
+    try:
+        tipos_gasto, proximo_cursor = service.obter_tipos_gasto_por_cursor(
+            cursor=cursor, limit=limit, incluir_registros=incluir_registros
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"itens": tipos_gasto, "next_cursor": proximo_cursor}
+
+
+@router.post("/batch-get", response_model=TipoDeGastoPorIdsResponse)
+def obter_tipos_gasto_por_ids(
+    pedido: IdsRequest,
+    include: Literal["none", "registros"] = Query(
+        "registros",
+        description="`registros` embute a lista de registros; `none` retorna apenas os totais por tipo"
+    ),
+    db: Session = Depends(get_db)
+):
+    """Obtém até 10000 tipos de gasto por id com uma única consulta, na ordem pedida, e os ids ausentes"""
+    service = TipoDeGastoService(db)
+    tipos_gasto, ausentes = service.obter_tipos_gasto_por_ids(pedido.ids, incluir_registros=include == "registros")
+    return {"itens": tipos_gasto, "ausentes": ausentes}
 
 
 @router.get("/{tipo_gasto_id}", response_model=TipoDeGastoResponse)
@@ -59,10 +111,18 @@ def atualizar_tipo_gasto(
 
 
 @router.delete("/{tipo_gasto_id}", status_code=status.HTTP_204_NO_CONTENT)
-def deletar_tipo_gasto(tipo_gasto_id: int, db: Session = Depends(get_db)):
-    """Deleta um tipo de gasto"""
+def deletar_tipo_gasto(
+    tipo_gasto_id: int,
+    reatribuir_para: Optional[int] = Query(None, description="Move os registros para este tipo em vez de excluí-los"),
+    db: Session = Depends(get_db)
+):
+    """Deleta um tipo de gasto e os seus registros, ou os move para `reatribuir_para`"""
     service = TipoDeGastoService(db)
-    if not service.deletar_tipo_gasto(tipo_gasto_id):
+    try:
+        removido = service.deletar_tipo_gasto(tipo_gasto_id, reatribuir_para=reatribuir_para)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not removido:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tipo de gasto não encontrado"
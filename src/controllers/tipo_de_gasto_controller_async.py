@@ -0,0 +1,125 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional, Union
+from src.connection import get_async_db
+from src.services import TipoDeGastoServiceAsync
+from .registro_controller import ids_consulta
+from src.schemas import (
+    TipoDeGastoCreate, TipoDeGastoResponse, TipoDeGastoUpdate, TipoDeGastoPagina, TipoDeGastoComTotaisResponse,
+    IdsRequest, TipoDeGastoPorIdsResponse
+)
+
+# Versões async def das rotas de tipo_de_gasto_controller
+router = APIRouter(prefix="/tipos-gasto", tags=["tipos-gasto"])
+
+
+@router.post("/", response_model=TipoDeGastoResponse, status_code=status.HTTP_201_CREATED)
+async def criar_tipo_gasto(tipo_gasto_data: TipoDeGastoCreate, db: AsyncSession = Depends(get_async_db)):
+    """Cria um novo tipo de gasto"""
+    try:
+        service = TipoDeGastoServiceAsync(db)
+        return await service.criar_tipo_gasto(tipo_gasto_data)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get(
+    "/",
+    response_model=Union[
+        List[TipoDeGastoComTotaisResponse], List[TipoDeGastoResponse], TipoDeGastoPorIdsResponse, TipoDeGastoPagina
+    ]
+)
+async def obter_tipos_gasto(
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor opaco; envie vazio para a primeira página"),
+    include: Literal["none", "registros"] = Query(
+        "registros",
+        description="`registros` embute a lista de registros; `none` retorna apenas os totais por tipo"
+    ),
+    ids: Optional[List[int]] = Depends(ids_consulta),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Obtém todos os tipos de gasto com paginação"""
+    service = TipoDeGastoServiceAsync(db)
+    incluir_registros = include == "registros"
+    if ids is not None:
+        tipos_gasto, ausentes = await service.obter_tipos_gasto_por_ids(ids, incluir_registros=incluir_registros)
+        return {"itens": tipos_gasto, "ausentes": ausentes}
+    if cursor is None:
+        return await service.obter_todos_tipos_gasto(skip=skip, limit=limit, incluir_registros=incluir_registros)
+
+    try:
+        tipos_gasto, proximo_cursor = await service.obter_tipos_gasto_por_cursor(
+            cursor=cursor, limit=limit, incluir_registros=incluir_registros
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"itens": tipos_gasto, "next_cursor": proximo_cursor}
+
+
+@router.post("/batch-get", response_model=TipoDeGastoPorIdsResponse)
+async def obter_tipos_gasto_por_ids(
+    pedido: IdsRequest,
+    include: Literal["none", "registros"] = Query(
+        "registros",
+        description="`registros` embute a lista de registros; `none` retorna apenas os totais por tipo"
+    ),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Obtém até 10000 tipos de gasto por id com uma única consulta, na ordem pedida, e os ids ausentes"""
+    service = TipoDeGastoServiceAsync(db)
+    tipos_gasto, ausentes = await service.obter_tipos_gasto_por_ids(pedido.ids, incluir_registros=include == "registros")
+    return {"itens": tipos_gasto, "ausentes": ausentes}
+
+
+@router.get("/{tipo_gasto_id}", response_model=TipoDeGastoResponse)
+async def obter_tipo_gasto(tipo_gasto_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Obtém um tipo de gasto específico por ID"""
+    service = TipoDeGastoServiceAsync(db)
+    tipo_gasto = await service.obter_tipo_gasto_por_id(tipo_gasto_id)
+    if not tipo_gasto:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tipo de gasto não encontrado"
+        )
+    return tipo_gasto
+
+
+@router.put("/{tipo_gasto_id}", response_model=TipoDeGastoResponse)
+async def atualizar_tipo_gasto(
+    tipo_gasto_id: int,
+    tipo_gasto_data: TipoDeGastoUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Atualiza um tipo de gasto existente"""
+    try:
+        service = TipoDeGastoServiceAsync(db)
+        tipo_gasto = await service.atualizar_tipo_gasto(tipo_gasto_id, tipo_gasto_data)
+        if not tipo_gasto:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tipo de gasto não encontrado"
+            )
+        return tipo_gasto
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.delete("/{tipo_gasto_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def deletar_tipo_gasto(
+    tipo_gasto_id: int,
+    reatribuir_para: Optional[int] = Query(None, description="Move os registros para este tipo em vez de excluí-los"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Deleta um tipo de gasto e os seus registros, ou os move para `reatribuir_para`"""
+    service = TipoDeGastoServiceAsync(db)
+    try:
+        removido = await service.deletar_tipo_gasto(tipo_gasto_id, reatribuir_para=reatribuir_para)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not removido:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tipo de gasto não encontrado"
+        )
@@ -0,0 +1,34 @@
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+
+@contextmanager
+def capturar_sql(engine: Engine) -> Iterator[List[Tuple[str, Any]]]:
+    """Captura (statement, parâmetros) de cada SELECT executado no engine dentro do bloco"""
+    capturados: List[Tuple[str, Any]] = []
+
+    def _antes_de_executar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            capturados.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _antes_de_executar)
+    try:
+        yield capturados
+    finally:
+        event.remove(engine, "before_cursor_execute", _antes_de_executar)
+
+
+def plano_de_execucao(connection: Connection, statement: str, parameters: Any) -> List[str]:
+    """Retorna as linhas do plano de execução de um statement já compilado
+
+    Usa EXPLAIN QUERY PLAN no SQLite e EXPLAIN no PostgreSQL (sem ANALYZE, então
+    a consulta não é executada).
+    """
+    if connection.dialect.name == "sqlite":
+        resultado = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [linha[-1] for linha in resultado]
+
+    resultado = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+    return [linha[0] for linha in resultado]
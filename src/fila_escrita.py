@@ -0,0 +1,76 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class FilaEscrita:
+    """Fila de escrita de processo único: executa as escritas em uma thread escritora dedicada
+
+    Com o SQLite só um escritor pode manter o lock do banco; enfileirar as escritas de
+    todas as threads de requisição evita erros "database is locked" e conflitos ao
+    promover transações de leitura a escrita. Inativa (padrão), executa diretamente.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread_escritora: Optional[int] = None
+
+    @property
+    def ativa(self) -> bool:
+        return self._executor is not None
+
+    def ativar(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix="kairos-escrita",
+                initializer=self._registrar_thread_escritora
+            )
+
+    def desativar(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._thread_escritora = None
+
+    def _registrar_thread_escritora(self):
+        self._thread_escritora = threading.get_ident()
+
+    def executar(self, funcao: Callable, *args, **kwargs) -> Any:
+        """Executa a função na thread escritora e aguarda o resultado
+
+        A função roda em uma cópia do contexto da thread que a enfileirou, para que as
+        ContextVars da requisição (métricas e perfil de consultas) vejam as escritas.
+        """
+        if (
+            self._executor is None
+            or threading.get_ident() == self._thread_escritora
+            or _em_loop_asyncio()
+        ):
+            return funcao(*args, **kwargs)
+        contexto = contextvars.copy_context()
+        return self._executor.submit(contexto.run, funcao, *args, **kwargs).result()
+
+
+def _em_loop_asyncio() -> bool:
+    # O caminho assíncrono (AsyncSession.run_sync) roda na thread do event loop e não pode
+    # bloquear esperando outra thread; nele a contenção fica a cargo do busy_timeout
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+fila_escrita = FilaEscrita()
+
+
+def escrita(metodo: Callable) -> Callable:
+    """Decorator para métodos de service que escrevem no banco: passam pela fila de escrita"""
+    @functools.wraps(metodo)
+    def wrapper(*args, **kwargs):
+        return fila_escrita.executar(metodo, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,152 @@
+import os
+import time
+from typing import Callable, Dict, Optional
+
+# Marco zero da partida a frio: main.py importa este módulo antes de todos os outros
+INICIO = time.perf_counter()
+
+
+class RelatorioInicializacao:
+    """Tempos da partida do worker: cada etapa, pronto para atender e primeira requisição"""
+
+    def __init__(self, inicio: float):
+        self.inicio = inicio
+        self.modo: Optional[str] = None
+        self.etapas: Dict[str, float] = {}
+        self.pronto_ms: Optional[float] = None
+        self.primeira_requisicao_ms: Optional[float] = None
+
+    def _desde_inicio(self) -> float:
+        return round((time.perf_counter() - self.inicio) * 1000, 3)
+
+    def medir(self, etapa: str, funcao: Callable, *args):
+        """Executa uma etapa da inicialização e guarda a duração"""
+        antes = time.perf_counter()
+        try:
+            return funcao(*args)
+        finally:
+            self.etapas[etapa] = round((time.perf_counter() - antes) * 1000, 3)
+
+    async def medir_async(self, etapa: str, funcao: Callable, *args):
+        """Executa uma etapa assíncrona da inicialização e guarda a duração"""
+        antes = time.perf_counter()
+        try:
+            return await funcao(*args)
+        finally:
+            self.etapas[etapa] = round((time.perf_counter() - antes) * 1000, 3)
+
+    def marcar_pronto(self):
+        self.pronto_ms = self._desde_inicio()
+
+    def marcar_primeira_requisicao(self):
+        if self.primeira_requisicao_ms is None:
+            self.primeira_requisicao_ms = self._desde_inicio()
+
+    def como_dicionario(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "modo": self.modo,
+            "etapas_ms": self.etapas,
+            "pronto_ms": self.pronto_ms,
+            "primeira_requisicao_ms": self.primeira_requisicao_ms,
+        }
+
+    def resumo(self) -> str:
+        etapas = ", ".join(f"{nome} {ms:.0f} ms" for nome, ms in self.etapas.items())
+        return f"Pronto em {self.pronto_ms:.0f} ms desde a importação (modo {self.modo}: {etapas})"
+
+
+relatorio_inicializacao = RelatorioInicializacao(INICIO)
+
+
+def aquecer_pool(engine, quantidade: int) -> int:
+    """Abre `quantidade` conexões ao mesmo tempo e as devolve ao pool, prontas para as primeiras requisições"""
+    conexoes = []
+    try:
+        for _ in range(quantidade):
+            conexao = engine.connect()
+            conexoes.append(conexao)
+            conexao.exec_driver_sql("SELECT 1")
+    finally:
+        for conexao in conexoes:
+            conexao.close()
+    return len(conexoes)
+
+
+async def aquecer_pool_async(engine, quantidade: int) -> int:
+    """aquecer_pool para o AsyncEngine que atende as rotas com DB_ASYNC=true"""
+    conexoes = []
+    try:
+        for _ in range(quantidade):
+            conexao = await engine.connect()
+            conexoes.append(conexao)
+            await conexao.exec_driver_sql("SELECT 1")
+    finally:
+        for conexao in conexoes:
+            await conexao.close()
+    return len(conexoes)
+
+
+def verificar_revisao(engine) -> str:
+    """Confere que o banco está na revisão head das migrações e a retorna
+
+    O modo rapida não cria nem altera o esquema; um banco sem `python manage.py migrate`
+    (ou com migrações pendentes) falha na subida do worker, não na primeira requisição.
+    """
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    diretorio = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic")
+    heads = set(ScriptDirectory(diretorio).get_heads())
+    with engine.connect() as conexao:
+        atuais = set(MigrationContext.configure(conexao).get_current_heads())
+    if atuais != heads:
+        raise RuntimeError(
+            f"Banco na revisão {', '.join(sorted(atuais)) or 'nenhuma'} e migrações em {', '.join(sorted(heads))}: "
+            "execute `python manage.py migrate` antes de subir os workers com INICIALIZACAO=rapida"
+        )
+    return heads.pop()
+
+
+def _executar_consultas(db) -> int:
+    from sqlalchemy.orm import configure_mappers
+    from src.services import RegistroService, TipoDeGastoService, RelatorioService
+
+    configure_mappers()
+    consultas = [
+        lambda: RegistroService(db).obter_todos_registros(0, 1),
+        lambda: RegistroService(db).obter_todos_registros(0, 1, como_dicionarios=True),
+        lambda: RegistroService(db).obter_registros_por_cursor(None, 1, como_dicionarios=True),
+        lambda: RegistroService(db).obter_registro_por_id(0),
+        lambda: RegistroService(db).obter_registros_por_tipo_gasto(0),
+        lambda: TipoDeGastoService(db).obter_todos_tipos_gasto(0, 1),
+        lambda: TipoDeGastoService(db).obter_tipo_gasto_por_id(0),
+        lambda: RelatorioService(db).obter_gastos_mensais(),
+    ]
+    for consulta in consultas:
+        consulta()
+    return len(consultas)
+
+
+def precompilar_consultas(fabrica_sessao) -> int:
+    """Executa uma vez as consultas de leitura mais usadas para preencher o cache de compilação do engine
+
+    O SQLAlchemy guarda o SQL compilado por estrutura de consulta (limit/offset e filtros são
+    parâmetros), então a primeira requisição real já encontra tudo compilado. Ids inexistentes
+    e limit 1 mantêm o custo baixo mesmo em tabelas grandes (o rollup mensal já é pequeno).
+    """
+    db = fabrica_sessao()
+    try:
+        return _executar_consultas(db)
+    finally:
+        db.rollback()
+        db.close()
+
+
+async def precompilar_consultas_async(fabrica_sessao) -> int:
+    """precompilar_consultas para o AsyncEngine: as mesmas consultas, pelo run_sync dos services async"""
+    async with fabrica_sessao() as db:
+        try:
+            return await db.run_sync(_executar_consultas)
+        finally:
+            await db.rollback()
@@ -0,0 +1,142 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Limites (em segundos) dos buckets dos histogramas de latência e de tempo de banco
+BUCKETS_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Histograma:
+    """Histograma cumulativo no formato do Prometheus (contagem por bucket, soma e total)"""
+
+    __slots__ = ("contagens", "soma", "total")
+
+    def __init__(self):
+        self.contagens = [0] * (len(BUCKETS_SEGUNDOS) + 1)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        self.contagens[bisect_left(BUCKETS_SEGUNDOS, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+
+class EstadoRequisicao:
+    """Tempo de banco e quantidade de consultas acumulados durante uma requisição"""
+
+    __slots__ = ("db_segundos", "consultas")
+
+    def __init__(self):
+        self.db_segundos = 0.0
+        self.consultas = 0
+
+
+# Estado da requisição em andamento; as rotas síncronas rodam no threadpool com uma cópia
+# do contexto, que aponta para o mesmo objeto, então as consultas feitas lá também são somadas
+requisicao_atual: ContextVar[Optional[EstadoRequisicao]] = ContextVar("requisicao_atual", default=None)
+
+
+class MetricasRequisicoes:
+    """Contadores por rota (por processo/worker) expostos no formato texto do Prometheus
+
+    As rotas são identificadas pelo template (ex.: /registros/{registro_id}), nunca pelo caminho
+    real, para manter a cardinalidade limitada.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.em_andamento = 0
+        self.requisicoes: Dict[Tuple[str, str, int], int] = {}
+        self.latencia: Dict[Tuple[str, str], _Histograma] = {}
+        self.db_tempo: Dict[Tuple[str, str], _Histograma] = {}
+        self.db_consultas: Dict[Tuple[str, str], int] = {}
+
+    def iniciar(self) -> EstadoRequisicao:
+        with self._lock:
+            self.em_andamento += 1
+        estado = EstadoRequisicao()
+        requisicao_atual.set(estado)
+        return estado
+
+    def finalizar(self, metodo: str, rota: str, status: int, segundos: float, estado: EstadoRequisicao):
+        chave = (metodo, rota)
+        with self._lock:
+            self.em_andamento -= 1
+            self.requisicoes[(metodo, rota, status)] = self.requisicoes.get((metodo, rota, status), 0) + 1
+            self.latencia.setdefault(chave, _Histograma()).observar(segundos)
+            self.db_tempo.setdefault(chave, _Histograma()).observar(estado.db_segundos)
+            self.db_consultas[chave] = self.db_consultas.get(chave, 0) + estado.consultas
+
+    def instrumentar(self, engine: Engine):
+        """Registra os eventos de cursor do engine que medem o tempo de cada consulta da requisição atual"""
+        @event.listens_for(engine, "before_cursor_execute")
+        def _antes_consulta(conn, cursor, statement, parameters, context, executemany):
+            context._metricas_inicio = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _apos_consulta(conn, cursor, statement, parameters, context, executemany):
+            estado = requisicao_atual.get()
+            if estado is not None:
+                estado.db_segundos += time.perf_counter() - context._metricas_inicio
+                estado.consultas += 1
+
+    def limpar(self):
+        with self._lock:
+            self.requisicoes.clear()
+            self.latencia.clear()
+            self.db_tempo.clear()
+            self.db_consultas.clear()
+
+    @staticmethod
+    def _rotulos(**rotulos) -> str:
+        pares = []
+        for nome, valor in rotulos.items():
+            valor = str(valor).replace("\\", "\\\\").replace('"', '\\"')
+            pares.append(f'{nome}="{valor}"')
+        return "{" + ",".join(pares) + "}"
+
+    def _histograma_texto(self, nome: str, descricao: str, histogramas: Dict[Tuple[str, str], _Histograma]) -> list:
+        linhas = [f"# HELP {nome} {descricao}", f"# TYPE {nome} histogram"]
+        for (metodo, rota), histograma in sorted(histogramas.items()):
+            acumulado = 0
+            for limite, contagem in zip(BUCKETS_SEGUNDOS + ("+Inf",), histograma.contagens):
+                acumulado += contagem
+                linhas.append(f"{nome}_bucket{self._rotulos(metodo=metodo, rota=rota, le=limite)} {acumulado}")
+            rotulos = self._rotulos(metodo=metodo, rota=rota)
+            linhas.append(f"{nome}_sum{rotulos} {histograma.soma:.6f}")
+            linhas.append(f"{nome}_count{rotulos} {histograma.total}")
+        return linhas
+
+    def exportar(self) -> str:
+        """Gera o texto de exposição do Prometheus (versão 0.0.4) com o estado atual"""
+        with self._lock:
+            linhas = [
+                "# HELP kairos_requisicoes_em_andamento Requisições HTTP sendo processadas",
+                "# TYPE kairos_requisicoes_em_andamento gauge",
+                f"kairos_requisicoes_em_andamento {self.em_andamento}",
+                "# HELP kairos_requisicoes_total Requisições HTTP atendidas por rota e status",
+                "# TYPE kairos_requisicoes_total counter",
+            ]
+            for (metodo, rota, status), total in sorted(self.requisicoes.items()):
+                linhas.append(f"kairos_requisicoes_total{self._rotulos(metodo=metodo, rota=rota, status=status)} {total}")
+            linhas += self._histograma_texto(
+                "kairos_requisicao_duracao_segundos", "Latência das requisições HTTP por rota", self.latencia
+            )
+            linhas += self._histograma_texto(
+                "kairos_db_duracao_segundos", "Tempo gasto em consultas ao banco por requisição", self.db_tempo
+            )
+            linhas += [
+                "# HELP kairos_db_consultas_total Consultas executadas no banco por rota",
+                "# TYPE kairos_db_consultas_total counter",
+            ]
+            for (metodo, rota), total in sorted(self.db_consultas.items()):
+                linhas.append(f"kairos_db_consultas_total{self._rotulos(metodo=metodo, rota=rota)} {total}")
+        return "\n".join(linhas) + "\n"
+
+
+metricas = MetricasRequisicoes()
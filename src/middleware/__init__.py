@@ -0,0 +1,6 @@
+from .etag import MiddlewareETag
+from .metricas import MiddlewareMetricas
+from .perfil_sql import MiddlewarePerfilSQL
+from .inicializacao import MiddlewarePrimeiraRequisicao
+
+__all__ = ["MiddlewareETag", "MiddlewareMetricas", "MiddlewarePerfilSQL", "MiddlewarePrimeiraRequisicao"]
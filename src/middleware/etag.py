@@ -0,0 +1,67 @@
+import hashlib
+from typing import Iterable
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.services.cache import versao_dados
+
+
+class MiddlewareETag:
+    """GET condicional para as listagens e detalhes de registros e tipos de gasto
+
+    O ETag é derivado da versão dos dados (incrementada pelos services a cada escrita),
+    do caminho, da query string e do Accept-Encoding (representações comprimidas
+    diferentes não compartilham o mesmo ETag forte). Um If-None-Match que corresponda é respondido com 304
+    antes de chegar à rota, sem abrir sessão, consultar o banco ou serializar nada.
+    A versão é lida antes de executar a rota: se uma escrita ocorrer durante a consulta,
+    o ETag emitido fica para trás e a próxima requisição apenas recebe a resposta completa.
+    """
+
+    def __init__(self, app: ASGIApp, prefixos: Iterable[str] = ("/registros", "/tipos-gasto"), versao=None):
+        self.app = app
+        self.prefixos = tuple(prefixos)
+        self.versao = versao or versao_dados
+
+    def _gerar_etag(self, scope: Scope, headers: Headers) -> str:
+        chave = (
+            f"{self.versao.atual()}|{scope['path']}?{scope['query_string'].decode('latin-1')}"
+            f"|{headers.get('accept-encoding', '')}"
+        )
+        return '"' + hashlib.sha1(chave.encode()).hexdigest() + '"'
+
+    @staticmethod
+    def _corresponde(if_none_match: str, etag: str) -> bool:
+        """Comparação fraca do If-None-Match (RFC 9110), aceitando lista e '*'"""
+        for candidato in if_none_match.split(","):
+            candidato = candidato.strip()
+            if candidato.startswith("W/"):
+                candidato = candidato[2:]
+            if candidato == "*" or candidato == etag:
+                return True
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("GET", "HEAD")
+            or not scope["path"].startswith(self.prefixos)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        etag = self._gerar_etag(scope, headers)
+        if_none_match = headers.get("if-none-match")
+        if if_none_match and self._corresponde(if_none_match, etag):
+            response = Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+            await response(scope, receive, send)
+            return
+
+        async def enviar(message: Message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                headers["ETag"] = etag
+                headers["Cache-Control"] = "no-cache"
+            await send(message)
+
+        await self.app(scope, receive, enviar)
@@ -0,0 +1,17 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+from src.inicializacao import relatorio_inicializacao
+
+
+class MiddlewarePrimeiraRequisicao:
+    """Registra quando o worker terminou de atender a primeira requisição HTTP (fim da partida a frio)"""
+
+    def __init__(self, app: ASGIApp, relatorio=None):
+        self.app = app
+        self.relatorio = relatorio or relatorio_inicializacao
+        self.pendente = True
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await self.app(scope, receive, send)
+        if self.pendente and scope["type"] == "http":
+            self.pendente = False
+            self.relatorio.marcar_primeira_requisicao()
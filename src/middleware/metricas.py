@@ -0,0 +1,53 @@
+import time
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.metricas import metricas as metricas_padrao
+
+ROTA_DESCONHECIDA = "desconhecida"
+
+
+class MiddlewareMetricas:
+    """Mede contagem, status, latência e tempo de banco de cada requisição HTTP
+
+    A rota é rotulada pelo template resolvido pelo FastAPI (scope["route"]). Respostas que não
+    chegam ao roteamento (ex.: 304 do MiddlewareETag) são resolvidas contra as rotas da aplicação;
+    o que não corresponde a nenhuma rota cai em "desconhecida", sem usar o caminho real como rótulo.
+    """
+
+    def __init__(self, app: ASGIApp, metricas=None):
+        self.app = app
+        self.metricas = metricas or metricas_padrao
+
+    @staticmethod
+    def _template_rota(scope: Scope) -> str:
+        rota = scope.get("route")
+        if rota is not None:
+            return rota.path
+        aplicacao = scope.get("app")
+        for candidata in getattr(getattr(aplicacao, "router", None), "routes", ()):
+            correspondencia, _ = candidata.matches(scope)
+            if correspondencia == Match.FULL:
+                return getattr(candidata, "path", ROTA_DESCONHECIDA)
+        return ROTA_DESCONHECIDA
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estado = self.metricas.iniciar()
+        inicio = time.perf_counter()
+        status = 500
+
+        async def enviar(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            self.metricas.finalizar(
+                scope["method"], self._template_rota(scope), status, time.perf_counter() - inicio, estado
+            )
@@ -0,0 +1,33 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class MiddlewarePerfilSQL:
+    """Coleta as consultas SQL de cada requisição e registra o resumo e os possíveis N+1 no log
+
+    A resposta recebe X-SQL-Consultas e X-SQL-Tempo-Ms com o que foi executado até o início
+    do envio (em respostas em stream, as consultas posteriores aparecem apenas no log).
+    """
+
+    def __init__(self, app: ASGIApp, perfil):
+        self.app = app
+        self.perfil = perfil
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        coleta = self.perfil.iniciar()
+
+        async def enviar(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-SQL-Consultas"] = str(coleta.total)
+                headers["X-SQL-Tempo-Ms"] = f"{coleta.segundos * 1000:.2f}"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            self.perfil.relatar(f"{scope['method']} {scope['path']}", coleta)
@@ -1,4 +1,9 @@
 from .registro_model import Registro
 from .tipo_de_gasto_model import TipoDeGasto
+from .gasto_mensal_model import GastoMensal
+from .registro_busca import registros_busca, garantir_busca_textual, CONFIGURACAO_TEXTO_POSTGRESQL
 
-__all__ = ["Registro", "TipoDeGasto"]
+__all__ = [
+    "Registro", "TipoDeGasto", "GastoMensal", "registros_busca", "garantir_busca_textual",
+    "CONFIGURACAO_TEXTO_POSTGRESQL"
+]
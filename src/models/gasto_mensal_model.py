@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from src.connection import Base
+
+
+class GastoMensal(Base):
+    """Totais de gastos por mês e tipo, mantidos pelos services a cada escrita em registros"""
+    __tablename__ = 'gastos_mensais'
+
+    ano_mes = Column(String(7), primary_key=True)  # 'AAAA-MM'
+    fk_tipo_gasto = Column(Integer, ForeignKey('tipos_de_gasto.id', ondelete='CASCADE'), primary_key=True)
+    total_gasto = Column(Float, nullable=False, default=0)
+    total_registros = Column(Integer, nullable=False, default=0)
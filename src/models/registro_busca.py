@@ -0,0 +1,69 @@
+from sqlalchemy import DDL, Float, Integer, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.sql import column, table
+from .registro_model import Registro
+
+# Índice de busca textual em registros.observacao, criado junto com a tabela registros:
+# - SQLite: tabela FTS5 de conteúdo externo (registros_busca), mantida por triggers
+# - PostgreSQL: índice GIN sobre to_tsvector('portuguese', observacao)
+
+CONFIGURACAO_TEXTO_POSTGRESQL = "portuguese"
+
+# Tabela virtual FTS5 (fora do metadata: create_all não deve criá-la como tabela comum)
+registros_busca = table("registros_busca", column("rowid", Integer), column("rank", Float))
+
+DDL_BUSCA_SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS registros_busca USING fts5("
+    "observacao, content='registros', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='3')",
+    "CREATE TRIGGER IF NOT EXISTS registros_busca_ai AFTER INSERT ON registros BEGIN "
+    "INSERT INTO registros_busca(rowid, observacao) VALUES (new.id, new.observacao); END",
+    "CREATE TRIGGER IF NOT EXISTS registros_busca_ad AFTER DELETE ON registros BEGIN "
+    "INSERT INTO registros_busca(registros_busca, rowid, observacao) VALUES ('delete', old.id, old.observacao); END",
+    "CREATE TRIGGER IF NOT EXISTS registros_busca_au AFTER UPDATE OF observacao ON registros BEGIN "
+    "INSERT INTO registros_busca(registros_busca, rowid, observacao) VALUES ('delete', old.id, old.observacao); "
+    "INSERT INTO registros_busca(rowid, observacao) VALUES (new.id, new.observacao); END",
+]
+
+DDL_BUSCA_POSTGRESQL = [
+    "CREATE INDEX IF NOT EXISTS ix_registros_observacao_busca ON registros "
+    f"USING GIN (to_tsvector('{CONFIGURACAO_TEXTO_POSTGRESQL}', coalesce(observacao, '')))",
+]
+
+for comando in DDL_BUSCA_SQLITE:
+    event.listen(Registro.__table__, "after_create", DDL(comando).execute_if(dialect="sqlite"))
+for comando in DDL_BUSCA_POSTGRESQL:
+    event.listen(Registro.__table__, "after_create", DDL(comando).execute_if(dialect="postgresql"))
+
+# Os triggers caem com a tabela registros; a tabela virtual precisa ser removida à parte
+event.listen(
+    Registro.__table__, "before_drop",
+    DDL("DROP TABLE IF EXISTS registros_busca").execute_if(dialect="sqlite")
+)
+
+
+def garantir_busca_textual(engine) -> bool:
+    """Cria no SQLite a tabela FTS5 e os triggers da busca quando faltam
+
+    Bancos que já tinham a tabela registros antes da busca (create_all não recria os
+    listeners de after_create) ficam completos na inicialização; os comandos usam IF NOT
+    EXISTS. Quando a tabela FTS5 é criada agora, indexa as observações existentes.
+    Retorna True se a tabela foi criada.
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.begin() as conexao:
+        existia = conexao.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'registros_busca'"
+        ).first() is not None
+        try:
+            for comando in DDL_BUSCA_SQLITE:
+                conexao.exec_driver_sql(comando)
+        except OperationalError as erro:
+            raise RuntimeError(
+                f"Não foi possível criar o índice de busca textual (registros_busca): {erro.orig}. "
+                "O SQLite precisa ter a extensão FTS5; aplique as migrações com `python manage.py migrate`."
+            ) from erro
+        if not existia:
+            conexao.exec_driver_sql("INSERT INTO registros_busca(registros_busca) VALUES ('rebuild')")
+    return not existia
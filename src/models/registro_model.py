@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from src.connection import Base
@@ -11,6 +11,17 @@ class Registro(Base):
     vlr_gasto = Column(Float, nullable=False)
     observacao = Column(Text)
 
-    fk_tipo_gasto = Column(Integer, ForeignKey('tipos_de_gasto.id'))
+    fk_tipo_gasto = Column(Integer, ForeignKey('tipos_de_gasto.id', ondelete='CASCADE'))
 
-    tipo_gasto = relationship("TipoDeGasto", back_populates="registros")
\ No newline at end of file
+    tipo_gasto = relationship("TipoDeGasto", back_populates="registros")
+
+    __table_args__ = (
+        # Registros de um tipo ordenados/filtrados por data
+        Index('ix_registros_fk_tipo_gasto_dt_hr_gasto', 'fk_tipo_gasto', 'dt_hr_gasto'),
+        # Listagens por data e paginação por cursor (dt_hr_gasto, id)
+        Index('ix_registros_dt_hr_gasto_id', 'dt_hr_gasto', 'id'),
+        # Filtro por faixa de valor e ordenação/paginação por (vlr_gasto, id)
+        Index('ix_registros_vlr_gasto_id', 'vlr_gasto', 'id'),
+        # Registros de um tipo filtrados/ordenados por valor
+        Index('ix_registros_fk_tipo_gasto_vlr_gasto', 'fk_tipo_gasto', 'vlr_gasto'),
+    )
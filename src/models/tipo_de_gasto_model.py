@@ -9,4 +9,8 @@ class TipoDeGasto(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     descricao = Column(String(50), nullable=False, unique=True)
 
-    registros = relationship("Registro", back_populates="tipo_gasto", cascade="all, delete-orphan")
\ No newline at end of file
+    # A exclusão dos registros fica com o banco (ON DELETE CASCADE) ou com o DELETE em lote do
+    # service: passive_deletes evita carregar todos os registros do tipo só para excluí-los
+    registros = relationship(
+        "Registro", back_populates="tipo_gasto", cascade="all, delete-orphan", passive_deletes=True
+    )
\ No newline at end of file
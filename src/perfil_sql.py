@@ -0,0 +1,170 @@
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("kairos.sql")
+
+# Diretório raiz do projeto: o chamador de uma consulta é o primeiro frame dentro dele
+_RAIZ_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+_ESTE_ARQUIVO = os.path.abspath(__file__)
+_SITE_PACKAGES = os.sep + "site-packages" + os.sep
+_SQLALCHEMY = os.sep + "sqlalchemy" + os.sep
+
+# Listas de parâmetros de tamanho variável (IN (?, ?, ?) / VALUES (...), (...)) viram uma só forma
+_LISTA_PARAMETROS = re.compile(r"\((?:\s*(?:\?|%\([^)]*\)s|:\w+|\$\d+)\s*,?)+\)")
+_ESPACOS = re.compile(r"\s+")
+
+
+def forma_consulta(sql: str) -> str:
+    """Normaliza o SQL para agrupar execuções da mesma consulta (espaços e listas de parâmetros)"""
+    return _LISTA_PARAMETROS.sub("(?)", _ESPACOS.sub(" ", sql).strip())
+
+
+def chamador_consulta() -> str:
+    """Primeiro frame do projeto na pilha da consulta
+
+    Sem frame do projeto (ex.: carga preguiçosa disparada pela serialização da resposta),
+    usa o primeiro frame fora do SQLAlchemy.
+    """
+    frame = sys._getframe(2)
+    externo = None
+    while frame is not None:
+        arquivo = os.path.abspath(frame.f_code.co_filename)
+        if arquivo != _ESTE_ARQUIVO and _SQLALCHEMY not in arquivo:
+            if arquivo.startswith(_RAIZ_PROJETO) and _SITE_PACKAGES not in arquivo:
+                return f"{os.path.relpath(arquivo, _RAIZ_PROJETO)}:{frame.f_lineno} {frame.f_code.co_name}"
+            if externo is None:
+                externo = f"{arquivo.rsplit(_SITE_PACKAGES, 1)[-1]}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return f"fora do projeto ({externo})" if externo else "desconhecido"
+
+
+class Consulta(NamedTuple):
+    sql: str
+    forma: str
+    segundos: float
+    chamador: str
+
+
+class ColetaConsultas:
+    """Consultas executadas durante uma requisição (ou um bloco de teste), na ordem de execução"""
+
+    def __init__(self):
+        self.consultas: List[Consulta] = []
+
+    def registrar(self, sql: str, segundos: float, chamador: str):
+        self.consultas.append(Consulta(sql, forma_consulta(sql), segundos, chamador))
+
+    @property
+    def total(self) -> int:
+        return len(self.consultas)
+
+    @property
+    def segundos(self) -> float:
+        return sum(c.segundos for c in self.consultas)
+
+    def repetidas(self, minimo: int = 2) -> List[Tuple[str, int, List[str]]]:
+        """Formas executadas pelo menos `minimo` vezes, com os chamadores distintos (padrão N+1)"""
+        contagem = Counter(c.forma for c in self.consultas)
+        resultado = []
+        for forma, vezes in contagem.most_common():
+            if vezes < minimo:
+                break
+            chamadores = sorted({c.chamador for c in self.consultas if c.forma == forma})
+            resultado.append((forma, vezes, chamadores))
+        return resultado
+
+    def resumo(self) -> str:
+        linhas = [f"{self.total} consulta(s) em {self.segundos * 1000:.1f} ms"]
+        for i, consulta in enumerate(self.consultas, 1):
+            linhas.append(f"  {i}. [{consulta.segundos * 1000:.2f} ms] {consulta.chamador}: {consulta.forma}")
+        return "\n".join(linhas)
+
+
+# Coleta da requisição em andamento (definida pelo MiddlewarePerfilSQL)
+coleta_atual: ContextVar[Optional[ColetaConsultas]] = ContextVar("coleta_atual", default=None)
+
+
+class PerfilSQL:
+    """Perfil das consultas SQL para desenvolvimento
+
+    Com o perfil ativo, cada consulta da requisição é registrada com tempo e chamador, e
+    formas repetidas `limite_repeticoes` vezes ou mais são apontadas como possível N+1.
+    Consultas acima de `limite_lento_ms` são registradas no log mesmo com o perfil desligado.
+    """
+
+    def __init__(self, ativo: bool = False, limite_lento_ms: float = 0, limite_repeticoes: int = 3):
+        self.ativo = ativo
+        self.limite_lento = limite_lento_ms / 1000
+        self.limite_repeticoes = limite_repeticoes
+        if ativo and not logger.handlers:
+            logger.addHandler(logging.StreamHandler())
+            logger.setLevel(logging.INFO)
+
+    def instrumentar(self, engine: Engine):
+        """Registra os eventos de cursor do engine usados pelo perfil e pelo log de consultas lentas"""
+        if not self.ativo and self.limite_lento <= 0:
+            return
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _antes_consulta(conn, cursor, statement, parameters, context, executemany):
+            context._perfil_inicio = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _apos_consulta(conn, cursor, statement, parameters, context, executemany):
+            segundos = time.perf_counter() - context._perfil_inicio
+            coleta = coleta_atual.get() if self.ativo else None
+            lenta = 0 < self.limite_lento <= segundos
+            if coleta is None and not lenta:
+                return
+            chamador = chamador_consulta()
+            if coleta is not None:
+                coleta.registrar(statement, segundos, chamador)
+            if lenta:
+                logger.warning("Consulta lenta (%.1f ms) em %s: %s", segundos * 1000, chamador, forma_consulta(statement))
+
+    def iniciar(self) -> ColetaConsultas:
+        coleta = ColetaConsultas()
+        coleta_atual.set(coleta)
+        return coleta
+
+    def relatar(self, descricao: str, coleta: ColetaConsultas):
+        """Registra no log o total da requisição e as formas repetidas"""
+        logger.info("%s: %d consulta(s), %.1f ms no banco", descricao, coleta.total, coleta.segundos * 1000)
+        for forma, vezes, chamadores in coleta.repetidas(self.limite_repeticoes):
+            logger.warning(
+                "Possível N+1 em %s: %d execuções de %s (chamada em %s)",
+                descricao, vezes, forma, ", ".join(chamadores)
+            )
+
+
+@contextmanager
+def capturar_consultas(engine: Engine) -> Iterator[ColetaConsultas]:
+    """Registra todas as consultas feitas no engine dentro do bloco, em qualquer thread
+
+    Usado pelos testes, em que o TestClient executa a aplicação em outra thread e a
+    coleta por requisição (ContextVar) não é visível para o teste.
+    """
+    coleta = ColetaConsultas()
+
+    def _antes_consulta(conn, cursor, statement, parameters, context, executemany):
+        context._captura_inicio = time.perf_counter()
+
+    def _apos_consulta(conn, cursor, statement, parameters, context, executemany):
+        coleta.registrar(statement, time.perf_counter() - context._captura_inicio, chamador_consulta())
+
+    event.listen(engine, "before_cursor_execute", _antes_consulta)
+    event.listen(engine, "after_cursor_execute", _apos_consulta)
+    try:
+        yield coleta
+    finally:
+        event.remove(engine, "before_cursor_execute", _antes_consulta)
+        event.remove(engine, "after_cursor_execute", _apos_consulta)
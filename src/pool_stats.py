@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+
+class EstatisticasPool:
+    """Contadores do pool de conexões de um engine (por processo/worker)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.conexoes_criadas = 0
+        self.invalidacoes = 0
+        self.timeouts = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+
+    def registrar_espera(self, segundos: float):
+        with self._lock:
+            self.espera_total += segundos
+            self.espera_maxima = max(self.espera_maxima, segundos)
+
+    def registrar_timeout(self, segundos: float):
+        with self._lock:
+            self.timeouts += 1
+            self.espera_total += segundos
+            self.espera_maxima = max(self.espera_maxima, segundos)
+
+    def instrumentar(self, engine: Engine):
+        """Registra os eventos do pool do engine que alimentam os contadores"""
+        @event.listens_for(engine, "connect")
+        def _ao_conectar(dbapi_connection, connection_record):
+            with self._lock:
+                self.conexoes_criadas += 1
+
+        @event.listens_for(engine, "checkout")
+        def _ao_retirar(dbapi_connection, connection_record, connection_proxy):
+            with self._lock:
+                self.checkouts += 1
+
+        @event.listens_for(engine, "invalidate")
+        def _ao_invalidar(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.invalidacoes += 1
+
+    def snapshot(self, engine: Engine) -> dict:
+        """Retorna o estado atual do pool e os contadores acumulados"""
+        pool = engine.pool
+        with self._lock:
+            checkouts = self.checkouts
+            # espera_total inclui as esperas que terminaram em timeout, que não contam como checkout
+            esperas = checkouts + self.timeouts
+            dados = {
+                "pid": os.getpid(),
+                "checkouts": checkouts,
+                "conexoes_criadas": self.conexoes_criadas,
+                "invalidacoes": self.invalidacoes,
+                "timeouts": self.timeouts,
+                "espera_media_ms": round(self.espera_total / esperas * 1000, 3) if esperas else 0.0,
+                "espera_maxima_ms": round(self.espera_maxima * 1000, 3),
+            }
+
+        if isinstance(pool, QueuePool):
+            dados.update({
+                "tamanho": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "em_uso": pool.checkedout(),
+                "ociosas": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        return dados
+
+
+def criar_pool_monitorado(estatisticas: EstatisticasPool, base: type = QueuePool) -> type:
+    """Cria uma classe de pool (QueuePool ou subclasse) que mede o tempo de espera de cada checkout
+
+    A classe é recriada por Pool.recreate() (ex.: engine.dispose()) mantendo as mesmas estatísticas.
+    """
+    class QueuePoolMonitorado(base):
+        def _do_get(self):
+            inicio = time.perf_counter()
+            try:
+                conexao = super()._do_get()
+            except exc.TimeoutError:
+                estatisticas.registrar_timeout(time.perf_counter() - inicio)
+                raise
+            estatisticas.registrar_espera(time.perf_counter() - inicio)
+            return conexao
+
+    return QueuePoolMonitorado
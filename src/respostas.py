@@ -0,0 +1,31 @@
+import os
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional; sem ele as respostas usam o json da biblioteca padrão
+    orjson = None
+
+# JSON_RAPIDO=true (padrão) serializa com orjson e monta as listagens de registros
+# direto das tuplas do banco, sem validar cada item com o Pydantic na saída
+JSON_RAPIDO = os.getenv("JSON_RAPIDO", "true").lower() == "true" and orjson is not None
+RespostaJSON = ORJSONResponse if JSON_RAPIDO else JSONResponse
+
+# Respostas menores que isso (em bytes) não são comprimidas; 0 desativa a compressão
+COMPRESSAO_MIN_BYTES = int(os.getenv("COMPRESSAO_MIN_BYTES", 1000))
+
+
+def configurar_compressao(app: FastAPI) -> str:
+    """Adiciona a compressão das respostas: brotli (com fallback para gzip) se o pacote
+    brotli-asgi estiver instalado, senão gzip. Retorna o algoritmo configurado."""
+    if COMPRESSAO_MIN_BYTES <= 0:
+        return "nenhuma"
+    try:
+        from brotli_asgi import BrotliMiddleware
+    except ImportError:
+        app.add_middleware(GZipMiddleware, minimum_size=COMPRESSAO_MIN_BYTES)
+        return "gzip"
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSAO_MIN_BYTES, gzip_fallback=True)
+    return "brotli"
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import time
+from typing import Optional
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+from src.connection import engine, engine_rotas, estatisticas_pool, estatisticas_pool_rotas
+from src.pool_stats import EstatisticasPool
+
+SAUDE_INTERVALO_S = float(os.getenv("SAUDE_INTERVALO_S", 5))
+# Fração do pool (pool_size + max_overflow) em uso a partir da qual o worker deixa de estar pronto;
+# com max_overflow=-1 (overflow ilimitado) o pool nunca satura
+SAUDE_SATURACAO_MAX = float(os.getenv("SAUDE_SATURACAO_MAX", 0.9))
+
+
+class MonitorSaude:
+    """Verifica o banco em segundo plano e guarda o resultado para as sondas de prontidão
+
+    A verificação pega uma conexão do pool (não abre uma nova a cada sonda) a cada
+    `intervalo` segundos; /health/ready apenas lê o último resultado e o estado do pool.
+    A saturação e os timeouts são os do pool de `engine_rotas`, o que atende as rotas (com
+    DB_ASYNC=true, o do AsyncEngine), lidos de `estatisticas`, as estatísticas desse pool;
+    por padrão, o próprio `engine` e `estatisticas_pool`.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        intervalo: float = SAUDE_INTERVALO_S,
+        saturacao_max: float = SAUDE_SATURACAO_MAX,
+        engine_rotas: Optional[Engine] = None,
+        estatisticas: Optional[EstatisticasPool] = None
+    ):
+        self.engine = engine
+        self.engine_rotas = engine_rotas or engine
+        self.estatisticas = estatisticas or estatisticas_pool
+        self.intervalo = intervalo
+        self.saturacao_max = saturacao_max
+        self.banco_ok = False
+        self.erro: Optional[str] = None
+        self.latencia_ms: Optional[float] = None
+        self.verificado_em: Optional[float] = None
+        self._tarefa: Optional[asyncio.Task] = None
+
+    def verificar(self) -> bool:
+        """Executa SELECT 1 por uma conexão do pool e guarda o resultado"""
+        inicio = time.perf_counter()
+        try:
+            with self.engine.connect() as conexao:
+                conexao.exec_driver_sql("SELECT 1")
+            self.banco_ok, self.erro = True, None
+        except Exception as e:
+            self.banco_ok, self.erro = False, str(e)
+        self.latencia_ms = round((time.perf_counter() - inicio) * 1000, 3)
+        self.verificado_em = time.monotonic()
+        return self.banco_ok
+
+    async def _executar(self):
+        while True:
+            await asyncio.sleep(self.intervalo)
+            await run_in_threadpool(self.verificar)
+
+    async def iniciar(self):
+        """Faz a primeira verificação e agenda as seguintes"""
+        await run_in_threadpool(self.verificar)
+        self._tarefa = asyncio.create_task(self._executar())
+
+    async def parar(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+
+    def estado(self) -> dict:
+        """Último resultado da verificação e saturação do pool, sem nenhuma E/S"""
+        pool = self.estatisticas.snapshot(self.engine_rotas)
+        if pool.get("max_overflow", 0) < 0:
+            # Overflow ilimitado: o checkout nunca espera, não há capacidade a saturar
+            capacidade, saturacao = None, 0.0
+        else:
+            capacidade = pool.get("tamanho", 0) + pool.get("max_overflow", 0)
+            saturacao = round(pool["em_uso"] / capacidade, 3) if capacidade > 0 else 0.0
+        idade = None if self.verificado_em is None else round(time.monotonic() - self.verificado_em, 3)
+        # Sem verificação recente, a tarefa travou (ex.: esperando conexão do pool)
+        atualizado = idade is not None and idade <= self.intervalo * 3
+        saturado = saturacao >= self.saturacao_max
+        return {
+            "pronto": self.banco_ok and atualizado and not saturado,
+            "banco": {
+                "ok": self.banco_ok,
+                "erro": self.erro,
+                "latencia_ms": self.latencia_ms,
+                "verificado_ha_s": idade,
+            },
+            "pool": {
+                "em_uso": pool.get("em_uso", 0),
+                "capacidade": capacidade,
+                "saturacao": saturacao,
+                "saturado": saturado,
+                "timeouts": pool["timeouts"],
+            },
+        }
+
+
+# Com DB_ASYNC=true as rotas de CRUD usam o pool do AsyncEngine
+monitor_saude = MonitorSaude(engine, engine_rotas=engine_rotas, estatisticas=estatisticas_pool_rotas)
@@ -1,7 +1,23 @@
-from .registro_schema import RegistroCreate, RegistroResponse, RegistroUpdate
-from .tipo_de_gasto_schema import TipoDeGastoCreate, TipoDeGastoResponse, TipoDeGastoUpdate
+from .registro_schema import (
+    RegistroCreate, RegistroResponse, RegistroUpdate, RegistroPagina,
+    IdsRequest, RegistroPorIdsResponse,
+    RegistroLoteCreate, RegistroLoteResponse, ErroItemLote,
+    ImportacaoResponse, LinhaRejeitada,
+    ResumoResponse, ResumoTipoGasto, ResumoMes
+)
+from .tipo_de_gasto_schema import (
+    TipoDeGastoCreate, TipoDeGastoResponse, TipoDeGastoUpdate, TipoDeGastoPagina,
+    TipoDeGastoComTotaisResponse, TipoDeGastoPorIdsResponse
+)
+from .relatorio_schema import GastoMensalResponse
 
 __all__ = [
-    "RegistroCreate", "RegistroResponse", "RegistroUpdate",
-    "TipoDeGastoCreate", "TipoDeGastoResponse", "TipoDeGastoUpdate"
+    "RegistroCreate", "RegistroResponse", "RegistroUpdate", "RegistroPagina",
+    "IdsRequest", "RegistroPorIdsResponse",
+    "RegistroLoteCreate", "RegistroLoteResponse", "ErroItemLote",
+    "ImportacaoResponse", "LinhaRejeitada",
+    "ResumoResponse", "ResumoTipoGasto", "ResumoMes",
+    "TipoDeGastoCreate", "TipoDeGastoResponse", "TipoDeGastoUpdate", "TipoDeGastoPagina",
+    "TipoDeGastoComTotaisResponse", "TipoDeGastoPorIdsResponse",
+    "GastoMensalResponse"
 ]
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Optional, List
 
 
 class RegistroBase(BaseModel):
@@ -25,3 +25,76 @@ class RegistroResponse(RegistroBase):
     
     class Config:
         orm_mode = True
+
+
+class RegistroPagina(BaseModel):
+    itens: List[RegistroResponse]
+    next_cursor: Optional[str] = Field(None, description="Cursor da próxima página; nulo na última página")
+
+
+class IdsRequest(BaseModel):
+    ids: List[int] = Field(
+        ..., min_items=1, max_items=10000,
+        description="IDs buscados; os itens da resposta seguem esta ordem"
+    )
+
+
+class RegistroPorIdsResponse(BaseModel):
+    itens: List[RegistroResponse]
+    ausentes: List[int] = Field(..., description="IDs pedidos que não existem")
+
+
+class RegistroLoteCreate(BaseModel):
+    registros: List[Dict[str, Any]] = Field(
+        ..., min_items=1, max_items=10000,
+        description="Registros no formato de RegistroCreate; cada item é validado individualmente"
+    )
+    tudo_ou_nada: bool = Field(
+        True,
+        description="Se verdadeiro, nenhum registro é criado quando algum item é inválido"
+    )
+
+
+class ErroItemLote(BaseModel):
+    indice: int = Field(..., description="Posição do item na lista enviada")
+    erros: List[str]
+
+
+class RegistroLoteResponse(BaseModel):
+    ids: List[int] = Field(..., description="IDs criados, na ordem dos itens válidos")
+    total_criados: int
+    erros: List[ErroItemLote] = []
+
+
+class LinhaRejeitada(BaseModel):
+    linha: int = Field(..., description="Número da linha no arquivo")
+    erros: List[str]
+
+
+class ImportacaoResponse(BaseModel):
+    total_linhas: int
+    importados: int
+    rejeitados: int
+    linhas_rejeitadas: List[LinhaRejeitada] = Field(
+        [], description="Detalhe das primeiras linhas rejeitadas"
+    )
+
+
+class ResumoTipoGasto(BaseModel):
+    fk_tipo_gasto: int
+    descricao: str
+    total_gasto: float
+    total_registros: int
+
+
+class ResumoMes(BaseModel):
+    referencia: str = Field(..., description="Mês de referência no formato AAAA-MM")
+    total_gasto: float
+    total_registros: int
+
+
+class ResumoResponse(BaseModel):
+    total_gasto: float
+    total_registros: int
+    por_tipo: List[ResumoTipoGasto] = []
+    mes_atual: ResumoMes
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+
+
+class GastoMensalResponse(BaseModel):
+    ano_mes: str = Field(..., description="Mês no formato AAAA-MM")
+    fk_tipo_gasto: int
+    total_gasto: float
+    total_registros: int
+
+    class Config:
+        orm_mode = True
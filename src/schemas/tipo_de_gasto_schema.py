@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Union
 from .registro_schema import RegistroResponse
 
 
@@ -21,3 +21,23 @@ class TipoDeGastoResponse(TipoDeGastoBase):
     
     class Config:
         orm_mode = True
+
+
+class TipoDeGastoComTotaisResponse(TipoDeGastoBase):
+    id: int
+    total_registros: int = Field(..., description="Quantidade de registros do tipo")
+    total_gasto: float = Field(..., description="Soma dos valores dos registros do tipo")
+
+    class Config:
+        orm_mode = True
+
+
+class TipoDeGastoPagina(BaseModel):
+    # Totais primeiro: objetos ORM não têm total_registros e caem no segundo formato
+    itens: List[Union[TipoDeGastoComTotaisResponse, TipoDeGastoResponse]]
+    next_cursor: Optional[str] = Field(None, description="Cursor da próxima página; nulo na última página")
+
+
+class TipoDeGastoPorIdsResponse(BaseModel):
+    itens: List[Union[TipoDeGastoComTotaisResponse, TipoDeGastoResponse]]
+    ausentes: List[int] = Field(..., description="IDs pedidos que não existem")
@@ -1,4 +1,7 @@
 from .registro_service import RegistroService
 from .tipo_de_gasto_service import TipoDeGastoService
+from .registro_service_async import RegistroServiceAsync
+from .tipo_de_gasto_service_async import TipoDeGastoServiceAsync
+from .relatorio_service import RelatorioService
 
-__all__ = ["RegistroService", "TipoDeGastoService"]
+__all__ = ["RegistroService", "TipoDeGastoService", "RegistroServiceAsync", "TipoDeGastoServiceAsync", "RelatorioService"]
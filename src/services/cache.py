@@ -0,0 +1,206 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class BackendMemoria:
+    """Cache LRU com expiração por TTL, limitado a max_itens, local ao processo"""
+
+    def __init__(self, max_itens: int = 1024, ttl: float = 300):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self.despejos = 0
+        self._itens: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave: str) -> Optional[Any]:
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            valor, expira_em = item
+            if expira_em < time.monotonic():
+                del self._itens[chave]
+                return None
+            self._itens.move_to_end(chave)
+            return valor
+
+    def definir(self, chave: str, valor: Any):
+        if self.max_itens <= 0:
+            # max_itens=0 desativa o cache
+            return
+        with self._lock:
+            self._itens[chave] = (valor, time.monotonic() + self.ttl)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+                self.despejos += 1
+
+    def remover(self, chave: str):
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+    def tamanho(self) -> int:
+        return len(self._itens)
+
+
+class BackendRedis:
+    """Cache compartilhado entre workers/processos em um Redis (requer o pacote redis)"""
+
+    def __init__(self, url: str, ttl: float = 300, prefixo: str = "kairos:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requer o pacote 'redis' (pip install redis)")
+        self.ttl = ttl
+        self.prefixo = prefixo
+        self.despejos = 0
+        self._cliente = redis.Redis.from_url(url)
+
+    def obter(self, chave: str) -> Optional[Any]:
+        valor = self._cliente.get(self.prefixo + chave)
+        return json.loads(valor) if valor is not None else None
+
+    def definir(self, chave: str, valor: Any):
+        self._cliente.set(self.prefixo + chave, json.dumps(valor), ex=max(int(self.ttl), 1))
+
+    def remover(self, chave: str):
+        self._cliente.delete(self.prefixo + chave)
+
+    def limpar(self):
+        for chave in self._cliente.scan_iter(match=self.prefixo + "*"):
+            self._cliente.delete(chave)
+
+    def tamanho(self) -> int:
+        return sum(1 for _ in self._cliente.scan_iter(match=self.prefixo + "*"))
+
+
+class CacheTiposGasto:
+    """Cache de consulta de tipos de gasto por id e por descrição
+
+    Guarda apenas os dados da linha ({"id", "descricao"}), nunca objetos ORM, para que
+    o valor possa ser reanexado a qualquer sessão e compartilhado entre processos.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.acertos = 0
+        self.falhas = 0
+        self.invalidacoes = 0
+        self._lock = threading.Lock()
+
+    def _contar(self, valor: Optional[dict]) -> Optional[dict]:
+        with self._lock:
+            if valor is None:
+                self.falhas += 1
+            else:
+                self.acertos += 1
+        return valor
+
+    def obter_por_id(self, tipo_gasto_id: int) -> Optional[dict]:
+        return self._contar(self.backend.obter(f"tipo_gasto:id:{tipo_gasto_id}"))
+
+    def obter_por_descricao(self, descricao: str) -> Optional[dict]:
+        return self._contar(self.backend.obter(f"tipo_gasto:descricao:{descricao}"))
+
+    def armazenar(self, tipo_gasto_id: int, descricao: str):
+        dados = {"id": tipo_gasto_id, "descricao": descricao}
+        self.backend.definir(f"tipo_gasto:id:{tipo_gasto_id}", dados)
+        self.backend.definir(f"tipo_gasto:descricao:{descricao}", dados)
+
+    def invalidar(self, tipo_gasto_id: int, *descricoes: str):
+        self.backend.remover(f"tipo_gasto:id:{tipo_gasto_id}")
+        for descricao in descricoes:
+            self.backend.remover(f"tipo_gasto:descricao:{descricao}")
+        with self._lock:
+            self.invalidacoes += 1
+
+    def limpar(self):
+        self.backend.limpar()
+
+    def estatisticas(self) -> dict:
+        total = self.acertos + self.falhas
+        return {
+            "backend": type(self.backend).__name__,
+            "itens": self.backend.tamanho(),
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": round(self.acertos / total, 4) if total else 0.0,
+            "invalidacoes": self.invalidacoes,
+            "despejos": self.backend.despejos,
+        }
+
+
+def criar_cache_tipos_gasto() -> CacheTiposGasto:
+    """Cria o cache de tipos de gasto conforme CACHE_BACKEND (memoria ou redis)"""
+    ttl = float(os.getenv("TIPO_GASTO_CACHE_TTL", 300))
+    if os.getenv("CACHE_BACKEND", "memoria") == "redis":
+        backend = BackendRedis(os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"), ttl=ttl)
+    else:
+        backend = BackendMemoria(max_itens=int(os.getenv("TIPO_GASTO_CACHE_MAX", 1024)), ttl=ttl)
+    return CacheTiposGasto(backend)
+
+
+cache_tipos_gasto = criar_cache_tipos_gasto()
+
+
+class VersaoMemoria:
+    """Versão dos dados local ao processo; a época distingue reinícios do processo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Nova época e contador zerado (ex.: no worker recém-criado a partir do mestre)"""
+        with self._lock:
+            self._epoca = uuid.uuid4().hex[:8]
+            self._contador = 0
+
+    def atual(self) -> str:
+        return f"{self._epoca}-{self._contador}"
+
+    def incrementar(self):
+        with self._lock:
+            self._contador += 1
+
+
+class VersaoRedis:
+    """Versão dos dados compartilhada entre workers/processos em um Redis"""
+
+    def __init__(self, url: str, chave: str = "kairos:versao_dados"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requer o pacote 'redis' (pip install redis)")
+        self.chave = chave
+        self._cliente = redis.Redis.from_url(url)
+
+    def atual(self) -> str:
+        valor = self._cliente.get(self.chave)
+        return valor.decode() if valor is not None else "0"
+
+    def incrementar(self):
+        self._cliente.incr(self.chave)
+
+    def reiniciar(self):
+        """A versão no Redis já é compartilhada entre os processos"""
+
+
+def criar_versao_dados():
+    """Cria o contador de versão dos dados conforme CACHE_BACKEND (memoria ou redis)"""
+    if os.getenv("CACHE_BACKEND", "memoria") == "redis":
+        return VersaoRedis(os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"))
+    return VersaoMemoria()
+
+
+# Incrementada a cada escrita em registros ou tipos de gasto; base dos ETags das listagens
+versao_dados = criar_versao_dados()
@@ -0,0 +1,72 @@
+import codecs
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, Sequence, Tuple
+
+# Colunas exportadas, na ordem das tuplas produzidas por RegistroService.iterar_registros
+CAMPOS_REGISTRO = ["id", "dt_hr_gasto", "vlr_gasto", "observacao", "fk_tipo_gasto"]
+
+# Quantidade de linhas acumuladas antes de enviar um bloco ao cliente
+LINHAS_POR_BLOCO = 500
+
+
+def _valor_serializavel(valor: Any) -> Any:
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return valor
+
+
+def gerar_csv(linhas: Iterable[Sequence[Any]]) -> Iterator[str]:
+    """Gera o CSV em blocos; o cabeçalho é enviado antes de ler a primeira linha"""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(CAMPOS_REGISTRO)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    for numero, linha in enumerate(linhas, start=1):
+        escritor.writerow([_valor_serializavel(valor) for valor in linha])
+        if numero % LINHAS_POR_BLOCO == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gerar_ndjson(linhas: Iterable[Sequence[Any]]) -> Iterator[str]:
+    """Gera NDJSON (um objeto JSON por linha) em blocos"""
+    bloco = []
+    for linha in linhas:
+        objeto = {campo: _valor_serializavel(valor) for campo, valor in zip(CAMPOS_REGISTRO, linha)}
+        bloco.append(json.dumps(objeto, ensure_ascii=False))
+        if len(bloco) == LINHAS_POR_BLOCO:
+            yield "\n".join(bloco) + "\n"
+            bloco = []
+
+    if bloco:
+        yield "\n".join(bloco) + "\n"
+
+
+def ler_csv(arquivo: BinaryIO) -> Iterator[Tuple[int, Optional[dict]]]:
+    """Lê um CSV com cabeçalho linha a linha, gerando (número da linha, dados)"""
+    leitor = csv.DictReader(codecs.iterdecode(arquivo, "utf-8-sig"))
+    for dados in leitor:
+        # Campos a mais que o cabeçalho indicam linha malformada
+        yield leitor.line_num, (None if None in dados else dados)
+
+
+def ler_ndjson(arquivo: BinaryIO) -> Iterator[Tuple[int, Optional[dict]]]:
+    """Lê NDJSON linha a linha, gerando (número da linha, dados); linhas inválidas geram None"""
+    for numero, linha in enumerate(codecs.iterdecode(arquivo, "utf-8-sig"), start=1):
+        if not linha.strip():
+            continue
+        try:
+            dados = json.loads(linha)
+        except ValueError:
+            dados = None
+        yield numero, (dados if isinstance(dados, dict) else None)
@@ -0,0 +1,35 @@
+import base64
+import binascii
+import json
+from typing import Any, Callable, Iterable, List, Tuple
+
+
+def codificar_cursor(*valores: Any) -> str:
+    """Codifica a chave de ordenação do último item da página em um cursor opaco"""
+    conteudo = json.dumps(list(valores), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(conteudo.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(cursor: str, quantidade: int) -> List[Any]:
+    """Decodifica um cursor gerado por codificar_cursor, validando o número de valores"""
+    try:
+        preenchimento = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + preenchimento).decode("utf-8"))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Cursor inválido")
+
+    if not isinstance(valores, list) or len(valores) != quantidade:
+        raise ValueError("Cursor inválido")
+    return valores
+
+
+def ordenar_por_ids(ids: Iterable[int], itens: Iterable[Any], chave: Callable[[Any], int]) -> Tuple[List[Any], List[int]]:
+    """Reordena o resultado de um IN na ordem dos ids pedidos (sem repetições) e lista os ausentes"""
+    por_id = {chave(item): item for item in itens}
+    encontrados, ausentes = [], []
+    for item_id in dict.fromkeys(ids):
+        if item_id in por_id:
+            encontrados.append(por_id[item_id])
+        else:
+            ausentes.append(item_id)
+    return encontrados, ausentes
@@ -1,62 +1,561 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, literal_column, select, tuple_
+from sqlalchemy.orm import Session, Query
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional
-from src.models import Registro
-from src.schemas import RegistroCreate, RegistroUpdate
+from pydantic import ValidationError
+from pydantic.datetime_parse import parse_datetime
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from src.models import Registro, TipoDeGasto, registros_busca, CONFIGURACAO_TEXTO_POSTGRESQL
+from src.schemas import RegistroCreate, RegistroResponse, RegistroUpdate, TipoDeGastoCreate
+from src.fila_escrita import escrita
+from .paginacao import codificar_cursor, decodificar_cursor, ordenar_por_ids
+from .tipo_de_gasto_service import TipoDeGastoService
+from .cache import versao_dados
+from .relatorio_service import RelatorioService, somar_variacao
+from .retorno import atualizar_retornando, excluir_retornando
+
+# Mantém linhas * colunas abaixo do limite de 999 parâmetros de versões antigas do SQLite
+TAMANHO_LOTE_INSERCAO = 200
+
+# Campos de RegistroResponse, na ordem do schema, para montar respostas direto das tuplas
+CAMPOS_RESPOSTA = list(RegistroResponse.__fields__)
+COLUNAS_RESPOSTA = [Registro.__table__.c[campo] for campo in CAMPOS_RESPOSTA]
+# Colunas que definem a linha do rollup mensal de um registro
+COLUNAS_ROLLUP = [Registro.__table__.c.dt_hr_gasto, Registro.__table__.c.fk_tipo_gasto, Registro.__table__.c.vlr_gasto]
+
+# Ordenações das listagens: nome -> (coluna, decrescente); o id desempata na mesma direção
+ORDENACOES = {
+    "data_desc": (Registro.dt_hr_gasto, True),
+    "data_asc": (Registro.dt_hr_gasto, False),
+    "valor_desc": (Registro.vlr_gasto, True),
+    "valor_asc": (Registro.vlr_gasto, False),
+}
+
+# Limita o detalhamento de linhas rejeitadas no resumo da importação
+MAX_LINHAS_REJEITADAS_DETALHADAS = 1000
+
+
+def _mensagens_validacao(erro: ValidationError) -> List[str]:
+    """Converte os erros do Pydantic em mensagens 'campo: mensagem'"""
+    return [f"{'.'.join(str(campo) for campo in item['loc'])}: {item['msg']}" for item in erro.errors()]
+
+
+def _converter_data_hora(valor: Any) -> datetime:
+    """Converte data/hora ISO 8601 pelo caminho rápido, recorrendo ao parser do Pydantic"""
+    if isinstance(valor, str):
+        try:
+            return datetime.fromisoformat(valor)
+        except ValueError:
+            pass
+    return parse_datetime(valor)
 
 
 class RegistroService:
     def __init__(self, db: Session):
         self.db = db
 
+    @escrita
     def criar_registro(self, registro_data: RegistroCreate) -> Registro:
         """Cria um novo registro de gasto"""
+        if not TipoDeGastoService(self.db).tipo_gasto_existe(registro_data.fk_tipo_gasto):
+            raise ValueError("Tipo de gasto não encontrado")
         try:
             registro = Registro(**registro_data.dict())
             self.db.add(registro)
+            self.db.flush()
+            variacoes = {}
+            somar_variacao(variacoes, registro.dt_hr_gasto, registro.fk_tipo_gasto, registro.vlr_gasto)
+            RelatorioService(self.db).aplicar_variacoes(variacoes)
             self.db.commit()
+            versao_dados.incrementar()
             self.db.refresh(registro)
             return registro
         except IntegrityError as e:
             self.db.rollback()
             raise ValueError(f"Erro ao criar registro: {str(e)}")
 
+    @escrita
+    def criar_registros_em_lote(self, itens: List[Dict[str, Any]], tudo_ou_nada: bool = True) -> dict:
+        """Valida e cria vários registros em uma única transação
+
+        Cada item é validado com RegistroCreate e os tipos de gasto referenciados são
+        verificados com uma única consulta. Os itens válidos são inseridos com
+        INSERT ... VALUES em lotes. Com tudo_ou_nada, nada é inserido se houver erros.
+        """
+        erros = []
+        validos = []
+        for indice, item in enumerate(itens):
+            try:
+                validos.append((indice, RegistroCreate.parse_obj(item)))
+            except ValidationError as e:
+                erros.append({"indice": indice, "erros": _mensagens_validacao(e)})
+
+        tipos_referenciados = {registro.fk_tipo_gasto for _, registro in validos}
+        tipos_existentes = {
+            tipo_id for (tipo_id,) in
+            self.db.query(TipoDeGasto.id).filter(TipoDeGasto.id.in_(tipos_referenciados))
+        } if tipos_referenciados else set()
+
+        linhas = []
+        agora = datetime.utcnow()
+        for indice, registro in validos:
+            if registro.fk_tipo_gasto not in tipos_existentes:
+                erros.append({
+                    "indice": indice,
+                    "erros": [f"fk_tipo_gasto: tipo de gasto {registro.fk_tipo_gasto} não encontrado"]
+                })
+                continue
+            linhas.append({**registro.dict(), "dt_hr_gasto": agora})
+        erros.sort(key=lambda erro: erro["indice"])
+
+        if not linhas or (tudo_ou_nada and erros):
+            return {"ids": [], "total_criados": 0, "erros": erros}
+
+        try:
+            ids = []
+            for inicio in range(0, len(linhas), TAMANHO_LOTE_INSERCAO):
+                ids.extend(self._inserir_lote(linhas[inicio:inicio + TAMANHO_LOTE_INSERCAO]))
+            self._atualizar_gastos_mensais(linhas)
+            self.db.commit()
+            versao_dados.incrementar()
+        except IntegrityError as e:
+            self.db.rollback()
+            raise ValueError(f"Erro ao criar registros em lote: {str(e)}")
+
+        return {"ids": ids, "total_criados": len(ids), "erros": erros}
+
+    def _atualizar_gastos_mensais(self, linhas: List[Dict[str, Any]]):
+        """Soma as linhas inseridas ao rollup mensal, na transação corrente"""
+        variacoes = {}
+        for linha in linhas:
+            somar_variacao(variacoes, linha["dt_hr_gasto"], linha["fk_tipo_gasto"], linha["vlr_gasto"])
+        RelatorioService(self.db).aplicar_variacoes(variacoes)
+
+    def _inserir_lote(self, linhas: List[Dict[str, Any]]) -> List[int]:
+        """Insere as linhas com um único INSERT ... VALUES e retorna os ids gerados"""
+        statement = insert(Registro).values(linhas)
+        if self.db.get_bind().dialect.implicit_returning:
+            return list(self.db.execute(statement.returning(Registro.id)).scalars())
+
+        # Sem RETURNING (SQLite no SQLAlchemy 1.4): um INSERT multi-linha recebe rowids
+        # consecutivos dentro da transação, terminando em lastrowid
+        ultimo_id = self.db.execute(statement).lastrowid
+        return list(range(ultimo_id - len(linhas) + 1, ultimo_id + 1))
+
+    def importar_registros(
+        self,
+        linhas: Iterator[Tuple[int, Optional[dict]]],
+        tamanho_lote: int = 5000,
+        criar_tipos: bool = False
+    ) -> dict:
+        """Importa registros de um iterador de (número da linha, dados), gravando em lotes
+
+        Cada linha é validada com RegistroCreate. O tipo de gasto pode vir como
+        fk_tipo_gasto (id) ou tipo_gasto (descrição), resolvido por um mapa em memória
+        carregado uma vez por importação. Cada lote é inserido com executemany e
+        confirmado, então a memória usada depende apenas de tamanho_lote.
+        """
+        tipos_por_descricao = {
+            descricao: tipo_id for tipo_id, descricao in self.db.query(TipoDeGasto.id, TipoDeGasto.descricao)
+        }
+        ids_tipos = set(tipos_por_descricao.values())
+        resumo = {"total_linhas": 0, "importados": 0, "rejeitados": 0, "linhas_rejeitadas": []}
+        agora = datetime.utcnow()
+        lote = []
+
+        def rejeitar(numero: int, erros: List[str]):
+            resumo["rejeitados"] += 1
+            if len(resumo["linhas_rejeitadas"]) < MAX_LINHAS_REJEITADAS_DETALHADAS:
+                resumo["linhas_rejeitadas"].append({"linha": numero, "erros": erros})
+
+        for numero, dados in linhas:
+            resumo["total_linhas"] += 1
+            if dados is None:
+                rejeitar(numero, ["linha malformada"])
+                continue
+
+            # Campos vazios do CSV equivalem a campos ausentes
+            dados = {campo: valor for campo, valor in dados.items() if valor not in ("", None)}
+
+            descricao = dados.pop("tipo_gasto", None)
+            if descricao is not None and not isinstance(descricao, str):
+                # NDJSON pode trazer listas/objetos, que não servem de chave do mapa de tipos
+                rejeitar(numero, ["tipo_gasto: a descrição do tipo de gasto deve ser um texto"])
+                continue
+            if descricao is not None and "fk_tipo_gasto" not in dados:
+                tipo_id = tipos_por_descricao.get(descricao)
+                if tipo_id is None and criar_tipos:
+                    try:
+                        tipo_gasto_data = TipoDeGastoCreate(descricao=descricao)
+                    except ValidationError as e:
+                        rejeitar(numero, _mensagens_validacao(e))
+                        continue
+                    tipo_id = tipos_por_descricao[descricao] = self._criar_tipo_importacao(tipo_gasto_data)
+                    ids_tipos.add(tipo_id)
+                if tipo_id is None:
+                    rejeitar(numero, [f"tipo_gasto: tipo de gasto '{descricao}' não encontrado"])
+                    continue
+                dados["fk_tipo_gasto"] = tipo_id
+
+            try:
+                registro = RegistroCreate.parse_obj(dados)
+            except ValidationError as e:
+                rejeitar(numero, _mensagens_validacao(e))
+                continue
+
+            if registro.fk_tipo_gasto not in ids_tipos:
+                rejeitar(numero, [f"fk_tipo_gasto: tipo de gasto {registro.fk_tipo_gasto} não encontrado"])
+                continue
+
+            try:
+                dt_hr_gasto = _converter_data_hora(dados["dt_hr_gasto"]) if "dt_hr_gasto" in dados else agora
+            except (TypeError, ValueError):
+                rejeitar(numero, ["dt_hr_gasto: data/hora inválida"])
+                continue
+
+            lote.append({
+                "vlr_gasto": registro.vlr_gasto,
+                "observacao": registro.observacao,
+                "fk_tipo_gasto": registro.fk_tipo_gasto,
+                "dt_hr_gasto": dt_hr_gasto
+            })
+            if len(lote) >= tamanho_lote:
+                self._gravar_lote_importacao(lote, resumo)
+                lote = []
+
+        self._gravar_lote_importacao(lote, resumo)
+        return resumo
+
+    @escrita
+    def _criar_tipo_importacao(self, tipo_gasto_data: TipoDeGastoCreate) -> int:
+        """Cria (ou reaproveita, se criado em paralelo) um tipo de gasto citado na importação"""
+        try:
+            tipo_gasto = TipoDeGasto(**tipo_gasto_data.dict())
+            self.db.add(tipo_gasto)
+            self.db.commit()
+            versao_dados.incrementar()
+            return tipo_gasto.id
+        except IntegrityError:
+            self.db.rollback()
+            return self.db.query(TipoDeGasto.id).filter(TipoDeGasto.descricao == tipo_gasto_data.descricao).scalar()
+
+    @escrita
+    def _gravar_lote_importacao(self, lote: List[Dict[str, Any]], resumo: dict):
+        """Insere um lote da importação com executemany e confirma a transação"""
+        try:
+            if lote:
+                self.db.execute(insert(Registro), lote)
+                self._atualizar_gastos_mensais(lote)
+            self.db.commit()
+            versao_dados.incrementar()
+        except IntegrityError as e:
+            self.db.rollback()
+            raise ValueError(f"Erro ao importar registros após {resumo['importados']} importados: {str(e)}")
+        resumo["importados"] += len(lote)
+
     def obter_registro_por_id(self, registro_id: int) -> Optional[Registro]:
         """Obtém um registro por ID"""
         return self.db.query(Registro).filter(Registro.id == registro_id).first()
 
-    def obter_todos_registros(self, skip: int = 0, limit: int = 100) -> List[Registro]:
-        """Obtém todos os registros com paginação"""
-        return self.db.query(Registro).offset(skip).limit(limit).all()
+    def obter_registros_por_ids(
+        self, ids: List[int], como_dicionarios: bool = False
+    ) -> Tuple[List[Registro], List[int]]:
+        """Obtém vários registros com um único SELECT ... WHERE id IN (...)
+
+        Retorna os registros na ordem dos ids pedidos (repetidos aparecem uma vez) e os ids
+        não encontrados. Com como_dicionarios, os itens são dicts no formato de RegistroResponse.
+        """
+        linhas = self._consulta_listagem(como_dicionarios).filter(Registro.id.in_(set(ids))).all()
+        if como_dicionarios:
+            linhas = [dict(zip(CAMPOS_RESPOSTA, linha)) for linha in linhas]
+            return ordenar_por_ids(ids, linhas, lambda registro: registro["id"])
+        return ordenar_por_ids(ids, linhas, lambda registro: registro.id)
+
+    def _consulta_listagem(self, como_dicionarios: bool) -> Query:
+        """Consulta de entidades ou, com como_dicionarios, apenas das colunas de RegistroResponse"""
+        if como_dicionarios:
+            return self.db.query(*(getattr(Registro, campo) for campo in CAMPOS_RESPOSTA))
+        return self.db.query(Registro)
+
+    def obter_todos_registros(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        como_dicionarios: bool = False,
+        inicio: Optional[datetime] = None,
+        fim: Optional[datetime] = None,
+        valor_min: Optional[float] = None,
+        valor_max: Optional[float] = None,
+        fk_tipo_gasto: Optional[int] = None,
+        ordem: Optional[str] = None
+    ) -> List[Registro]:
+        """Obtém todos os registros com paginação, filtros opcionais e ordenação
+
+        Os filtros são servidos pelos índices de registros: (dt_hr_gasto, id),
+        (vlr_gasto, id), (fk_tipo_gasto, dt_hr_gasto) e (fk_tipo_gasto, vlr_gasto).
+        Sem `ordem`, mantém a ordem natural da tabela.
+        Com como_dicionarios, retorna dicts no formato de RegistroResponse montados direto
+        das tuplas, sem criar entidades ORM nem validar cada item com o Pydantic.
+        """
+        query = self._aplicar_filtros(
+            self._consulta_listagem(como_dicionarios),
+            inicio=inicio, fim=fim, fk_tipo_gasto=fk_tipo_gasto, valor_min=valor_min, valor_max=valor_max
+        )
+        if ordem is not None:
+            query = self._ordenar(query, ordem)
+        linhas = query.offset(skip).limit(limit).all()
+        if como_dicionarios:
+            return [dict(zip(CAMPOS_RESPOSTA, linha)) for linha in linhas]
+        return linhas
+
+    def _aplicar_filtros(
+        self,
+        query: Query,
+        inicio: Optional[datetime] = None,
+        fim: Optional[datetime] = None,
+        fk_tipo_gasto: Optional[int] = None,
+        valor_min: Optional[float] = None,
+        valor_max: Optional[float] = None
+    ) -> Query:
+        """Aplica os filtros opcionais de período e faixa de valor (inclusivos) e tipo de gasto"""
+        if inicio is not None:
+            query = query.filter(Registro.dt_hr_gasto >= inicio)
+        if fim is not None:
+            query = query.filter(Registro.dt_hr_gasto <= fim)
+        if valor_min is not None:
+            query = query.filter(Registro.vlr_gasto >= valor_min)
+        if valor_max is not None:
+            query = query.filter(Registro.vlr_gasto <= valor_max)
+        if fk_tipo_gasto is not None:
+            query = query.filter(Registro.fk_tipo_gasto == fk_tipo_gasto)
+        return query
+
+    @staticmethod
+    def _ordenar(query: Query, ordem: str) -> Query:
+        """Ordena pela coluna de `ordem` com id como desempate, na mesma direção"""
+        coluna, decrescente = ORDENACOES[ordem]
+        if decrescente:
+            return query.order_by(coluna.desc(), Registro.id.desc())
+        return query.order_by(coluna, Registro.id)
+
+    def iterar_registros(
+        self,
+        inicio: Optional[datetime] = None,
+        fim: Optional[datetime] = None,
+        fk_tipo_gasto: Optional[int] = None,
+        tamanho_lote: int = 1000,
+        valor_min: Optional[float] = None,
+        valor_max: Optional[float] = None
+    ) -> Iterator[tuple]:
+        """Itera sobre os registros filtrados como tuplas, em ordem cronológica
+
+        Usa cursor do lado do servidor (stream_results) e busca em lotes (yield_per),
+        então a memória usada não depende do tamanho da tabela.
+        """
+        query = self.db.query(
+            Registro.id,
+            Registro.dt_hr_gasto,
+            Registro.vlr_gasto,
+            Registro.observacao,
+            Registro.fk_tipo_gasto
+        )
+        query = self._aplicar_filtros(
+            query, inicio=inicio, fim=fim, fk_tipo_gasto=fk_tipo_gasto, valor_min=valor_min, valor_max=valor_max
+        )
+        query = query.order_by(Registro.dt_hr_gasto, Registro.id)
+        for linha in query.execution_options(stream_results=True).yield_per(tamanho_lote):
+            yield tuple(linha)
+
+    def obter_registros_por_cursor(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        como_dicionarios: bool = False,
+        inicio: Optional[datetime] = None,
+        fim: Optional[datetime] = None,
+        valor_min: Optional[float] = None,
+        valor_max: Optional[float] = None,
+        fk_tipo_gasto: Optional[int] = None,
+        ordem: str = "data_desc"
+    ) -> Tuple[List[Registro], Optional[str]]:
+        """Obtém uma página de registros filtrados a partir de um cursor opaco
+
+        Usa busca por chave (coluna de `ordem`, id) em vez de OFFSET, então o custo de
+        cada página não depende da profundidade. O cursor carrega a ordenação e a chave
+        do último item; usá-lo com outra `ordem` é rejeitado. Retorna os registros e o
+        cursor da próxima página. Com como_dicionarios, os registros vêm como dicts
+        (veja obter_todos_registros).
+        """
+        coluna, decrescente = ORDENACOES[ordem]
+        query = self._aplicar_filtros(
+            self._consulta_listagem(como_dicionarios),
+            inicio=inicio, fim=fim, fk_tipo_gasto=fk_tipo_gasto, valor_min=valor_min, valor_max=valor_max
+        )
+        if cursor:
+            ordem_cursor, chave, registro_id = decodificar_cursor(cursor, 3)
+            if ordem_cursor != ordem:
+                raise ValueError("Cursor inválido")
+            try:
+                chave = datetime.fromisoformat(chave) if coluna is Registro.dt_hr_gasto else float(chave)
+                registro_id = int(registro_id)
+            except (TypeError, ValueError):
+                raise ValueError("Cursor inválido")
+            posicao = tuple_(coluna, Registro.id)
+            query = query.filter(posicao < tuple_(chave, registro_id) if decrescente else posicao > tuple_(chave, registro_id))
+
+        registros = self._ordenar(query, ordem).limit(limit + 1).all()
 
+        proximo_cursor = None
+        if len(registros) > limit:
+            registros = registros[:limit]
+            ultimo = registros[-1]
+            chave = getattr(ultimo, coluna.key)
+            proximo_cursor = codificar_cursor(
+                ordem, chave.isoformat() if isinstance(chave, datetime) else chave, ultimo.id
+            )
+        if como_dicionarios:
+            registros = [dict(zip(CAMPOS_RESPOSTA, linha)) for linha in registros]
+        return registros, proximo_cursor
+
+    def buscar_registros(
+        self,
+        termo: str,
+        skip: int = 0,
+        limit: int = 100,
+        como_dicionarios: bool = False
+    ) -> List[Registro]:
+        """Busca registros pela observação, do mais ao menos relevante
+
+        Todas as palavras do termo precisam aparecer; as com 3 ou mais letras são buscadas
+        como prefixo (ex.: "farm" encontra "Farmácia"), as menores só por inteiro, para que
+        prefixos curtos não casem com boa parte do índice. No SQLite usa a tabela FTS5 registros_busca ordenada por
+        bm25, sem diferenciar acentos; no PostgreSQL usa o índice GIN de to_tsvector
+        ordenado por ts_rank. Com como_dicionarios, retorna dicts (veja obter_todos_registros).
+        """
+        palavras = re.findall(r"\w+", termo)
+        if not palavras:
+            return []
+
+        query = self._consulta_listagem(como_dicionarios)
+        if self.db.get_bind().dialect.name == "postgresql":
+            documento = func.to_tsvector(CONFIGURACAO_TEXTO_POSTGRESQL, func.coalesce(Registro.observacao, ""))
+            consulta = func.to_tsquery(CONFIGURACAO_TEXTO_POSTGRESQL, " & ".join(f"{palavra}:*" if len(palavra) >= 3 else palavra for palavra in palavras))
+            query = query.filter(documento.op("@@")(consulta)).order_by(func.ts_rank(documento, consulta).desc(), Registro.id)
+            linhas = query.offset(skip).limit(limit).all()
+        else:
+            # A página é escolhida só no índice FTS5 (top-k por bm25) e depois os
+            # registros são lidos pela chave primária
+            consulta = " ".join(f'"{palavra}"*' if len(palavra) >= 3 else f'"{palavra}"' for palavra in palavras)
+            pagina = (
+                select(registros_busca.c.rowid, registros_busca.c.rank)
+                .where(literal_column("registros_busca").op("MATCH")(consulta))
+                .order_by(registros_busca.c.rank, registros_busca.c.rowid)
+                .offset(skip)
+                .limit(limit)
+                .subquery()
+            )
+            linhas = query.join(pagina, pagina.c.rowid == Registro.id).order_by(pagina.c.rank, Registro.id).all()
+
+        if como_dicionarios:
+            return [dict(zip(CAMPOS_RESPOSTA, linha)) for linha in linhas]
+        return linhas
+
+    @escrita
     def atualizar_registro(self, registro_id: int, registro_data: RegistroUpdate) -> Optional[Registro]:
-        """Atualiza um registro existente"""
-        registro = self.obter_registro_por_id(registro_id)
-        if not registro:
-            return None
-        
+        """Atualiza um registro existente
+
+        O UPDATE retorna a linha atualizada (RETURNING), sem SELECT antes nem depois. Os valores
+        anteriores só são lidos quando a alteração move o registro no rollup mensal.
+        """
+        update_data = registro_data.dict(exclude_unset=True)
+        if not update_data:
+            return self.obter_registro_por_id(registro_id)
+        fk_tipo_gasto = update_data.get("fk_tipo_gasto")
+        if fk_tipo_gasto is not None and not TipoDeGastoService(self.db).tipo_gasto_existe(fk_tipo_gasto):
+            raise ValueError("Tipo de gasto não encontrado")
+
+        altera_rollup = any(coluna.name in update_data for coluna in COLUNAS_ROLLUP)
         try:
-            update_data = registro_data.dict(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(registro, field, value)
-            
+            resultado = atualizar_retornando(
+                self.db, Registro.__table__, registro_id, update_data, COLUNAS_RESPOSTA,
+                anteriores=COLUNAS_ROLLUP if altera_rollup else ()
+            )
+            if resultado is None:
+                return None
+            atual, anterior = resultado
+
+            if altera_rollup:
+                # Move o valor entre meses/tipos do rollup; variações que se anulam são ignoradas
+                variacoes = {}
+                somar_variacao(variacoes, anterior["dt_hr_gasto"], anterior["fk_tipo_gasto"], anterior["vlr_gasto"], sinal=-1)
+                somar_variacao(variacoes, atual["dt_hr_gasto"], atual["fk_tipo_gasto"], atual["vlr_gasto"])
+                RelatorioService(self.db).aplicar_variacoes(variacoes)
             self.db.commit()
-            self.db.refresh(registro)
-            return registro
         except IntegrityError as e:
             self.db.rollback()
             raise ValueError(f"Erro ao atualizar registro: {str(e)}")
 
+        versao_dados.incrementar()
+        return Registro(**atual)
+
+    @escrita
     def deletar_registro(self, registro_id: int) -> bool:
-        """Deleta um registro"""
-        registro = self.obter_registro_por_id(registro_id)
-        if not registro:
+        """Deleta um registro com DELETE ... RETURNING dos valores usados pelo rollup"""
+        anterior = excluir_retornando(self.db, Registro.__table__, registro_id, COLUNAS_ROLLUP)
+        if anterior is None:
             return False
-        
-        self.db.delete(registro)
+
+        variacoes = {}
+        somar_variacao(variacoes, anterior["dt_hr_gasto"], anterior["fk_tipo_gasto"], anterior["vlr_gasto"], sinal=-1)
+        RelatorioService(self.db).aplicar_variacoes(variacoes)
         self.db.commit()
+        versao_dados.incrementar()
         return True
 
     def obter_registros_por_tipo_gasto(self, tipo_gasto_id: int) -> List[Registro]:
         """Obtém todos os registros de um tipo de gasto específico"""
         return self.db.query(Registro).filter(Registro.fk_tipo_gasto == tipo_gasto_id).all()
+
+    def obter_resumo(self) -> dict:
+        """Obtém totais gerais, por tipo de gasto e do mês atual calculados no banco"""
+        total_gasto, total_registros = self.db.query(
+            func.coalesce(func.sum(Registro.vlr_gasto), 0.0),
+            func.count(Registro.id)
+        ).one()
+
+        por_tipo = self.db.query(
+            TipoDeGasto.id.label("fk_tipo_gasto"),
+            TipoDeGasto.descricao,
+            func.coalesce(func.sum(Registro.vlr_gasto), 0.0).label("total_gasto"),
+            func.count(Registro.id).label("total_registros")
+        ).outerjoin(
+            Registro, Registro.fk_tipo_gasto == TipoDeGasto.id
+        ).group_by(TipoDeGasto.id, TipoDeGasto.descricao).order_by(TipoDeGasto.descricao).all()
+
+        # Intervalo semiaberto [início do mês, início do próximo mês) para aproveitar índices em dt_hr_gasto
+        agora = datetime.utcnow()
+        inicio_mes = agora.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        if inicio_mes.month == 12:
+            inicio_proximo_mes = inicio_mes.replace(year=inicio_mes.year + 1, month=1)
+        else:
+            inicio_proximo_mes = inicio_mes.replace(month=inicio_mes.month + 1)
+
+        total_mes, registros_mes = self.db.query(
+            func.coalesce(func.sum(Registro.vlr_gasto), 0.0),
+            func.count(Registro.id)
+        ).filter(
+            Registro.dt_hr_gasto >= inicio_mes,
+            Registro.dt_hr_gasto < inicio_proximo_mes
+        ).one()
+
+        return {
+            "total_gasto": total_gasto,
+            "total_registros": total_registros,
+            "por_tipo": [dict(linha._mapping) for linha in por_tipo],
+            "mes_atual": {
+                "referencia": inicio_mes.strftime("%Y-%m"),
+                "total_gasto": total_mes,
+                "total_registros": registros_mes
+            }
+        }
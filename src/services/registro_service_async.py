@@ -0,0 +1,104 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+from src.schemas import RegistroCreate, RegistroResponse, RegistroUpdate
+from .registro_service import RegistroService
+
+
+class RegistroServiceAsync:
+    """Variante assíncrona de RegistroService
+
+    Executa os métodos de RegistroService na sessão síncrona por trás da AsyncSession
+    (AsyncSession.run_sync): as regras ficam em um só lugar e o I/O passa pelo driver
+    assíncrono. Os resultados são convertidos em schemas dentro de run_sync, onde
+    carregamentos tardios ainda podem acessar o banco.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def criar_registro(self, registro_data: RegistroCreate) -> RegistroResponse:
+        """Cria um novo registro de gasto"""
+        return await self.db.run_sync(
+            lambda sessao: RegistroResponse.from_orm(RegistroService(sessao).criar_registro(registro_data))
+        )
+
+    async def obter_registro_por_id(self, registro_id: int) -> Optional[RegistroResponse]:
+        """Obtém um registro por ID"""
+        def executar(sessao):
+            registro = RegistroService(sessao).obter_registro_por_id(registro_id)
+            return RegistroResponse.from_orm(registro) if registro else None
+        return await self.db.run_sync(executar)
+
+    async def obter_registros_por_ids(
+        self, ids: List[int], como_dicionarios: bool = False
+    ) -> Tuple[List[RegistroResponse], List[int]]:
+        """Obtém vários registros por id em uma consulta, na ordem pedida, e os ids ausentes"""
+        def executar(sessao):
+            registros, ausentes = RegistroService(sessao).obter_registros_por_ids(ids, como_dicionarios=como_dicionarios)
+            if como_dicionarios:
+                return registros, ausentes
+            return [RegistroResponse.from_orm(registro) for registro in registros], ausentes
+        return await self.db.run_sync(executar)
+
+    async def obter_todos_registros(
+        self, skip: int = 0, limit: int = 100, como_dicionarios: bool = False, **filtros
+    ) -> List[RegistroResponse]:
+        """Obtém os registros com paginação, filtros e ordem (como dicts com como_dicionarios)"""
+        def executar(sessao):
+            registros = RegistroService(sessao).obter_todos_registros(
+                skip=skip, limit=limit, como_dicionarios=como_dicionarios, **filtros
+            )
+            if como_dicionarios:
+                return registros
+            return [RegistroResponse.from_orm(registro) for registro in registros]
+        return await self.db.run_sync(executar)
+
+    async def obter_registros_por_cursor(
+        self, cursor: Optional[str] = None, limit: int = 100, como_dicionarios: bool = False, **filtros
+    ) -> Tuple[List[RegistroResponse], Optional[str]]:
+        """Obtém uma página de registros filtrados a partir de um cursor opaco (como dicts com como_dicionarios)"""
+        def executar(sessao):
+            registros, proximo_cursor = RegistroService(sessao).obter_registros_por_cursor(
+                cursor=cursor, limit=limit, como_dicionarios=como_dicionarios, **filtros
+            )
+            if como_dicionarios:
+                return registros, proximo_cursor
+            return [RegistroResponse.from_orm(registro) for registro in registros], proximo_cursor
+        return await self.db.run_sync(executar)
+
+    async def buscar_registros(
+        self, termo: str, skip: int = 0, limit: int = 100, como_dicionarios: bool = False
+    ) -> List[RegistroResponse]:
+        """Busca registros pela observação, do mais ao menos relevante (como dicts com como_dicionarios)"""
+        def executar(sessao):
+            registros = RegistroService(sessao).buscar_registros(
+                termo, skip=skip, limit=limit, como_dicionarios=como_dicionarios
+            )
+            if como_dicionarios:
+                return registros
+            return [RegistroResponse.from_orm(registro) for registro in registros]
+        return await self.db.run_sync(executar)
+
+    async def atualizar_registro(self, registro_id: int, registro_data: RegistroUpdate) -> Optional[RegistroResponse]:
+        """Atualiza um registro existente"""
+        def executar(sessao):
+            registro = RegistroService(sessao).atualizar_registro(registro_id, registro_data)
+            return RegistroResponse.from_orm(registro) if registro else None
+        return await self.db.run_sync(executar)
+
+    async def deletar_registro(self, registro_id: int) -> bool:
+        """Deleta um registro"""
+        return await self.db.run_sync(lambda sessao: RegistroService(sessao).deletar_registro(registro_id))
+
+    async def obter_registros_por_tipo_gasto(self, tipo_gasto_id: int) -> List[RegistroResponse]:
+        """Obtém todos os registros de um tipo de gasto específico"""
+        return await self.db.run_sync(
+            lambda sessao: [
+                RegistroResponse.from_orm(registro)
+                for registro in RegistroService(sessao).obter_registros_por_tipo_gasto(tipo_gasto_id)
+            ]
+        )
+
+    async def obter_resumo(self) -> dict:
+        """Obtém totais gerais, por tipo de gasto e do mês atual calculados no banco"""
+        return await self.db.run_sync(lambda sessao: RegistroService(sessao).obter_resumo())
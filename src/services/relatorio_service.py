@@ -0,0 +1,135 @@
+from sqlalchemy import func, insert, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from src.models import GastoMensal, Registro
+from src.fila_escrita import escrita
+from .cache import versao_dados
+
+# Variações do rollup por (ano_mes, fk_tipo_gasto): [valor, quantidade de registros]
+Variacoes = Dict[Tuple[str, int], List[float]]
+
+
+def somar_variacao(
+    variacoes: Variacoes,
+    dt_hr_gasto: Optional[datetime],
+    fk_tipo_gasto: Optional[int],
+    vlr_gasto: float,
+    sinal: int = 1
+):
+    """Acumula em `variacoes` a entrada (sinal=1) ou saída (sinal=-1) de um registro do rollup"""
+    if dt_hr_gasto is None or fk_tipo_gasto is None:
+        return
+    variacao = variacoes.setdefault((dt_hr_gasto.strftime("%Y-%m"), fk_tipo_gasto), [0.0, 0])
+    variacao[0] += sinal * vlr_gasto
+    variacao[1] += sinal
+
+
+class RelatorioService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _expressao_ano_mes(self):
+        """Expressão SQL 'AAAA-MM' de dt_hr_gasto no dialeto do banco"""
+        if self.db.get_bind().dialect.name == "postgresql":
+            return func.to_char(Registro.dt_hr_gasto, "YYYY-MM")
+        return func.strftime("%Y-%m", Registro.dt_hr_gasto)
+
+    def aplicar_variacoes(self, variacoes: Variacoes):
+        """Soma as variações ao rollup na transação corrente, sem confirmar
+
+        Usa um único INSERT ... ON CONFLICT DO UPDATE (executemany) para todas as chaves
+        e remove as linhas que ficaram sem registros.
+        """
+        linhas = [
+            {"ano_mes": ano_mes, "fk_tipo_gasto": fk_tipo_gasto, "total_gasto": valor, "total_registros": quantidade}
+            for (ano_mes, fk_tipo_gasto), (valor, quantidade) in variacoes.items()
+            if valor or quantidade
+        ]
+        if not linhas:
+            return
+
+        dialeto = postgresql if self.db.get_bind().dialect.name == "postgresql" else sqlite
+        statement = dialeto.insert(GastoMensal)
+        statement = statement.on_conflict_do_update(
+            index_elements=[GastoMensal.ano_mes, GastoMensal.fk_tipo_gasto],
+            set_={
+                "total_gasto": GastoMensal.total_gasto + statement.excluded.total_gasto,
+                "total_registros": GastoMensal.total_registros + statement.excluded.total_registros,
+            }
+        )
+        self.db.execute(statement, linhas)
+
+        chaves_reduzidas = [(linha["ano_mes"], linha["fk_tipo_gasto"]) for linha in linhas if linha["total_registros"] < 0]
+        if chaves_reduzidas:
+            self.db.query(GastoMensal).filter(
+                tuple_(GastoMensal.ano_mes, GastoMensal.fk_tipo_gasto).in_(chaves_reduzidas),
+                GastoMensal.total_registros <= 0
+            ).delete(synchronize_session=False)
+
+    def obter_gastos_mensais(
+        self,
+        inicio: Optional[str] = None,
+        fim: Optional[str] = None,
+        fk_tipo_gasto: Optional[int] = None
+    ) -> List[GastoMensal]:
+        """Obtém os totais mensais por tipo (meses 'AAAA-MM', inclusivos) lendo apenas o rollup"""
+        query = self.db.query(GastoMensal)
+        if inicio is not None:
+            query = query.filter(GastoMensal.ano_mes >= inicio)
+        if fim is not None:
+            query = query.filter(GastoMensal.ano_mes <= fim)
+        if fk_tipo_gasto is not None:
+            query = query.filter(GastoMensal.fk_tipo_gasto == fk_tipo_gasto)
+        return query.order_by(GastoMensal.ano_mes, GastoMensal.fk_tipo_gasto).all()
+
+    def _consulta_rollup(self):
+        """SELECT dos totais por (mês, tipo) a partir de registros, na ordem das colunas do rollup"""
+        ano_mes = self._expressao_ano_mes()
+        return self.db.query(
+            ano_mes, Registro.fk_tipo_gasto, func.sum(Registro.vlr_gasto), func.count(Registro.id)
+        ).filter(
+            Registro.dt_hr_gasto.isnot(None), Registro.fk_tipo_gasto.isnot(None)
+        ).group_by(ano_mes, Registro.fk_tipo_gasto).statement
+
+    @escrita
+    def preencher_gastos_mensais(self) -> int:
+        """Faz o backfill do rollup quando gastos_mensais está vazia e há registros
+
+        Cobre bancos anteriores ao rollup em que o create_all da inicialização acabou de criar a
+        tabela vazia. Os workers sobem ao mesmo tempo e podem ver a tabela vazia juntos: o
+        INSERT ... SELECT usa ON CONFLICT DO NOTHING, então o segundo espera o primeiro e não
+        insere nada. Retorna a quantidade de linhas geradas (0 quando não há o que preencher).
+        """
+        if self.db.query(self.db.query(GastoMensal).exists()).scalar():
+            self.db.rollback()
+            return 0
+        if not self.db.query(self.db.query(Registro).exists()).scalar():
+            self.db.rollback()
+            return 0
+
+        dialeto = postgresql if self.db.get_bind().dialect.name == "postgresql" else sqlite
+        statement = dialeto.insert(GastoMensal).from_select(
+            ["ano_mes", "fk_tipo_gasto", "total_gasto", "total_registros"], self._consulta_rollup()
+        ).on_conflict_do_nothing()
+        linhas = self.db.execute(statement).rowcount
+        self.db.commit()
+        versao_dados.incrementar()
+        return linhas
+
+    @escrita
+    def reconstruir_gastos_mensais(self) -> int:
+        """Recalcula todo o rollup a partir de registros com um único INSERT ... SELECT
+
+        Retorna a quantidade de linhas (mês, tipo) geradas.
+        """
+        self.db.query(GastoMensal).delete(synchronize_session=False)
+        self.db.execute(
+            insert(GastoMensal).from_select(
+                ["ano_mes", "fk_tipo_gasto", "total_gasto", "total_registros"], self._consulta_rollup()
+            )
+        )
+        self.db.commit()
+        versao_dados.incrementar()
+        return self.db.query(func.count()).select_from(GastoMensal).scalar()
@@ -0,0 +1,94 @@
+from typing import Optional, Sequence, Tuple
+from sqlalchemy import Column, Table, bindparam, column, delete, select, text, update
+from sqlalchemy.engine import Dialect
+from sqlalchemy.orm import Session
+
+# UPDATE/DELETE ... RETURNING escrevem e leem a linha em uma única ida ao banco. O compilador
+# SQLite do SQLAlchemy 1.4 não gera RETURNING (o SQLite o aceita desde a 3.35), então os
+# comandos são montados em texto a partir das colunas da tabela, com os tipos de cada coluna
+# nos parâmetros e no resultado.
+
+
+def suporta_returning(dialeto: Dialect) -> bool:
+    """PostgreSQL e SQLite 3.35+ aceitam RETURNING em UPDATE e DELETE"""
+    if dialeto.name == "postgresql":
+        return True
+    return dialeto.name == "sqlite" and getattr(dialeto.dbapi, "sqlite_version_info", (0,)) >= (3, 35)
+
+
+def _lista(colunas: Sequence[Column], prefixo: str = "") -> str:
+    return ", ".join(f"{prefixo}{coluna.name}" for coluna in colunas)
+
+
+def atualizar_retornando(
+    db: Session,
+    tabela: Table,
+    chave: int,
+    valores: dict,
+    retorno: Sequence[Column],
+    anteriores: Sequence[Column] = ()
+) -> Optional[Tuple[dict, Optional[dict]]]:
+    """UPDATE da linha `chave` que retorna as colunas `retorno` já atualizadas
+
+    Com `anteriores`, retorna também os valores dessas colunas antes do UPDATE: no PostgreSQL,
+    no mesmo comando (UPDATE ... FROM uma subconsulta FOR UPDATE da própria linha); nos demais
+    bancos, por um SELECT antes do UPDATE. Sem RETURNING, faz o UPDATE e lê a linha em seguida.
+    Retorna None se a linha não existe.
+    """
+    dialeto = db.get_bind().dialect
+    anterior = None
+    if anteriores and dialeto.name != "postgresql":
+        linha = db.execute(select(*anteriores).where(tabela.c.id == chave)).first()
+        if linha is None:
+            return None
+        anterior = dict(linha._mapping)
+
+    if not suporta_returning(dialeto):
+        if db.execute(update(tabela).where(tabela.c.id == chave).values(valores)).rowcount == 0:
+            return None
+        return dict(db.execute(select(*retorno).where(tabela.c.id == chave)).one()._mapping), anterior
+
+    atribuicoes = ", ".join(f"{nome} = :{nome}" for nome in valores)
+    colunas_resultado = [column(coluna.name, coluna.type) for coluna in retorno]
+    if anteriores and anterior is None:
+        sql = (
+            f"UPDATE {tabela.name} SET {atribuicoes} "
+            f"FROM (SELECT id, {_lista(anteriores)} FROM {tabela.name} WHERE id = :chave FOR UPDATE) AS anterior "
+            f"WHERE {tabela.name}.id = anterior.id "
+            f"RETURNING {_lista(retorno, f'{tabela.name}.')}, "
+            + ", ".join(f"anterior.{coluna.name} AS anterior_{coluna.name}" for coluna in anteriores)
+        )
+        colunas_resultado += [column(f"anterior_{coluna.name}", coluna.type) for coluna in anteriores]
+    else:
+        sql = f"UPDATE {tabela.name} SET {atribuicoes} WHERE id = :chave RETURNING {_lista(retorno)}"
+
+    statement = text(sql).bindparams(
+        *(bindparam(nome, valor, type_=tabela.c[nome].type) for nome, valor in valores.items()),
+        bindparam("chave", chave)
+    ).columns(*colunas_resultado)
+    linha = db.execute(statement).first()
+    if linha is None:
+        return None
+    mapa = linha._mapping
+    if anteriores and anterior is None:
+        anterior = {coluna.name: mapa[f"anterior_{coluna.name}"] for coluna in anteriores}
+    return {coluna.name: mapa[coluna.name] for coluna in retorno}, anterior
+
+
+def excluir_retornando(db: Session, tabela: Table, chave: int, retorno: Sequence[Column]) -> Optional[dict]:
+    """DELETE da linha `chave` que retorna os valores das colunas `retorno` antes da exclusão
+
+    Sem RETURNING, lê a linha e a exclui em seguida. Retorna None se a linha não existe.
+    """
+    if not suporta_returning(db.get_bind().dialect):
+        linha = db.execute(select(*retorno).where(tabela.c.id == chave)).first()
+        if linha is None:
+            return None
+        db.execute(delete(tabela).where(tabela.c.id == chave))
+        return dict(linha._mapping)
+
+    statement = text(f"DELETE FROM {tabela.name} WHERE id = :chave RETURNING {_lista(retorno)}").bindparams(
+        chave=chave
+    ).columns(*(column(coluna.name, coluna.type) for coluna in retorno))
+    linha = db.execute(statement).first()
+    return None if linha is None else dict(linha._mapping)
@@ -1,62 +1,210 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, Query, selectinload, make_transient_to_detached
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional
-from src.models import TipoDeGasto
+from typing import List, Optional, Tuple
+from src.models import GastoMensal, Registro, TipoDeGasto
 from src.schemas import TipoDeGastoCreate, TipoDeGastoUpdate
+from src.fila_escrita import escrita
+from .paginacao import codificar_cursor, decodificar_cursor, ordenar_por_ids
+from .cache import cache_tipos_gasto, versao_dados
+from .relatorio_service import RelatorioService
+from .retorno import atualizar_retornando, excluir_retornando
+
+COLUNAS_TIPO_GASTO = [TipoDeGasto.__table__.c.id, TipoDeGasto.__table__.c.descricao]
 
 
 class TipoDeGastoService:
     def __init__(self, db: Session):
         self.db = db
 
+    @escrita
     def criar_tipo_gasto(self, tipo_gasto_data: TipoDeGastoCreate) -> TipoDeGasto:
         """Cria um novo tipo de gasto"""
         try:
             tipo_gasto = TipoDeGasto(**tipo_gasto_data.dict())
             self.db.add(tipo_gasto)
             self.db.commit()
+            versao_dados.incrementar()
             self.db.refresh(tipo_gasto)
+            cache_tipos_gasto.armazenar(tipo_gasto.id, tipo_gasto.descricao)
             return tipo_gasto
         except IntegrityError as e:
             self.db.rollback()
             raise ValueError(f"Tipo de gasto com esta descrição já existe: {str(e)}")
 
+    def _anexar_do_cache(self, dados: dict) -> TipoDeGasto:
+        """Reanexa à sessão um tipo de gasto já conhecido (do cache ou de um RETURNING), sem consultar o banco"""
+        tipo_gasto = TipoDeGasto(**dados)
+        make_transient_to_detached(tipo_gasto)
+        return self.db.merge(tipo_gasto, load=False)
+
     def obter_tipo_gasto_por_id(self, tipo_gasto_id: int) -> Optional[TipoDeGasto]:
-        """Obtém um tipo de gasto por ID"""
-        return self.db.query(TipoDeGasto).filter(TipoDeGasto.id == tipo_gasto_id).first()
+        """Obtém um tipo de gasto por ID, consultando o cache antes do banco"""
+        dados = cache_tipos_gasto.obter_por_id(tipo_gasto_id)
+        if dados is not None:
+            return self._anexar_do_cache(dados)
+
+        tipo_gasto = self.db.query(TipoDeGasto).filter(TipoDeGasto.id == tipo_gasto_id).first()
+        if tipo_gasto:
+            cache_tipos_gasto.armazenar(tipo_gasto.id, tipo_gasto.descricao)
+        return tipo_gasto
+
+    def tipo_gasto_existe(self, tipo_gasto_id: int) -> bool:
+        """Verifica se o tipo de gasto existe, consultando o cache antes do banco"""
+        if cache_tipos_gasto.obter_por_id(tipo_gasto_id) is not None:
+            return True
+
+        descricao = self.db.query(TipoDeGasto.descricao).filter(TipoDeGasto.id == tipo_gasto_id).scalar()
+        if descricao is None:
+            return False
+        cache_tipos_gasto.armazenar(tipo_gasto_id, descricao)
+        return True
 
-    def obter_todos_tipos_gasto(self, skip: int = 0, limit: int = 100) -> List[TipoDeGasto]:
+    def _consulta_tipos_gasto(self, incluir_registros: bool) -> Query:
+        """Monta a consulta de listagem com a estratégia de carregamento adequada
+
+        Com registros, carrega todos os registros da página em um único SELECT ... IN
+        (selectinload) em vez de um SELECT por tipo. Sem registros, retorna apenas
+        id, descrição e os totais calculados no banco.
+        """
+        if incluir_registros:
+            return self.db.query(TipoDeGasto).options(selectinload(TipoDeGasto.registros))
+
+        return self.db.query(
+            TipoDeGasto.id,
+            TipoDeGasto.descricao,
+            func.count(Registro.id).label("total_registros"),
+            func.coalesce(func.sum(Registro.vlr_gasto), 0.0).label("total_gasto")
+        ).outerjoin(
+            Registro, Registro.fk_tipo_gasto == TipoDeGasto.id
+        ).group_by(TipoDeGasto.id, TipoDeGasto.descricao)
+
+    def obter_todos_tipos_gasto(self, skip: int = 0, limit: int = 100, incluir_registros: bool = True) -> List[TipoDeGasto]:
         """Obtém todos os tipos de gasto com paginação"""
-        return self.db.query(TipoDeGasto).offset(skip).limit(limit).all()
+        query = self._consulta_tipos_gasto(incluir_registros)
+        return query.order_by(TipoDeGasto.id).offset(skip).limit(limit).all()
+
+    def obter_tipos_gasto_por_ids(
+        self, ids: List[int], incluir_registros: bool = True
+    ) -> Tuple[List[TipoDeGasto], List[int]]:
+        """Obtém vários tipos de gasto com um único SELECT ... WHERE id IN (...)
+
+        Mesmo formato da listagem (registros via selectinload ou totais), na ordem dos ids
+        pedidos, e os ids não encontrados.
+        """
+        tipos_gasto = self._consulta_tipos_gasto(incluir_registros).filter(TipoDeGasto.id.in_(set(ids))).all()
+        return ordenar_por_ids(ids, tipos_gasto, lambda tipo_gasto: tipo_gasto.id)
+
+    def obter_tipos_gasto_por_cursor(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        incluir_registros: bool = True
+    ) -> Tuple[List[TipoDeGasto], Optional[str]]:
+        """Obtém uma página de tipos de gasto (ordenados por id) a partir de um cursor opaco"""
+        query = self._consulta_tipos_gasto(incluir_registros)
+        if cursor:
+            (tipo_gasto_id,) = decodificar_cursor(cursor, 1)
+            try:
+                tipo_gasto_id = int(tipo_gasto_id)
+            except (TypeError, ValueError):
+                raise ValueError("Cursor inválido")
+            query = query.filter(TipoDeGasto.id > tipo_gasto_id)
 
+        tipos_gasto = query.order_by(TipoDeGasto.id).limit(limit + 1).all()
+
+        proximo_cursor = None
+        if len(tipos_gasto) > limit:
+            tipos_gasto = tipos_gasto[:limit]
+            proximo_cursor = codificar_cursor(tipos_gasto[-1].id)
+        return tipos_gasto, proximo_cursor
+
+    @escrita
     def atualizar_tipo_gasto(self, tipo_gasto_id: int, tipo_gasto_data: TipoDeGastoUpdate) -> Optional[TipoDeGasto]:
-        """Atualiza um tipo de gasto existente"""
-        tipo_gasto = self.obter_tipo_gasto_por_id(tipo_gasto_id)
-        if not tipo_gasto:
-            return None
-        
+        """Atualiza um tipo de gasto existente com um UPDATE ... RETURNING
+
+        A descrição anterior (para invalidar o cache) vem do cache ou, sem ele, do próprio UPDATE.
+        """
+        update_data = tipo_gasto_data.dict(exclude_unset=True)
+        if not update_data:
+            return self.obter_tipo_gasto_por_id(tipo_gasto_id)
+
+        em_cache = cache_tipos_gasto.obter_por_id(tipo_gasto_id)
+        descricoes_anteriores = [em_cache["descricao"]] if em_cache else []
         try:
-            update_data = tipo_gasto_data.dict(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(tipo_gasto, field, value)
-            
+            resultado = atualizar_retornando(
+                self.db, TipoDeGasto.__table__, tipo_gasto_id, update_data, COLUNAS_TIPO_GASTO,
+                anteriores=() if em_cache else [TipoDeGasto.__table__.c.descricao]
+            )
+            if resultado is None:
+                return None
+            atual, anterior = resultado
             self.db.commit()
-            self.db.refresh(tipo_gasto)
-            return tipo_gasto
         except IntegrityError as e:
             self.db.rollback()
+            cache_tipos_gasto.invalidar(tipo_gasto_id, *descricoes_anteriores)
             raise ValueError(f"Tipo de gasto com esta descrição já existe: {str(e)}")
 
-    def deletar_tipo_gasto(self, tipo_gasto_id: int) -> bool:
-        """Deleta um tipo de gasto"""
-        tipo_gasto = self.obter_tipo_gasto_por_id(tipo_gasto_id)
-        if not tipo_gasto:
+        versao_dados.incrementar()
+        if anterior is not None:
+            descricoes_anteriores.append(anterior["descricao"])
+        cache_tipos_gasto.invalidar(tipo_gasto_id, *descricoes_anteriores, atual["descricao"])
+        # Os registros do tipo continuam carregados sob demanda, como em obter_tipo_gasto_por_id
+        return self._anexar_do_cache(atual)
+
+    @escrita
+    def deletar_tipo_gasto(self, tipo_gasto_id: int, reatribuir_para: Optional[int] = None) -> bool:
+        """Deleta um tipo de gasto e os seus registros, ou os move para outro tipo
+
+        Sem `reatribuir_para`, os registros do tipo são removidos com um único
+        DELETE ... WHERE fk_tipo_gasto = ?, sem carregá-los na sessão. Com `reatribuir_para`,
+        são movidos com um único UPDATE e o rollup mensal do tipo é somado ao do destino.
+        Registros e rollup saem antes do tipo, sem depender do ON DELETE CASCADE (ausente em
+        bancos antigos, e com PRAGMA foreign_keys=ON o SQLite recusaria excluir o tipo antes).
+        O tipo é excluído por último com DELETE ... RETURNING, que confirma a existência e
+        devolve a descrição para invalidar o cache.
+        """
+        if reatribuir_para is not None:
+            if not self.tipo_gasto_existe(tipo_gasto_id):
+                return False
+            self._reatribuir_registros(tipo_gasto_id, reatribuir_para)
+        else:
+            self.db.query(Registro).filter(Registro.fk_tipo_gasto == tipo_gasto_id).delete(synchronize_session=False)
+        self.db.query(GastoMensal).filter(GastoMensal.fk_tipo_gasto == tipo_gasto_id).delete(synchronize_session=False)
+
+        excluido = excluir_retornando(self.db, TipoDeGasto.__table__, tipo_gasto_id, COLUNAS_TIPO_GASTO)
+        if excluido is None:
+            self.db.rollback()
             return False
-        
-        self.db.delete(tipo_gasto)
         self.db.commit()
+        versao_dados.incrementar()
+        cache_tipos_gasto.invalidar(tipo_gasto_id, excluido["descricao"])
         return True
 
+    def _reatribuir_registros(self, tipo_gasto_id: int, destino: int):
+        """Move os registros de um tipo para `destino` com um UPDATE e soma o rollup do tipo ao do destino"""
+        if destino == tipo_gasto_id:
+            raise ValueError("O tipo de destino deve ser diferente do tipo excluído")
+        if not self.tipo_gasto_existe(destino):
+            raise ValueError(f"Tipo de gasto {destino} não encontrado para reatribuir os registros")
+
+        self.db.query(Registro).filter(Registro.fk_tipo_gasto == tipo_gasto_id).update(
+            {Registro.fk_tipo_gasto: destino}, synchronize_session=False
+        )
+        rollup = self.db.query(GastoMensal.ano_mes, GastoMensal.total_gasto, GastoMensal.total_registros).filter(
+            GastoMensal.fk_tipo_gasto == tipo_gasto_id
+        )
+        RelatorioService(self.db).aplicar_variacoes({
+            (linha.ano_mes, destino): [linha.total_gasto, linha.total_registros] for linha in rollup
+        })
+
     def obter_tipo_gasto_por_descricao(self, descricao: str) -> Optional[TipoDeGasto]:
-        """Obtém um tipo de gasto por descrição"""
-        return self.db.query(TipoDeGasto).filter(TipoDeGasto.descricao == descricao).first()
+        """Obtém um tipo de gasto por descrição, consultando o cache antes do banco"""
+        dados = cache_tipos_gasto.obter_por_descricao(descricao)
+        if dados is not None:
+            return self._anexar_do_cache(dados)
+
+        tipo_gasto = self.db.query(TipoDeGasto).filter(TipoDeGasto.descricao == descricao).first()
+        if tipo_gasto:
+            cache_tipos_gasto.armazenar(tipo_gasto.id, tipo_gasto.descricao)
+        return tipo_gasto
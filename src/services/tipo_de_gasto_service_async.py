@@ -0,0 +1,79 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple, Union
+from src.schemas import TipoDeGastoCreate, TipoDeGastoResponse, TipoDeGastoUpdate, TipoDeGastoComTotaisResponse
+from .tipo_de_gasto_service import TipoDeGastoService
+
+
+def _serializar_tipos(tipos_gasto: list, incluir_registros: bool) -> List[Union[TipoDeGastoResponse, TipoDeGastoComTotaisResponse]]:
+    schema = TipoDeGastoResponse if incluir_registros else TipoDeGastoComTotaisResponse
+    return [schema.from_orm(tipo_gasto) for tipo_gasto in tipos_gasto]
+
+
+class TipoDeGastoServiceAsync:
+    """Variante assíncrona de TipoDeGastoService (veja RegistroServiceAsync)"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def criar_tipo_gasto(self, tipo_gasto_data: TipoDeGastoCreate) -> TipoDeGastoResponse:
+        """Cria um novo tipo de gasto"""
+        return await self.db.run_sync(
+            lambda sessao: TipoDeGastoResponse.from_orm(TipoDeGastoService(sessao).criar_tipo_gasto(tipo_gasto_data))
+        )
+
+    async def obter_tipo_gasto_por_id(self, tipo_gasto_id: int) -> Optional[TipoDeGastoResponse]:
+        """Obtém um tipo de gasto por ID"""
+        def executar(sessao):
+            tipo_gasto = TipoDeGastoService(sessao).obter_tipo_gasto_por_id(tipo_gasto_id)
+            return TipoDeGastoResponse.from_orm(tipo_gasto) if tipo_gasto else None
+        return await self.db.run_sync(executar)
+
+    async def obter_todos_tipos_gasto(
+        self, skip: int = 0, limit: int = 100, incluir_registros: bool = True
+    ) -> List[Union[TipoDeGastoResponse, TipoDeGastoComTotaisResponse]]:
+        """Obtém todos os tipos de gasto com paginação"""
+        return await self.db.run_sync(
+            lambda sessao: _serializar_tipos(
+                TipoDeGastoService(sessao).obter_todos_tipos_gasto(
+                    skip=skip, limit=limit, incluir_registros=incluir_registros
+                ),
+                incluir_registros
+            )
+        )
+
+    async def obter_tipos_gasto_por_ids(
+        self, ids: List[int], incluir_registros: bool = True
+    ) -> Tuple[List[Union[TipoDeGastoResponse, TipoDeGastoComTotaisResponse]], List[int]]:
+        """Obtém vários tipos de gasto por id em uma consulta, na ordem pedida, e os ids ausentes"""
+        def executar(sessao):
+            tipos_gasto, ausentes = TipoDeGastoService(sessao).obter_tipos_gasto_por_ids(
+                ids, incluir_registros=incluir_registros
+            )
+            return _serializar_tipos(tipos_gasto, incluir_registros), ausentes
+        return await self.db.run_sync(executar)
+
+    async def obter_tipos_gasto_por_cursor(
+        self, cursor: Optional[str] = None, limit: int = 100, incluir_registros: bool = True
+    ) -> Tuple[List[Union[TipoDeGastoResponse, TipoDeGastoComTotaisResponse]], Optional[str]]:
+        """Obtém uma página de tipos de gasto a partir de um cursor opaco"""
+        def executar(sessao):
+            tipos_gasto, proximo_cursor = TipoDeGastoService(sessao).obter_tipos_gasto_por_cursor(
+                cursor=cursor, limit=limit, incluir_registros=incluir_registros
+            )
+            return _serializar_tipos(tipos_gasto, incluir_registros), proximo_cursor
+        return await self.db.run_sync(executar)
+
+    async def atualizar_tipo_gasto(
+        self, tipo_gasto_id: int, tipo_gasto_data: TipoDeGastoUpdate
+    ) -> Optional[TipoDeGastoResponse]:
+        """Atualiza um tipo de gasto existente"""
+        def executar(sessao):
+            tipo_gasto = TipoDeGastoService(sessao).atualizar_tipo_gasto(tipo_gasto_id, tipo_gasto_data)
+            return TipoDeGastoResponse.from_orm(tipo_gasto) if tipo_gasto else None
+        return await self.db.run_sync(executar)
+
+    async def deletar_tipo_gasto(self, tipo_gasto_id: int, reatribuir_para: Optional[int] = None) -> bool:
+        """Deleta um tipo de gasto e os seus registros, ou os move para `reatribuir_para`"""
+        return await self.db.run_sync(
+            lambda sessao: TipoDeGastoService(sessao).deletar_tipo_gasto(tipo_gasto_id, reatribuir_para=reatribuir_para)
+        )
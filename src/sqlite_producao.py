@@ -0,0 +1,28 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+def configurar_sqlite_producao(
+    engine: Engine,
+    busy_timeout_ms: int = 5000,
+    cache_size_kb: int = 65536,
+    mmap_size: int = 268435456
+):
+    """Aplica os PRAGMAs de produção do SQLite em cada nova conexão do engine
+
+    WAL permite leituras concorrentes com uma escrita; synchronous=NORMAL é seguro em WAL
+    (pode perder a última transação em queda de energia, sem corromper o banco).
+    """
+    @event.listens_for(engine, "connect")
+    def _aplicar_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+            # Valor negativo indica o tamanho em KiB em vez de número de páginas
+            cursor.execute(f"PRAGMA cache_size=-{int(cache_size_kb)}")
+            cursor.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+            cursor.execute("PRAGMA foreign_keys=ON")
+        finally:
+            cursor.close()
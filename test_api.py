@@ -2,8 +2,14 @@
 Testes básicos para a API KAIROS
 """
 
+import json
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from src.metricas import metricas
+from src.models import Registro, TipoDeGasto
+from src.perfil_sql import forma_consulta
+from src.schemas import RegistroResponse
 
 
 class TestTipoDeGasto:
@@ -54,6 +60,128 @@ class TestTipoDeGasto:
         # Verificar se foi deletado
         response = client.get(f"/tipos-gasto/{sample_tipo_gasto.id}")
         assert response.status_code == 404
+    
+    def test_deletar_tipo_gasto_com_registros_em_lote(
+        self, client: TestClient, db_session, sample_tipo_gasto, orcamento_consultas
+    ):
+        """Testa que os registros e o rollup do tipo são excluídos sem carregar os registros"""
+        registros = [{"vlr_gasto": float(i), "fk_tipo_gasto": sample_tipo_gasto.id} for i in range(1, 51)]
+        client.post("/registros/bulk", json={"registros": registros})
+        
+        # Tipo (cache), DELETE dos registros, DELETE do rollup e DELETE do tipo
+        with orcamento_consultas(4):
+            assert client.delete(f"/tipos-gasto/{sample_tipo_gasto.id}").status_code == 204
+        assert db_session.query(Registro).count() == 0
+        assert client.get("/relatorios/mensal").json() == []
+        assert client.get("/registros/busca", params={"q": "x"}).json() == []
+    
+    def test_deletar_tipo_gasto_reatribuindo_registros(self, client: TestClient, sample_tipo_gasto):
+        """Testa a reatribuição dos registros a outro tipo e a soma do rollup ao destino"""
+        origem = sample_tipo_gasto.id
+        destino = client.post("/tipos-gasto/", json={"descricao": "Transporte"}).json()["id"]
+        movido = client.post("/registros/", json={"vlr_gasto": 25.5, "fk_tipo_gasto": origem}).json()["id"]
+        client.post("/registros/", json={"vlr_gasto": 4.5, "fk_tipo_gasto": destino})
+        
+        assert client.delete(f"/tipos-gasto/{origem}", params={"reatribuir_para": origem}).status_code == 400
+        assert client.delete(f"/tipos-gasto/{origem}", params={"reatribuir_para": 999}).status_code == 400
+        
+        response = client.delete(f"/tipos-gasto/{origem}", params={"reatribuir_para": destino})
+        assert response.status_code == 204
+        assert client.get(f"/registros/{movido}").json()["fk_tipo_gasto"] == destino
+        mensal = client.get("/relatorios/mensal").json()
+        assert [(linha["fk_tipo_gasto"], linha["total_gasto"], linha["total_registros"]) for linha in mensal] == [
+            (destino, 30.0, 2)
+        ]
+
+    def test_migracao_cria_cascata_no_sqlite(self, tmp_path):
+        """Testa que o banco migrado tem ON DELETE CASCADE e mantém os triggers da busca"""
+        from alembic import command
+        from manage import configuracao_alembic
+
+        url = f"sqlite:///{tmp_path / 'migrado.db'}"
+        command.upgrade(configuracao_alembic(url), "0004")
+        engine_teste = create_engine(url)
+        with engine_teste.begin() as conexao:
+            conexao.exec_driver_sql("INSERT INTO tipos_de_gasto (id, descricao) VALUES (1, 'Transporte')")
+            conexao.exec_driver_sql(
+                "INSERT INTO registros (id, vlr_gasto, observacao, fk_tipo_gasto) VALUES (7, 10.0, 'Uber aeroporto', 1)"
+            )
+        command.upgrade(configuracao_alembic(url), "head")
+
+        with engine_teste.begin() as conexao:
+            conexao.exec_driver_sql("PRAGMA foreign_keys=ON")
+            busca = "SELECT rowid FROM registros_busca WHERE registros_busca MATCH 'uber'"
+            assert conexao.exec_driver_sql(busca).all() == [(7,)]
+            conexao.exec_driver_sql("DELETE FROM tipos_de_gasto WHERE id = 1")
+            assert conexao.exec_driver_sql("SELECT COUNT(*) FROM registros").scalar() == 0
+            assert conexao.exec_driver_sql(busca).all() == []
+        engine_teste.dispose()
+
+    def test_deletar_tipo_gasto_sem_cascata_com_chaves_verificadas(self, tmp_path):
+        """Testa a exclusão com PRAGMA foreign_keys=ON em um banco anterior ao ON DELETE CASCADE"""
+        from alembic import command
+        from sqlalchemy.orm import sessionmaker
+        from manage import configuracao_alembic
+        from src.services import TipoDeGastoService
+        from src.sqlite_producao import configurar_sqlite_producao
+
+        url = f"sqlite:///{tmp_path / 'legado.db'}"
+        command.upgrade(configuracao_alembic(url), "0004")
+        engine_teste = create_engine(url)
+        configurar_sqlite_producao(engine_teste)
+        with engine_teste.begin() as conexao:
+            conexao.exec_driver_sql("INSERT INTO tipos_de_gasto (id, descricao) VALUES (1, 'Transporte')")
+            conexao.exec_driver_sql(
+                "INSERT INTO registros (vlr_gasto, dt_hr_gasto, fk_tipo_gasto) VALUES (10.0, '2024-01-15 12:30:00', 1)"
+            )
+            conexao.exec_driver_sql(
+                "INSERT INTO gastos_mensais (ano_mes, fk_tipo_gasto, total_gasto, total_registros) VALUES ('2024-01', 1, 10.0, 1)"
+            )
+
+        db = sessionmaker(bind=engine_teste)()
+        try:
+            assert TipoDeGastoService(db).deletar_tipo_gasto(1) is True
+            assert TipoDeGastoService(db).deletar_tipo_gasto(1) is False
+            assert db.query(Registro).count() == 0
+        finally:
+            db.close()
+            engine_teste.dispose()
+
+    def test_listar_tipos_gasto_sem_registros(self, client: TestClient, sample_registro):
+        """Testa listagem de tipos de gasto apenas com totais calculados no banco"""
+        client.post("/tipos-gasto/", json={"descricao": "Transporte"})
+        response = client.get("/tipos-gasto/", params={"include": "none"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data == [
+            {"id": sample_registro.fk_tipo_gasto, "descricao": "Alimentação", "total_registros": 1, "total_gasto": 25.50},
+            {"id": data[1]["id"], "descricao": "Transporte", "total_registros": 0, "total_gasto": 0},
+        ]
+    
+    def test_listar_tipos_gasto_com_registros(self, client: TestClient, sample_registro):
+        """Testa listagem de tipos de gasto com registros embutidos"""
+        response = client.get("/tipos-gasto/", params={"include": "registros"})
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data[0]["registros"]) == 1
+        assert data[0]["registros"][0]["id"] == sample_registro.id
+        assert "total_registros" not in data[0]
+    
+    def test_listar_tipos_gasto_por_cursor(self, client: TestClient):
+        """Testa paginação por cursor de tipos de gasto"""
+        for descricao in ["Alimentação", "Transporte", "Lazer"]:
+            client.post("/tipos-gasto/", json={"descricao": descricao})
+        
+        response = client.get("/tipos-gasto/", params={"cursor": "", "limit": 2})
+        assert response.status_code == 200
+        pagina = response.json()
+        assert [t["descricao"] for t in pagina["itens"]] == ["Alimentação", "Transporte"]
+        assert pagina["next_cursor"]
+        
+        response = client.get("/tipos-gasto/", params={"cursor": pagina["next_cursor"], "limit": 2})
+        pagina = response.json()
+        assert [t["descricao"] for t in pagina["itens"]] == ["Lazer"]
+        assert pagina["next_cursor"] is None
 
 
 class TestRegistro:
@@ -111,6 +239,939 @@ class TestRegistro:
         response = client.get(f"/registros/{sample_registro.id}")
         assert response.status_code == 404
 
+    def test_listar_registros_por_cursor(self, client: TestClient, sample_tipo_gasto):
+        """Testa paginação por cursor de registros (mais recentes primeiro)"""
+        ids = []
+        for valor in [10.0, 20.0, 30.0, 40.0, 50.0]:
+            response = client.post(
+                "/registros/",
+                json={"vlr_gasto": valor, "fk_tipo_gasto": sample_tipo_gasto.id}
+            )
+            ids.append(response.json()["id"])
+        
+        vistos = []
+        cursor = ""
+        while cursor is not None:
+            response = client.get("/registros/", params={"cursor": cursor, "limit": 2})
+            assert response.status_code == 200
+            pagina = response.json()
+            assert len(pagina["itens"]) <= 2
+            vistos.extend(r["id"] for r in pagina["itens"])
+            cursor = pagina["next_cursor"]
+        
+        assert vistos == list(reversed(ids))
+    
+    def test_listar_registros_cursor_invalido(self, client: TestClient):
+        """Testa rejeição de cursor inválido"""
+        response = client.get("/registros/", params={"cursor": "nao-e-um-cursor"})
+        assert response.status_code == 400
+    
+    def test_listar_com_limit_fora_da_faixa(self, client: TestClient):
+        """Testa que limit fora de 1..1000 é rejeitado nas listagens, com e sem cursor"""
+        for rota in ("/registros/", "/tipos-gasto/"):
+            for limit in (0, -1, 1001):
+                assert client.get(rota, params={"cursor": "", "limit": limit}).status_code == 422
+                assert client.get(rota, params={"limit": limit}).status_code == 422
+    
+    def test_listar_registros_com_filtros(self, client: TestClient, sample_tipo_gasto):
+        """Testa filtros de período, valor e tipo com ordenação e paginação por cursor"""
+        registros = [
+            {"vlr_gasto": valor, "fk_tipo_gasto": sample_tipo_gasto.id}
+            for valor in [50.0, 120.0, 600.0, 750.0, 900.0]
+        ]
+        client.post("/registros/bulk", json={"registros": registros})
+        
+        response = client.get("/registros/?valor_min=500&ordem=valor_desc")
+        assert [item["vlr_gasto"] for item in response.json()] == [900.0, 750.0, 600.0]
+        
+        response = client.get("/registros/?valor_max=500&fk_tipo_gasto=999")
+        assert response.json() == []
+        
+        valores = []
+        cursor = ""
+        while cursor is not None:
+            pagina = client.get(f"/registros/?valor_min=100&ordem=valor_asc&limit=2&cursor={cursor}").json()
+            valores.extend(item["vlr_gasto"] for item in pagina["itens"])
+            cursor = pagina["next_cursor"]
+        assert valores == [120.0, 600.0, 750.0, 900.0]
+        
+        cursor = client.get("/registros/?ordem=valor_asc&limit=1&cursor=").json()["next_cursor"]
+        response = client.get(f"/registros/?ordem=data_desc&cursor={cursor}")
+        assert response.status_code == 400
+    
+    def test_filtros_servidos_por_indices(self, db_session):
+        """Testa pelo plano de execução que cada combinação de filtros usa um índice"""
+        import itertools
+        from datetime import datetime
+        from src.explain import capturar_sql, plano_de_execucao
+        from src.services import RegistroService
+        
+        filtros = {
+            "periodo": {"inicio": datetime(2024, 1, 1), "fim": datetime(2024, 1, 31)},
+            "valor": {"valor_min": 100, "valor_max": 500},
+            "tipo": {"fk_tipo_gasto": 1},
+        }
+        engine = db_session.get_bind()
+        service = RegistroService(db_session)
+        for quantidade in range(1, len(filtros) + 1):
+            for combinacao in itertools.combinations(filtros, quantidade):
+                parametros = {chave: valor for nome in combinacao for chave, valor in filtros[nome].items()}
+                for ordem in [None, "data_desc", "valor_asc"]:
+                    with capturar_sql(engine) as capturados:
+                        service.obter_todos_registros(ordem=ordem, **parametros)
+                    statement, parameters = capturados[0]
+                    with engine.connect() as connection:
+                        plano = plano_de_execucao(connection, statement, parameters)
+                    assert plano[0].startswith("SEARCH registros USING INDEX"), (combinacao, ordem, plano)
+    
+    def test_buscar_registros_por_observacao(self, client: TestClient, sample_tipo_gasto):
+        """Testa a busca textual: prefixos, acentos, relevância e sincronização com escritas"""
+        observacoes = ["Uber para o trabalho", "Farmácia São João", "Uber Eats jantar uber", "Mercado"]
+        ids = client.post("/registros/bulk", json={"registros": [
+            {"vlr_gasto": 10.0, "observacao": observacao, "fk_tipo_gasto": sample_tipo_gasto.id}
+            for observacao in observacoes
+        ]}).json()["ids"]
+        
+        response = client.get("/registros/busca?q=uber")
+        assert [item["id"] for item in response.json()] == [ids[2], ids[0]]
+        assert [item["id"] for item in client.get("/registros/busca?q=farmacia").json()] == [ids[1]]
+        assert [item["id"] for item in client.get("/registros/busca?q=farm joão").json()] == [ids[1]]
+        assert client.get("/registros/busca?q=%22%2A").json() == []
+        
+        client.put(f"/registros/{ids[3]}", json={"observacao": "Uber aeroporto"})
+        client.delete(f"/registros/{ids[0]}")
+        assert {item["id"] for item in client.get("/registros/busca?q=uber").json()} == {ids[2], ids[3]}
+    
+    def test_busca_usa_indice_textual(self, db_session):
+        """Testa pelo plano de execução que a busca não varre a tabela registros"""
+        from src.explain import capturar_sql, plano_de_execucao
+        from src.services import RegistroService
+        
+        engine = db_session.get_bind()
+        with capturar_sql(engine) as capturados:
+            RegistroService(db_session).buscar_registros("uber")
+        statement, parameters = capturados[0]
+        with engine.connect() as connection:
+            plano = plano_de_execucao(connection, statement, parameters)
+        assert any("VIRTUAL TABLE INDEX" in linha for linha in plano)
+        assert not any(linha.startswith("SCAN registros ") or linha == "SCAN registros" for linha in plano)
+
+    def test_busca_criada_em_banco_anterior(self, tmp_path):
+        """Testa que a inicialização cria e preenche o índice de busca de um banco sem ele"""
+        from sqlalchemy.orm import sessionmaker
+        from src.connection import Base
+        from src.models import garantir_busca_textual
+        from src.services import RegistroService
+
+        engine_teste = create_engine(f"sqlite:///{tmp_path / 'legado.db'}")
+        Base.metadata.create_all(bind=engine_teste)
+        with engine_teste.begin() as conexao:
+            for trigger in ("registros_busca_ai", "registros_busca_ad", "registros_busca_au"):
+                conexao.exec_driver_sql(f"DROP TRIGGER {trigger}")
+            conexao.exec_driver_sql("DROP TABLE registros_busca")
+            conexao.exec_driver_sql("INSERT INTO tipos_de_gasto (id, descricao) VALUES (1, 'Transporte')")
+            conexao.exec_driver_sql(
+                "INSERT INTO registros (vlr_gasto, observacao, fk_tipo_gasto) VALUES (10.0, 'Uber aeroporto', 1)"
+            )
+
+        assert garantir_busca_textual(engine_teste) is True
+        assert garantir_busca_textual(engine_teste) is False
+        db = sessionmaker(bind=engine_teste)()
+        try:
+            assert [registro.observacao for registro in RegistroService(db).buscar_registros("uber")] == ["Uber aeroporto"]
+        finally:
+            db.close()
+            engine_teste.dispose()
+
+    def test_criar_registros_em_lote(self, client: TestClient, sample_tipo_gasto):
+        """Testa criação de registros em lote"""
+        itens = [{"vlr_gasto": float(i), "fk_tipo_gasto": sample_tipo_gasto.id} for i in range(1, 451)]
+        response = client.post("/registros/bulk", json={"registros": itens})
+        assert response.status_code == 201
+        data = response.json()
+        assert data["total_criados"] == 450
+        assert data["erros"] == []
+        
+        response = client.get(f"/registros/{data['ids'][-1]}")
+        assert response.json()["vlr_gasto"] == 450.0
+        response = client.get("/registros/resumo")
+        assert response.json()["total_registros"] == 450
+    
+    def test_criar_registros_em_lote_tudo_ou_nada(self, client: TestClient, sample_tipo_gasto):
+        """Testa que um item inválido impede a criação do lote inteiro"""
+        itens = [
+            {"vlr_gasto": 10.0, "fk_tipo_gasto": sample_tipo_gasto.id},
+            {"vlr_gasto": -1, "fk_tipo_gasto": sample_tipo_gasto.id},
+            {"vlr_gasto": 5.0, "fk_tipo_gasto": 999},
+        ]
+        response = client.post("/registros/bulk", json={"registros": itens})
+        assert response.status_code == 400
+        erros = response.json()["detail"]["erros"]
+        assert [erro["indice"] for erro in erros] == [1, 2]
+        
+        response = client.get("/registros/")
+        assert response.json() == []
+    
+    def test_criar_registros_em_lote_parcial(self, client: TestClient, sample_tipo_gasto):
+        """Testa criação parcial do lote com relatório de erros por item"""
+        itens = [
+            {"vlr_gasto": 10.0, "fk_tipo_gasto": sample_tipo_gasto.id},
+            {"vlr_gasto": 20.0},
+            {"vlr_gasto": 30.0, "fk_tipo_gasto": sample_tipo_gasto.id},
+        ]
+        response = client.post("/registros/bulk", json={"registros": itens, "tudo_ou_nada": False})
+        assert response.status_code == 201
+        data = response.json()
+        assert data["total_criados"] == 2
+        assert data["erros"] == [{"indice": 1, "erros": ["fk_tipo_gasto: field required"]}]
+    
+    def test_exportar_registros_csv(self, client: TestClient, sample_registro):
+        """Testa exportação de registros em CSV"""
+        response = client.get("/registros/export", params={"format": "csv"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        linhas = response.text.strip().splitlines()
+        assert linhas[0] == "id,dt_hr_gasto,vlr_gasto,observacao,fk_tipo_gasto"
+        assert linhas[1].startswith(f"{sample_registro.id},")
+        assert linhas[1].endswith(f",25.5,Almoço no restaurante,{sample_registro.fk_tipo_gasto}")
+    
+    def test_exportar_registros_ndjson_filtrado(self, client: TestClient, sample_registro):
+        """Testa exportação em NDJSON com filtro por tipo de gasto"""
+        outro_tipo = client.post("/tipos-gasto/", json={"descricao": "Transporte"}).json()
+        client.post("/registros/", json={"vlr_gasto": 8.0, "fk_tipo_gasto": outro_tipo["id"]})
+        
+        response = client.get(
+            "/registros/export",
+            params={"format": "ndjson", "fk_tipo_gasto": outro_tipo["id"]}
+        )
+        assert response.status_code == 200
+        linhas = [json.loads(linha) for linha in response.text.splitlines()]
+        assert len(linhas) == 1
+        assert linhas[0]["vlr_gasto"] == 8.0
+        assert linhas[0]["fk_tipo_gasto"] == outro_tipo["id"]
+    
+    def test_importar_registros_csv(self, client: TestClient, sample_tipo_gasto):
+        """Testa importação de CSV com resolução de tipos por descrição"""
+        conteudo = (
+            "vlr_gasto,observacao,tipo_gasto,dt_hr_gasto\n"
+            "10.5,Padaria,Alimentação,2026-01-15T08:30:00\n"
+            "-3,Inválido,Alimentação,\n"
+            "7,Ônibus,Transporte,\n"
+            "12,Mercado,Alimentação,\n"
+        )
+        response = client.post(
+            "/registros/import",
+            params={"tamanho_lote": 1},
+            files={"arquivo": ("extrato.csv", conteudo.encode("utf-8"), "text/csv")}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_linhas"] == 4
+        assert data["importados"] == 2
+        assert data["rejeitados"] == 2
+        assert [linha["linha"] for linha in data["linhas_rejeitadas"]] == [3, 4]
+        
+        registros = client.get("/registros/").json()
+        assert [r["vlr_gasto"] for r in registros] == [10.5, 12.0]
+        assert registros[0]["dt_hr_gasto"] == "2026-01-15T08:30:00"
+    
+    def test_importar_registros_ndjson_criando_tipos(self, client: TestClient):
+        """Testa importação de NDJSON criando tipos de gasto ausentes"""
+        conteudo = (
+            '{"vlr_gasto": 50, "tipo_gasto": "Saúde", "observacao": "Farmácia"}\n'
+            'isto não é json\n'
+            '{"vlr_gasto": 20, "tipo_gasto": "Saúde"}\n'
+            '{"vlr_gasto": 1, "tipo_gasto": ["Saúde"]}\n'
+        )
+        response = client.post(
+            "/registros/import",
+            params={"criar_tipos": True},
+            files={"arquivo": ("extrato.ndjson", conteudo.encode("utf-8"), "application/x-ndjson")}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["importados"] == 2
+        assert data["linhas_rejeitadas"] == [
+            {"linha": 2, "erros": ["linha malformada"]},
+            {"linha": 4, "erros": ["tipo_gasto: a descrição do tipo de gasto deve ser um texto"]},
+        ]
+        
+        tipos = client.get("/tipos-gasto/", params={"include": "none"}).json()
+        assert tipos[0]["descricao"] == "Saúde"
+        assert tipos[0]["total_registros"] == 2
+    
+    def test_resumo_registros(self, client: TestClient, sample_registro):
+        """Testa resumo agregado dos registros"""
+        client.post(
+            "/registros/",
+            json={"vlr_gasto": 10.00, "fk_tipo_gasto": sample_registro.fk_tipo_gasto}
+        )
+        response = client.get("/registros/resumo")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_gasto"] == 35.50
+        assert data["total_registros"] == 2
+        assert data["por_tipo"] == [{
+            "fk_tipo_gasto": sample_registro.fk_tipo_gasto,
+            "descricao": "Alimentação",
+            "total_gasto": 35.50,
+            "total_registros": 2
+        }]
+        assert data["mes_atual"]["total_registros"] == 2
+        assert data["mes_atual"]["total_gasto"] == 35.50
+    
+    def test_resumo_sem_registros(self, client: TestClient, sample_tipo_gasto):
+        """Testa resumo sem registros cadastrados"""
+        response = client.get("/registros/resumo")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_gasto"] == 0
+        assert data["total_registros"] == 0
+        assert data["por_tipo"][0]["total_registros"] == 0
+
+
+class TestRotasAsync:
+    """Testes para as rotas assíncronas (DB_ASYNC=true)"""
+    
+    def test_crud_registro_async(self, async_client: TestClient, sample_tipo_gasto):
+        """Testa o ciclo completo de um registro pelas rotas assíncronas"""
+        response = async_client.post(
+            "/registros/",
+            json={"vlr_gasto": 12.0, "fk_tipo_gasto": sample_tipo_gasto.id}
+        )
+        assert response.status_code == 201
+        registro_id = response.json()["id"]
+        
+        response = async_client.put(f"/registros/{registro_id}", json={"vlr_gasto": 15.0})
+        assert response.json()["vlr_gasto"] == 15.0
+        
+        pagina = async_client.get("/registros/", params={"cursor": ""}).json()
+        assert [r["id"] for r in pagina["itens"]] == [registro_id]
+        
+        assert async_client.get("/registros/resumo").json()["total_gasto"] == 15.0
+        
+        assert async_client.delete(f"/registros/{registro_id}").status_code == 204
+        assert async_client.get(f"/registros/{registro_id}").status_code == 404
+    
+    def test_tipo_gasto_async_com_registros(self, async_client: TestClient, sample_registro):
+        """Testa que relacionamentos são carregados dentro da sessão assíncrona"""
+        response = async_client.get(f"/tipos-gasto/{sample_registro.fk_tipo_gasto}")
+        assert response.status_code == 200
+        assert [r["id"] for r in response.json()["registros"]] == [sample_registro.id]
+        
+        response = async_client.get("/tipos-gasto/", params={"include": "none"})
+        assert response.json()[0]["total_registros"] == 1
+    
+    def test_rotas_sincronas_preservadas(self, async_client: TestClient, sample_registro):
+        """Testa que rotas sem versão assíncrona continuam disponíveis e na ordem certa"""
+        response = async_client.get("/registros/export", params={"format": "ndjson"})
+        assert response.status_code == 200
+        assert json.loads(response.text)["id"] == sample_registro.id
+
+
+class TestBuscaPorIds:
+    """Testes para a busca em lote por ids de registros e tipos de gasto"""
+    
+    def _criar_registros(self, client: TestClient, tipo_id: int, quantidade: int):
+        return [
+            client.post("/registros/", json={"vlr_gasto": 10.0 + i, "fk_tipo_gasto": tipo_id}).json()["id"]
+            for i in range(quantidade)
+        ]
+    
+    def test_ids_na_query_preserva_ordem_e_ausentes(self, client: TestClient, sample_tipo_gasto, orcamento_consultas):
+        """Testa ?ids= com uma consulta, na ordem pedida, sem repetidos e com os ausentes"""
+        ids = self._criar_registros(client, sample_tipo_gasto.id, 3)
+        pedidos = [ids[2], 9999, ids[0], ids[2]]
+        with orcamento_consultas(1):
+            response = client.get("/registros/", params={"ids": ",".join(map(str, pedidos)), "limit": 1})
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["id"] for r in data["itens"]] == [ids[2], ids[0]]
+        assert data["itens"][0]["vlr_gasto"] == 12.0
+        assert data["ausentes"] == [9999]
+    
+    def test_ids_invalidos(self, client: TestClient):
+        """Testa ids não numéricos e acima do limite da query string"""
+        assert client.get("/registros/", params={"ids": "1,a"}).status_code == 400
+        assert client.get("/registros/", params={"ids": ","}).status_code == 400
+        response = client.get("/registros/", params={"ids": ",".join(map(str, range(1, 1002)))})
+        assert response.status_code == 400
+        assert "batch-get" in response.json()["detail"]
+    
+    def test_batch_get_registros(self, client: TestClient, sample_tipo_gasto):
+        """Testa POST /registros/batch-get com conjuntos maiores que o limite da URL"""
+        ids = self._criar_registros(client, sample_tipo_gasto.id, 2)
+        pedidos = list(range(5000, 3000, -1)) + [ids[1], ids[0]]
+        response = client.post("/registros/batch-get", json={"ids": pedidos})
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["id"] for r in data["itens"]] == [ids[1], ids[0]]
+        assert len(data["ausentes"]) == 2000
+        assert client.post("/registros/batch-get", json={"ids": []}).status_code == 422
+    
+    def test_tipos_gasto_por_ids(self, client: TestClient, sample_registro):
+        """Testa ?ids= e batch-get de tipos de gasto com e sem registros embutidos"""
+        outro = client.post("/tipos-gasto/", json={"descricao": "Transporte"}).json()["id"]
+        tipo_id = sample_registro.fk_tipo_gasto
+        
+        data = client.get("/tipos-gasto/", params={"ids": f"{outro},{tipo_id},77"}).json()
+        assert [t["id"] for t in data["itens"]] == [outro, tipo_id]
+        assert [r["id"] for r in data["itens"][1]["registros"]] == [sample_registro.id]
+        assert data["ausentes"] == [77]
+        
+        response = client.post("/tipos-gasto/batch-get", params={"include": "none"}, json={"ids": [tipo_id]})
+        assert response.json()["itens"][0]["total_registros"] == 1
+        assert "registros" not in response.json()["itens"][0]
+    
+    def test_rotas_async(self, async_client: TestClient, sample_registro):
+        """Testa a busca por ids nas rotas assíncronas"""
+        data = async_client.post("/registros/batch-get", json={"ids": [404, sample_registro.id]}).json()
+        assert [r["id"] for r in data["itens"]] == [sample_registro.id]
+        assert data["ausentes"] == [404]
+        data = async_client.get("/tipos-gasto/", params={"ids": str(sample_registro.fk_tipo_gasto)}).json()
+        assert data["itens"][0]["id"] == sample_registro.fk_tipo_gasto
+
+
+class TestPoolConexoes:
+    """Testes para a instrumentação do pool de conexões"""
+    
+    def test_estatisticas_pool(self, client: TestClient):
+        """Testa endpoint interno de estatísticas do pool"""
+        response = client.get("/internal/pool")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["checkouts"] >= 1
+        for campo in ["tamanho", "em_uso", "ociosas", "overflow", "espera_media_ms", "timeouts"]:
+            assert campo in data
+    
+    def test_pool_registra_timeout_de_checkout(self, tmp_path):
+        """Testa que esperas esgotadas no pool são contabilizadas"""
+        from sqlalchemy import exc
+        from src.pool_stats import EstatisticasPool, criar_pool_monitorado
+        
+        estatisticas = EstatisticasPool()
+        engine_teste = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            poolclass=criar_pool_monitorado(estatisticas),
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.05
+        )
+        estatisticas.instrumentar(engine_teste)
+        
+        with engine_teste.connect():
+            assert estatisticas.snapshot(engine_teste)["em_uso"] == 1
+            with pytest.raises(exc.TimeoutError):
+                engine_teste.connect()
+        
+        dados = estatisticas.snapshot(engine_teste)
+        assert dados["timeouts"] == 1
+        assert dados["checkouts"] == 1
+        assert dados["espera_maxima_ms"] >= 50
+        assert dados["espera_media_ms"] <= dados["espera_maxima_ms"]
+        assert dados["espera_media_ms"] == round(estatisticas.espera_total / 2 * 1000, 3)
+        assert dados["ociosas"] == 1
+
+
+class TestInicializacao:
+    """Testes para a inicialização rápida (pool aquecido e consultas pré-compiladas)"""
+    
+    def test_aquecer_pool(self, tmp_path):
+        """Testa que as conexões aquecidas ficam ociosas no pool"""
+        from sqlalchemy.pool import QueuePool
+        from src.inicializacao import aquecer_pool
+        
+        engine_teste = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=3)
+        assert aquecer_pool(engine_teste, 3) == 3
+        assert engine_teste.pool.checkedin() == 3
+        assert engine_teste.pool.checkedout() == 0
+    
+    def test_precompilar_consultas(self, db_session):
+        """Testa que as consultas mais usadas ficam no cache de compilação do engine"""
+        from sqlalchemy.orm import sessionmaker
+        from src.inicializacao import precompilar_consultas
+        
+        engine_teste = create_engine("sqlite:///./test.db", connect_args={"check_same_thread": False})
+        executadas = precompilar_consultas(sessionmaker(bind=engine_teste))
+        assert executadas > 0
+        assert len(engine_teste._compiled_cache) >= executadas
+
+    def test_aquecimento_do_engine_async(self, db_session):
+        """Testa que o pool e o cache de compilação do AsyncEngine são aquecidos"""
+        import asyncio
+        from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+        from sqlalchemy.orm import sessionmaker
+        from sqlalchemy.pool import AsyncAdaptedQueuePool
+        from src.inicializacao import aquecer_pool_async, precompilar_consultas_async
+
+        async def aquecer():
+            engine_async = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=AsyncAdaptedQueuePool, pool_size=2)
+            try:
+                assert await aquecer_pool_async(engine_async, 2) == 2
+                assert engine_async.sync_engine.pool.checkedin() == 2
+                executadas = await precompilar_consultas_async(sessionmaker(engine_async, class_=AsyncSession))
+                assert len(engine_async.sync_engine._compiled_cache) >= executadas > 0
+            finally:
+                await engine_async.dispose()
+
+        asyncio.run(aquecer())
+
+    def test_modo_rapido_exige_revisao_head(self, tmp_path):
+        """Testa que a verificação da revisão falha sem migrate e passa com o banco em head"""
+        from alembic import command
+        from manage import configuracao_alembic
+        from src.inicializacao import verificar_revisao
+
+        url = f"sqlite:///{tmp_path / 'rapida.db'}"
+        engine_teste = create_engine(url)
+        with pytest.raises(RuntimeError, match="manage.py migrate"):
+            verificar_revisao(engine_teste)
+        command.upgrade(configuracao_alembic(url), "head")
+        assert verificar_revisao(engine_teste) == "0005"
+        engine_teste.dispose()
+    
+    def test_tempos_de_inicializacao(self, client: TestClient):
+        """Testa o relatório de partida a frio do worker"""
+        client.get("/health/live")
+        data = client.get("/internal/inicializacao").json()
+        assert data["modo"] == "completa"
+        assert set(data["etapas_ms"]) == {"conexao", "esquema", "busca", "rollup"}
+        assert data["pronto_ms"] > 0
+        # Cada TestClient executa o lifespan de novo; a primeira requisição é a do processo
+        assert data["primeira_requisicao_ms"] > 0
+    
+    def test_orcamento_de_conexoes_por_worker(self, monkeypatch):
+        """Testa que o pool de cada worker é derivado do total de conexões permitido"""
+        import os
+        import run
+        monkeypatch.setenv("DB_CONEXOES_TOTAIS", "20")
+        monkeypatch.setenv("DB_POOL_SIZE", "5")
+        monkeypatch.setenv("DB_MAX_OVERFLOW", "10")
+        monkeypatch.setenv("DB_POOL_AQUECER", "2")
+        assert run.configurar_pool_por_worker(8) == 2
+        assert (os.environ["DB_POOL_SIZE"], os.environ["DB_MAX_OVERFLOW"]) == ("2", "0")
+        
+        # Orçamento menor que os workers: nunca mais de DB_CONEXOES_TOTAIS conexões
+        with pytest.raises(ValueError):
+            run.dividir_conexoes(3, 8)
+        monkeypatch.setenv("DB_CONEXOES_TOTAIS", "3")
+        assert run.limitar_workers(8) == 3
+        assert run.limitar_workers(2) == 2
+    
+    def test_etag_desativado_com_workers_sem_redis(self, monkeypatch):
+        """Testa que vários workers com a versão dos dados em memória desativam o ETag"""
+        import os
+        import run
+        from src.services.cache import VersaoMemoria
+        monkeypatch.delenv("ETAG_ATIVO", raising=False)
+        monkeypatch.delenv("TIPO_GASTO_CACHE_MAX", raising=False)
+        monkeypatch.setenv("CACHE_BACKEND", "memoria")
+        assert run.configurar_caches(1) is True
+        assert run.configurar_caches(4) is False
+        assert os.environ["ETAG_ATIVO"] == "false"
+        
+        monkeypatch.delenv("ETAG_ATIVO")
+        monkeypatch.setenv("CACHE_BACKEND", "redis")
+        assert run.configurar_caches(4) is True
+        
+        # Workers criados do mestre (preload) recebem cada um a sua época
+        versao = VersaoMemoria()
+        antes = versao.atual()
+        versao.reiniciar()
+        assert versao.atual() != antes and versao.atual().endswith("-0")
+    
+    def test_cache_de_tipos_desativado_com_workers_sem_redis(self, monkeypatch):
+        """Testa que vários workers com CACHE_BACKEND=memoria não guardam tipos de gasto por worker"""
+        import run
+        from src.services.cache import criar_cache_tipos_gasto
+        monkeypatch.delenv("ETAG_ATIVO", raising=False)
+        monkeypatch.delenv("TIPO_GASTO_CACHE_MAX", raising=False)
+        monkeypatch.setenv("CACHE_BACKEND", "memoria")
+        
+        run.configurar_caches(1)
+        cache = criar_cache_tipos_gasto()
+        cache.armazenar(1, "Alimentação")
+        assert cache.obter_por_id(1) == {"id": 1, "descricao": "Alimentação"}
+        
+        run.configurar_caches(4)
+        cache = criar_cache_tipos_gasto()
+        cache.armazenar(1, "Alimentação")
+        assert cache.obter_por_id(1) is None
+        assert cache.estatisticas()["itens"] == 0
+
+
+class TestRelatorioMensal:
+    """Testes para o rollup mensal mantido a cada escrita"""
+    
+    def test_rollup_acompanha_escritas(self, client: TestClient, db_session, sample_tipo_gasto):
+        """Testa criação, lote, mudança de tipo e exclusão contra a reconstrução completa"""
+        from src.services import RelatorioService
+        
+        outro_tipo = client.post("/tipos-gasto/", json={"descricao": "Transporte"}).json()
+        criado = client.post("/registros/", json={"vlr_gasto": 10.0, "fk_tipo_gasto": sample_tipo_gasto.id}).json()
+        client.post("/registros/bulk", json={"registros": [
+            {"vlr_gasto": 5.0, "fk_tipo_gasto": sample_tipo_gasto.id},
+            {"vlr_gasto": 7.5, "fk_tipo_gasto": outro_tipo["id"]},
+        ]})
+        
+        mensal = client.get("/relatorios/mensal").json()
+        assert {(linha["fk_tipo_gasto"], linha["total_gasto"], linha["total_registros"]) for linha in mensal} == {
+            (sample_tipo_gasto.id, 15.0, 2), (outro_tipo["id"], 7.5, 1)
+        }
+        
+        client.put(f"/registros/{criado['id']}", json={"fk_tipo_gasto": outro_tipo["id"], "vlr_gasto": 20.0})
+        mensal = client.get(f"/relatorios/mensal?fk_tipo_gasto={outro_tipo['id']}").json()
+        assert (mensal[0]["total_gasto"], mensal[0]["total_registros"]) == (27.5, 2)
+        
+        client.delete(f"/registros/{criado['id']}")
+        antes_da_reconstrucao = client.get("/relatorios/mensal").json()
+        
+        RelatorioService(db_session).reconstruir_gastos_mensais()
+        assert client.get("/relatorios/mensal").json() == antes_da_reconstrucao
+    
+    def test_rollup_sem_linhas_vazias(self, client: TestClient, sample_tipo_gasto):
+        """Testa que meses/tipos sem registros saem do rollup e que o filtro de mês é validado"""
+        criado = client.post("/registros/", json={"vlr_gasto": 10.0, "fk_tipo_gasto": sample_tipo_gasto.id}).json()
+        assert len(client.get("/relatorios/mensal").json()) == 1
+        
+        client.delete(f"/registros/{criado['id']}")
+        assert client.get("/relatorios/mensal").json() == []
+        assert client.get("/relatorios/mensal?inicio=2024-13").status_code == 422
+
+    def test_backfill_com_gastos_mensais_vazia(self, tmp_path):
+        """Testa que a migração e a inicialização preenchem o rollup criado vazio pelo create_all"""
+        from alembic import command
+        from sqlalchemy.orm import sessionmaker
+        from manage import configuracao_alembic
+        from src.connection import Base
+        from src.services import RelatorioService
+
+        url = f"sqlite:///{tmp_path / 'legado.db'}"
+        config = configuracao_alembic(url)
+        command.upgrade(config, "0001")
+        engine_teste = create_engine(url)
+        with engine_teste.begin() as conexao:
+            conexao.exec_driver_sql("INSERT INTO tipos_de_gasto (id, descricao) VALUES (1, 'Alimentação')")
+            conexao.exec_driver_sql(
+                "INSERT INTO registros (dt_hr_gasto, vlr_gasto, fk_tipo_gasto) VALUES ('2024-01-15 12:30:00', 10.0, 1)"
+            )
+        # Worker com INICIALIZACAO=completa antes do migrate: a tabela do rollup nasce vazia
+        Base.metadata.create_all(bind=engine_teste)
+
+        command.upgrade(config, "head")
+        with engine_teste.begin() as conexao:
+            assert conexao.exec_driver_sql("SELECT total_gasto, total_registros FROM gastos_mensais").all() == [(10.0, 1)]
+            conexao.exec_driver_sql("DELETE FROM gastos_mensais")
+
+        db = sessionmaker(bind=engine_teste)()
+        try:
+            assert RelatorioService(db).preencher_gastos_mensais() == 1
+            assert RelatorioService(db).preencher_gastos_mensais() == 0
+        finally:
+            db.close()
+            engine_teste.dispose()
+
+
+class TestCacheTiposGasto:
+    """Testes para o cache de consulta de tipos de gasto"""
+    
+    def test_cache_atende_leituras_e_invalida_na_escrita(self, client: TestClient, sample_tipo_gasto):
+        """Testa acertos do cache e invalidação após atualização"""
+        tipo_id = sample_tipo_gasto.id
+        antes = client.get("/internal/cache").json()
+        
+        assert client.get(f"/tipos-gasto/{tipo_id}").status_code == 200
+        assert client.get(f"/tipos-gasto/{tipo_id}").status_code == 200
+        depois = client.get("/internal/cache").json()
+        assert depois["falhas"] - antes["falhas"] == 1
+        assert depois["acertos"] - antes["acertos"] == 1
+        
+        response = client.put(f"/tipos-gasto/{tipo_id}", json={"descricao": "Mercado"})
+        assert response.status_code == 200
+        assert client.get(f"/tipos-gasto/{tipo_id}").json()["descricao"] == "Mercado"
+        assert client.get("/internal/cache").json()["invalidacoes"] > depois["invalidacoes"]
+    
+    def test_criar_registro_com_tipo_inexistente(self, client: TestClient, sample_tipo_gasto):
+        """Testa que a validação do tipo de gasto usa o cache e rejeita ids inexistentes"""
+        dados = {"dt_hr_gasto": "2024-01-15T12:30:00", "vlr_gasto": 10.0, "fk_tipo_gasto": 999}
+        response = client.post("/registros/", json=dados)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Tipo de gasto não encontrado"
+    
+    def test_cache_lru_despeja_o_menos_usado(self):
+        """Testa o limite de itens e a expiração do backend em memória"""
+        from src.services.cache import BackendMemoria
+        
+        backend = BackendMemoria(max_itens=2, ttl=60)
+        backend.definir("a", 1)
+        backend.definir("b", 2)
+        backend.obter("a")
+        backend.definir("c", 3)
+        assert backend.obter("b") is None
+        assert backend.obter("a") == 1
+        assert backend.despejos == 1
+        
+        expirado = BackendMemoria(max_itens=2, ttl=-1)
+        expirado.definir("a", 1)
+        assert expirado.obter("a") is None
+
+
+class TestETag:
+    """Testes para o GET condicional nas listagens e detalhes"""
+    
+    def test_listagem_responde_304_sem_alteracoes(self, client: TestClient, sample_registro):
+        """Testa que If-None-Match com o ETag atual retorna 304 sem corpo"""
+        response = client.get("/registros/")
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "no-cache"
+        
+        response = client.get("/registros/", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_etag_fraco_e_lista(self, client: TestClient, sample_registro):
+        """Testa a comparação fraca: W/"..." e listas no If-None-Match também recebem 304"""
+        etag = client.get("/registros/").headers["etag"]
+
+        assert client.get("/registros/", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+        assert client.get("/registros/", headers={"If-None-Match": f'"outro", W/{etag}'}).status_code == 304
+        assert client.get("/registros/", headers={"If-None-Match": 'W/"outro"'}).status_code == 200
+
+    def test_304_com_cabecalhos_cors(self, client: TestClient, sample_registro):
+        """Testa que o 304 do ETag, respondido antes das rotas, também passa pelo CORS"""
+        origem = {"Origin": "http://exemplo.com"}
+        etag = client.get("/registros/", headers=origem).headers["etag"]
+
+        response = client.get("/registros/", headers={**origem, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert "access-control-allow-origin" in response.headers
+
+    def test_escrita_muda_o_etag(self, client: TestClient, sample_tipo_gasto):
+        """Testa que uma escrita em qualquer service invalida os ETags emitidos"""
+        etag = client.get(f"/tipos-gasto/{sample_tipo_gasto.id}").headers["etag"]
+        assert client.get("/registros/").headers["etag"] != etag
+        
+        dados = {"dt_hr_gasto": "2024-01-15T12:30:00", "vlr_gasto": 10.0, "fk_tipo_gasto": sample_tipo_gasto.id}
+        assert client.post("/registros/", json=dados).status_code == 201
+        
+        response = client.get(f"/tipos-gasto/{sample_tipo_gasto.id}", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert len(response.json()["registros"]) == 1
+    
+    def test_etag_ausente_em_erros(self, client: TestClient):
+        """Testa que respostas de erro não recebem ETag"""
+        response = client.get("/registros/999")
+        assert response.status_code == 404
+        assert "etag" not in response.headers
+
+
+class TestSerializacao:
+    """Testes para o caminho rápido de serialização e a compressão"""
+    
+    def test_listagem_rapida_igual_ao_response_model(self, client: TestClient, sample_registro):
+        """Testa que os itens montados das tuplas têm o mesmo formato de RegistroResponse"""
+        item = client.get("/registros/").json()[0]
+        assert list(item) == list(RegistroResponse.__fields__)
+        assert item == client.get(f"/registros/{sample_registro.id}").json()
+        
+        pagina = client.get("/registros/?cursor=").json()
+        assert pagina["itens"] == [item]
+    
+    def test_resposta_grande_comprimida(self, client: TestClient, sample_tipo_gasto):
+        """Testa que respostas acima do limite são comprimidas e as pequenas não"""
+        registros = [{"vlr_gasto": i + 1, "observacao": f"Registro {i}", "fk_tipo_gasto": sample_tipo_gasto.id} for i in range(50)]
+        client.post("/registros/bulk", json={"registros": registros})
+        
+        response = client.get("/registros/", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()) == 50
+        
+        response = client.get(f"/registros/{response.json()[0]['id']}", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+
+
+class TestMetricas:
+    """Testes para o endpoint /metrics no formato do Prometheus"""
+    
+    @staticmethod
+    def _valor(texto: str, prefixo: str) -> float:
+        linha = next(l for l in texto.splitlines() if l.startswith(prefixo))
+        return float(linha.rsplit(" ", 1)[1])
+    
+    def test_metricas_por_template_de_rota(self, client: TestClient, sample_registro):
+        """Testa que contagens, status, latência e consultas são rotulados pelo template da rota"""
+        metricas.limpar()
+        assert client.get(f"/registros/{sample_registro.id}").status_code == 200
+        assert client.get("/registros/999").status_code == 404
+        
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        texto = response.text
+        
+        rota = 'metodo="GET",rota="/registros/{registro_id}"'
+        assert self._valor(texto, f'kairos_requisicoes_total{{{rota},status="200"}}') == 1
+        assert self._valor(texto, f'kairos_requisicoes_total{{{rota},status="404"}}') == 1
+        assert self._valor(texto, f'kairos_requisicao_duracao_segundos_count{{{rota}}}') == 2
+        assert self._valor(texto, f'kairos_requisicao_duracao_segundos_bucket{{{rota},le="+Inf"}}') == 2
+        assert self._valor(texto, f'kairos_db_consultas_total{{{rota}}}') >= 2
+        assert self._valor(texto, f'kairos_db_duracao_segundos_sum{{{rota}}}') > 0
+        assert "/registros/999" not in texto
+    
+    def test_resposta_304_rotulada_pela_rota(self, client: TestClient, sample_registro):
+        """Testa que o 304 do ETag, que não chega ao roteamento, usa o template e não consulta o banco"""
+        etag = client.get("/registros/").headers["etag"]
+        metricas.limpar()
+        assert client.get("/registros/", headers={"If-None-Match": etag}).status_code == 304
+        
+        texto = client.get("/metrics").text
+        assert self._valor(texto, 'kairos_requisicoes_total{metodo="GET",rota="/registros/",status="304"}') == 1
+        assert self._valor(texto, 'kairos_db_consultas_total{metodo="GET",rota="/registros/"}') == 0
+        assert self._valor(texto, "kairos_requisicoes_em_andamento") == 1
+
+
+class TestPerfilSQL:
+    """Testes para o perfil de consultas e o orçamento de consultas por endpoint"""
+    
+    def test_forma_agrupa_listas_de_parametros(self):
+        """Testa que IN com quantidades diferentes de parâmetros tem a mesma forma"""
+        assert forma_consulta("SELECT * FROM registros WHERE id IN (?, ?, ?)") == \
+            forma_consulta("SELECT *  FROM registros\nWHERE id IN (?)")
+    
+    def test_listagem_de_tipos_sem_n_mais_1(self, client: TestClient, db_session, orcamento_consultas):
+        """Testa que embutir os registros não executa uma consulta por tipo"""
+        for i in range(5):
+            tipo = TipoDeGasto(descricao=f"Tipo {i}")
+            tipo.registros = [Registro(vlr_gasto=10.0 * j, fk_tipo_gasto=None) for j in range(1, 3)]
+            db_session.add(tipo)
+        db_session.commit()
+        
+        with orcamento_consultas(2, max_repeticoes=1):
+            response = client.get("/tipos-gasto/?include=registros")
+        assert response.status_code == 200
+        assert sum(len(t["registros"]) for t in response.json()) == 10
+    
+    def test_orcamento_de_escrita_e_detalhe(self, client: TestClient, sample_registro, orcamento_consultas):
+        """Testa o número de consultas da criação e do detalhe de um registro"""
+        dados = {"dt_hr_gasto": "2024-01-15T12:30:00", "vlr_gasto": 10.0, "fk_tipo_gasto": sample_registro.fk_tipo_gasto}
+        # Validação do tipo (cache frio), INSERT, gastos_mensais e recarga do registro
+        with orcamento_consultas(4):
+            assert client.post("/registros/", json=dados).status_code == 201
+        with orcamento_consultas(1):
+            assert client.get(f"/registros/{sample_registro.id}").status_code == 200
+    
+    def test_orcamento_de_alteracao_e_exclusao(self, client: TestClient, sample_tipo_gasto, orcamento_consultas):
+        """Testa que UPDATE/DELETE ... RETURNING dispensam o SELECT antes e o refresh depois"""
+        criado = client.post("/registros/", json={"vlr_gasto": 10.0, "fk_tipo_gasto": sample_tipo_gasto.id}).json()
+        with orcamento_consultas(1):
+            response = client.put(f"/registros/{criado['id']}", json={"observacao": "Jantar"})
+        assert response.json() == {**criado, "observacao": "Jantar"}
+        # Valores anteriores (para o rollup), UPDATE ... RETURNING e rollup
+        with orcamento_consultas(3):
+            assert client.put(f"/registros/{criado['id']}", json={"vlr_gasto": 12.0}).json()["vlr_gasto"] == 12.0
+        # DELETE ... RETURNING, rollup e remoção da linha vazia do rollup
+        with orcamento_consultas(3):
+            assert client.delete(f"/registros/{criado['id']}").status_code == 204
+        assert client.get("/relatorios/mensal").json() == []
+        with orcamento_consultas(1):
+            assert client.put(f"/registros/{criado['id']}", json={"observacao": "x"}).status_code == 404
+    
+    def test_escritas_sem_returning(self, client: TestClient, sample_tipo_gasto, monkeypatch):
+        """Testa o caminho dos bancos sem RETURNING (SELECT/UPDATE e SELECT/DELETE)"""
+        from src.services import retorno
+        monkeypatch.setattr(retorno, "suporta_returning", lambda dialeto: False)
+        criado = client.post("/registros/", json={"vlr_gasto": 10.0, "fk_tipo_gasto": sample_tipo_gasto.id}).json()
+        
+        response = client.put(f"/registros/{criado['id']}", json={"vlr_gasto": 15.0, "observacao": "Jantar"})
+        assert response.json() == {**criado, "vlr_gasto": 15.0, "observacao": "Jantar"}
+        response = client.put(f"/tipos-gasto/{sample_tipo_gasto.id}", json={"descricao": "Comida"})
+        assert response.json()["descricao"] == "Comida"
+        assert [r["id"] for r in response.json()["registros"]] == [criado["id"]]
+        assert client.get("/relatorios/mensal").json()[0]["total_gasto"] == 15.0
+        
+        assert client.delete(f"/registros/{criado['id']}").status_code == 204
+        assert client.delete(f"/registros/{criado['id']}").status_code == 404
+        assert client.put(f"/registros/{criado['id']}", json={"vlr_gasto": 1.0}).status_code == 404
+        assert client.get("/relatorios/mensal").json() == []
+    
+    def test_detecta_consultas_repetidas(self, db_session, orcamento_consultas):
+        """Testa que o acesso preguiçoso em laço é apontado com o chamador e falha o orçamento"""
+        for i in range(4):
+            db_session.add(TipoDeGasto(descricao=f"Tipo {i}"))
+        db_session.commit()
+        db_session.expire_all()
+        
+        with pytest.raises(AssertionError, match="Orçamento de 2 consulta"):
+            with orcamento_consultas(2) as coleta:
+                for tipo in db_session.query(TipoDeGasto).all():
+                    tipo.registros
+        
+        forma, vezes, chamadores = coleta.repetidas(3)[0]
+        assert vezes == 4
+        assert "FROM registros" in forma
+        assert chamadores == [chamadores[0]] and chamadores[0].startswith("test_api.py:")
+
+
+class TestSQLiteProducao:
+    """Testes para o modo de produção do SQLite"""
+    
+    def test_pragmas_aplicados(self, tmp_path):
+        """Testa que cada conexão recebe os PRAGMAs de produção"""
+        from src.sqlite_producao import configurar_sqlite_producao
+        
+        engine_teste = create_engine(f"sqlite:///{tmp_path / 'wal.db'}")
+        configurar_sqlite_producao(engine_teste, busy_timeout_ms=1234)
+        with engine_teste.connect() as connection:
+            assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+            assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 1234
+            assert connection.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+    
+    def test_fila_escrita_serializa_na_thread_escritora(self):
+        """Testa que escritas rodam uma de cada vez na thread escritora, inclusive aninhadas"""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        from src.fila_escrita import FilaEscrita
+        
+        fila = FilaEscrita()
+        fila.ativar()
+        threads_usadas = set()
+        em_execucao = []
+        
+        def escrever(valor):
+            em_execucao.append(valor)
+            assert len(em_execucao) == 1
+            threads_usadas.add(threading.current_thread().name)
+            em_execucao.remove(valor)
+            return fila.executar(lambda: valor * 2)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                resultados = list(executor.map(lambda v: fila.executar(escrever, v), range(50)))
+        finally:
+            fila.desativar()
+        
+        assert resultados == [v * 2 for v in range(50)]
+        assert len(threads_usadas) == 1
+        assert threads_usadas.pop().startswith("kairos-escrita")
+
+    def test_fila_escrita_propaga_contexto(self):
+        """Testa que a escrita enfileirada vê as ContextVars da requisição que a enfileirou"""
+        from contextvars import ContextVar
+        from src.fila_escrita import FilaEscrita
+
+        requisicao = ContextVar("requisicao", default=None)
+        fila = FilaEscrita()
+        fila.ativar()
+        try:
+            requisicao.set("GET /registros/")
+            assert fila.executar(requisicao.get) == "GET /registros/"
+        finally:
+            fila.desativar()
+
 
 class TestEndpointsGerais:
     """Testes para endpoints gerais"""
@@ -129,3 +1190,65 @@ class TestEndpointsGerais:
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "healthy"
+    
+    def test_sondas_sem_abrir_conexoes(self, client: TestClient):
+        """Testa que /health/live e /health/ready respondem sem pegar conexões do pool"""
+        from src.connection import estatisticas_pool
+        checkouts = estatisticas_pool.checkouts
+        
+        assert client.get("/health/live").json() == {"status": "alive"}
+        response = client.get("/health/ready")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["pronto"] is True
+        assert data["banco"]["ok"] is True
+        assert data["pool"]["capacidade"] > 0
+        assert data["pool"]["saturado"] is False
+        assert estatisticas_pool.checkouts == checkouts
+    
+    def test_readiness_indisponivel(self, client: TestClient, monkeypatch):
+        """Testa 503 quando o pool está saturado ou a última verificação do banco falhou"""
+        from src.saude import monitor_saude
+        monkeypatch.setattr(monitor_saude, "saturacao_max", 0.0)
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["pool"]["saturado"] is True
+        
+        monkeypatch.setattr(monitor_saude, "saturacao_max", 0.9)
+        monkeypatch.setattr(monitor_saude, "banco_ok", False)
+        monkeypatch.setattr(monitor_saude, "erro", "conexão recusada")
+        assert client.get("/health/ready").status_code == 503
+        assert client.get("/health").status_code == 503
+        assert client.get("/health/live").status_code == 200
+
+    def test_saturacao_do_pool_das_rotas(self, tmp_path):
+        """Testa que saturação e timeouts são os do pool que atende as rotas e que overflow ilimitado não satura"""
+        from sqlalchemy.exc import TimeoutError as TimeoutPool
+        from sqlalchemy.pool import QueuePool
+        from src.connection import estatisticas_pool
+        from src.pool_stats import EstatisticasPool, criar_pool_monitorado
+        from src.saude import MonitorSaude
+
+        url = f"sqlite:///{tmp_path / 'saude.db'}"
+        estatisticas = EstatisticasPool()
+        engine_rotas = create_engine(
+            url, poolclass=criar_pool_monitorado(estatisticas), pool_size=1, max_overflow=0, pool_timeout=0.01
+        )
+        monitor = MonitorSaude(create_engine(url), saturacao_max=0.9, engine_rotas=engine_rotas, estatisticas=estatisticas)
+        monitor.verificar()
+        timeouts = estatisticas_pool.timeouts
+        with engine_rotas.connect():
+            with pytest.raises(TimeoutPool):
+                engine_rotas.connect()
+            pool = monitor.estado()["pool"]
+            assert (pool["em_uso"], pool["capacidade"], pool["saturado"], pool["timeouts"]) == (1, 1, True, 1)
+        assert estatisticas_pool.timeouts == timeouts
+
+        engine_ilimitado = create_engine(url, poolclass=QueuePool, pool_size=1, max_overflow=-1)
+        monitor = MonitorSaude(engine_ilimitado, saturacao_max=0.9)
+        monitor.verificar()
+        with engine_ilimitado.connect(), engine_ilimitado.connect():
+            estado = monitor.estado()
+        assert estado["pool"]["capacidade"] is None
+        assert estado["pool"]["saturado"] is False
+        assert estado["pronto"] is True